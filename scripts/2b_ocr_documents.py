@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Optional Stage: OCR Scanned Documents
+
+Purpose:
+  - Find PDF pages without a text layer (image-only scans)
+  - OCR them with the local Tesseract, in parallel, caching by page-image hash
+  - Save per-page text and word boxes for portal search and highlighting
+
+Input:  01-EVIDENCE-VAULT/documents/ (or --sources)
+Output: 02-WEB-OPTIMIZED/ocr/
+"""
+
+import sys
+
+from evidence_gallery.cli import ocr_documents_main
+
+if __name__ == "__main__":
+    sys.exit(ocr_documents_main())
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+
+Purpose:
+  - Generate synthetic evidence corpora (photos, PDFs, optional videos)
+  - Run each stage and the full pipeline at several scales
+  - Record wall time, CPU time, peak RSS and output bytes as JSON
+
+Usage:
+  python3 scripts/benchmark.py --scales 100,1000 --output before.json
+  python3 scripts/benchmark.py --scales 100,1000 --compare before.json
+"""
+
+import sys
+
+from evidence_gallery.cli import benchmark_main
+
+if __name__ == "__main__":
+    sys.exit(benchmark_main())
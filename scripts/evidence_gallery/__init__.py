@@ -0,0 +1,40 @@
+"""
+Digital Evidence Gallery - importable pipeline.
+
+The numbered scripts in scripts/ are thin wrappers around this package.
+It can also be used directly, e.g. from a worker process or benchmark:
+
+    from evidence_gallery import PipelineConfig, build_vault
+    build_vault(PipelineConfig(root="/cases/2024-001"))
+"""
+
+import importlib
+
+from .config import PipelineConfig
+from .errors import StageError
+from .vault import build_vault
+
+# Stages 2 and 3 need Pillow (and PyMuPDF); they are imported on first use,
+# so Stage 1, verify.py and serve.py run without them
+_LAZY = {
+    'generate_website': '.website',
+    'optimize_for_web': '.optimize',
+    'run_pipeline': '.pipeline',
+}
+
+__all__ = [
+    'PipelineConfig',
+    'StageError',
+    'build_vault',
+    'generate_website',
+    'optimize_for_web',
+    'run_pipeline',
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,393 @@
+"""
+Benchmark harness with synthetic evidence corpora.
+
+Generates a throwaway project folder per scale (random-content photos,
+multi-page PDFs, optional videos), then runs each stage script and the
+full pipeline in a child process and records wall time, CPU time, peak
+RSS and output bytes. Results are written as JSON so runs can be
+compared (see compare_results).
+
+run_io_benchmark() instead measures the overlapped I/O layer
+(parallel_io.py) at several queue depths against a directory whose
+stat/open/read calls are delayed like a network share's.
+"""
+
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from .config import PipelineConfig
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+# (name, script, output folder measured)
+BENCH_STAGES = [
+    ("stage1", "1_build_vault.py", "01-EVIDENCE-VAULT"),
+    ("stage2", "2_optimize_for_web.py", "02-WEB-OPTIMIZED"),
+    ("stage3", "3_generate_website.py", "03-WEBSITE-OUTPUT"),
+]
+FULL_PIPELINE = ("run_all", "run_all.py", None)
+
+OUTPUT_FOLDERS = ["01-EVIDENCE-VAULT", "02-WEB-OPTIMIZED", "03-WEBSITE-OUTPUT"]
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of one synthetic corpus"""
+
+    items: int = 100
+    megapixels: float = 2.0
+    png_ratio: float = 0.2      # share of photos written as PNG
+    document_ratio: float = 0.1  # share of items that are PDFs
+    pages_per_document: int = 10
+    scan_ratio: float = 0.5     # share of PDF pages carrying a full-page image
+    videos: int = 0
+    video_seconds: int = 2
+    seed: int = 1
+
+
+def _noise_image(rng, width, height):
+    """Random RGB content (worst case for JPEG, like real sensor noise)"""
+    return Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+
+
+def _photo_size(megapixels):
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    return width, int(width * 3 / 4)
+
+
+def generate_corpus(root, spec):
+    """Write a synthetic 00-SOURCE-EVIDENCE/ under root. Returns file counts."""
+    import fitz
+
+    rng = random.Random(spec.seed)
+    source = Path(root) / "00-SOURCE-EVIDENCE"
+    for category in ("photos", "documents", "videos"):
+        (source / category).mkdir(parents=True, exist_ok=True)
+
+    doc_count = int(round(spec.items * spec.document_ratio))
+    photo_count = spec.items - doc_count
+    width, height = _photo_size(spec.megapixels)
+
+    # A few full-size noise bases; each photo gets its own random patch so
+    # every file (and its hash) is unique without generating N full bitmaps.
+    bases = [_noise_image(rng, width, height) for _ in range(min(4, max(photo_count, 1)))]
+    patch = max(16, width // 20)
+
+    for i in range(photo_count):
+        img = bases[i % len(bases)].copy()
+        img.paste(_noise_image(rng, patch, patch),
+                  (rng.randrange(0, width - patch + 1), rng.randrange(0, height - patch + 1)))
+        if rng.random() < spec.png_ratio:
+            img.save(source / "photos" / f"SYN_{i:06d}.png", format='PNG', compress_level=1)
+        else:
+            img.save(source / "photos" / f"SYN_{i:06d}.jpg", format='JPEG', quality=90)
+
+    scan = _noise_image(rng, 1275, 1650).convert('L')  # 8.5×11 in at 150 DPI
+    for i in range(doc_count):
+        pdf = fitz.open()
+        for p in range(spec.pages_per_document):
+            page = pdf.new_page()
+            if rng.random() < spec.scan_ratio:
+                buffer = scan.copy()
+                buffer.paste(rng.randrange(256), (0, 0, 64, 64))
+                page.insert_image(page.rect, stream=_jpeg_bytes(buffer))
+            else:
+                text = " ".join(rng.choice(_WORDS) for _ in range(400))
+                page.insert_textbox(page.rect + (54, 54, -54, -54), text, fontsize=10)
+        pdf.set_metadata({'author': 'Synthetic', 'creationDate': f"D:2023{rng.randrange(1, 13):02d}15120000"})
+        pdf.save(source / "documents" / f"SYN_DOC_{i:05d}.pdf")
+        pdf.close()
+
+    for i in range(spec.videos):
+        _write_video(source / "videos" / f"SYN_VID_{i:03d}.mp4", spec.video_seconds, rng)
+
+    return {'photos': photo_count, 'documents': doc_count, 'videos': spec.videos}
+
+
+def _jpeg_bytes(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=70)
+    return buffer.getvalue()
+
+
+def _write_video(path, seconds, rng):
+    """Short test-pattern clip via ffmpeg, or without it an MP4 of similar
+    size: an ftyp box (so Stage 1 files it under videos) and an mdat box
+    of random bytes.
+
+    The pipeline only hashes and copies videos, so that measures the same
+    work.
+    """
+    if shutil.which('ffmpeg'):
+        subprocess.run(
+            ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'lavfi',
+             '-i', f"testsrc=duration={seconds}:size=1280x720:rate=30", str(path)],
+            check=True
+        )
+    else:
+        path.write_bytes(_mp4_boxes(rng.randbytes(seconds * 1024 * 1024)))
+
+
+def _mp4_boxes(media):
+    """ISO base media file: ftyp (isom, compatible with mp42) then mdat holding media"""
+    ftyp = b'isom' + (512).to_bytes(4, 'big') + b'isommp42'
+    return (len(ftyp) + 8).to_bytes(4, 'big') + b'ftyp' + ftyp + (len(media) + 8).to_bytes(4, 'big') + b'mdat' + media
+
+
+_WORDS = ("officer report evidence scene vehicle witness statement suspect "
+          "property recovered incident dispatch sergeant exhibit camera "
+          "timestamp location interview narrative supplement").split()
+
+
+def folder_bytes(path):
+    """Total size of all files below path"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+# Runs a stage script in-process and, on exit, reports resource usage of
+# itself plus all reaped descendants (worker pools, exiftool, ...).
+_RUSAGE_SHIM = """
+import json, os, resource, runpy, sys
+report, script = sys.argv[1], sys.argv[2]
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(script))
+code = 0
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit as e:
+    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+finally:
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with open(report, 'w') as f:
+        json.dump({'cpu': me.ru_utime + me.ru_stime + kids.ru_utime + kids.ru_stime,
+                   'maxrss': max(me.ru_maxrss, kids.ru_maxrss)}, f)
+sys.exit(code)
+"""
+
+
+def run_measured(script, args, cwd=None):
+    """Run a stage script and return (exit_code, wall_s, cpu_s, peak_rss_bytes).
+
+    Peak RSS is that of the largest single process (the stage or one of
+    its workers); CPU time is summed over all of them.
+    """
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as tmp:
+        report = tmp.name
+    try:
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', _RUSAGE_SHIM, report, str(script), *args],
+                                cwd=cwd, stdout=subprocess.DEVNULL)
+        wall = time.perf_counter() - start
+        try:
+            with open(report) as f:
+                usage = json.load(f)
+        except ValueError:
+            usage = {'cpu': 0.0, 'maxrss': 0}
+    finally:
+        os.unlink(report)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_rss = usage['maxrss'] if sys.platform == 'darwin' else usage['maxrss'] * 1024
+    return result.returncode, wall, usage['cpu'], peak_rss
+
+
+def clear_outputs(root):
+    """Remove every stage output and the checkpoint journals, so the next
+    run starts cold instead of resuming the stages measured before it"""
+    for folder in OUTPUT_FOLDERS:
+        shutil.rmtree(Path(root) / folder, ignore_errors=True)
+    shutil.rmtree(PipelineConfig(root=root).state_dir, ignore_errors=True)
+
+
+def run_scale(root, scale, spec, include_full=True, extra_args=()):
+    """Generate one corpus and measure every stage against it"""
+    spec = CorpusSpec(**{**asdict(spec), 'items': scale})
+    root = Path(root)
+    shutil.rmtree(root, ignore_errors=True)
+
+    print(f"Scale {scale}: generating corpus...")
+    start = time.perf_counter()
+    counts = generate_corpus(root, spec)
+    print(f"  ✅ {counts['photos']} photos, {counts['documents']} documents, "
+          f"{counts['videos']} videos ({time.perf_counter() - start:.1f}s)")
+
+    stages = list(BENCH_STAGES) + ([FULL_PIPELINE] if include_full else [])
+    results = []
+    for name, script, output_folder in stages:
+        if name == FULL_PIPELINE[0]:
+            clear_outputs(root)
+        exit_code, wall, cpu, peak_rss = run_measured(SCRIPTS_DIR / script,
+                                                      ['--root', str(root), *extra_args], cwd=root)
+        output_bytes = (folder_bytes(root / output_folder) if output_folder
+                        else sum(folder_bytes(root / f) for f in OUTPUT_FOLDERS))
+        results.append({
+            'scale': scale,
+            'stage': name,
+            'exit_code': exit_code,
+            'wall_s': round(wall, 3),
+            'cpu_s': round(cpu, 3),
+            'peak_rss_mb': round(peak_rss / (1024*1024), 1),
+            'output_bytes': output_bytes,
+            **counts,
+        })
+        status = "✅" if exit_code == 0 else f"❌ exit {exit_code}"
+        print(f"  {status} {name:8} wall {wall:8.2f}s  cpu {cpu:8.2f}s  "
+              f"rss {peak_rss / (1024*1024):7.1f} MB  out {output_bytes / (1024*1024):8.1f} MB")
+    return results
+
+
+def run_benchmarks(scales, spec, workdir, include_full=True, keep=False, extra_args=()):
+    """Benchmark every scale and return the JSON-ready report"""
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    results = []
+    try:
+        for scale in scales:
+            results += run_scale(workdir / f"corpus-{scale}", scale, spec, include_full, extra_args)
+    finally:
+        if not keep:
+            for scale in scales:
+                shutil.rmtree(workdir / f"corpus-{scale}", ignore_errors=True)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus': asdict(spec),
+        'results': results,
+    }
+
+
+IO_BLOCK = 1024 * 1024  # one network round trip per MB read, as SMB/NFS request sizes go
+
+
+@contextmanager
+def simulated_latency(latency_s):
+    """Delay parallel_io's stat/read/copy like a remote share: one round
+    trip per call plus one per MB moved (sleeping releases the GIL, as
+    waiting on the network does)"""
+    from . import parallel_io
+
+    def round_trips(path):
+        return 1 + os.path.getsize(path) // IO_BLOCK
+
+    originals = parallel_io._stat, parallel_io._read, parallel_io._copy
+
+    def slow_stat(path):
+        time.sleep(latency_s)
+        return originals[0](path)
+
+    def slow_read(path):
+        time.sleep(latency_s * round_trips(path))
+        return originals[1](path)
+
+    def slow_copy(source, destination):
+        time.sleep(latency_s * round_trips(source))
+        return originals[2](source, destination)
+
+    parallel_io._stat, parallel_io._read, parallel_io._copy = slow_stat, slow_read, slow_copy
+    try:
+        yield
+    finally:
+        parallel_io._stat, parallel_io._read, parallel_io._copy = originals
+
+
+def run_io_benchmark(workdir, latency_ms=5.0, depths=(1, 4, 16, 32), files=200, file_kb=1024, seed=1):
+    """Stat, read and copy a synthetic folder through parallel_io at each
+    queue depth with simulated latency. Returns the JSON-ready report."""
+    from . import parallel_io
+    from .parallel_io import copy_all, read_ahead, stat_all
+
+    workdir = Path(workdir)
+    source = workdir / "io-source"
+    shutil.rmtree(source, ignore_errors=True)
+    source.mkdir(parents=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        path = source / f"IMG_{i:05d}.jpg"
+        path.write_bytes(rng.randbytes(file_kb * 1024))
+        paths.append(path)
+    total_mb = files * file_kb / 1024
+
+    results = []
+    try:
+        with simulated_latency(latency_ms / 1000):
+            for depth in depths:
+                row = {'depth': depth}
+                started = time.perf_counter()
+                stat_all(paths, depth)
+                row['stat_s'] = round(time.perf_counter() - started, 3)
+
+                started = time.perf_counter()
+                # read_ahead leaves reading to the caller at depth 1: time plain serial reads
+                reads = read_ahead(paths, dict.fromkeys(paths, file_kb * 1024), depth) if depth > 1 else ((p, parallel_io._read(p)) for p in paths)
+                for _ in reads:
+                    pass
+                row['read_s'] = round(time.perf_counter() - started, 3)
+
+                destination = workdir / f"io-copy-{depth}"
+                destination.mkdir(exist_ok=True)
+                started = time.perf_counter()
+                for _ in copy_all([(path, destination / path.name) for path in paths], depth):
+                    pass
+                row['copy_s'] = round(time.perf_counter() - started, 3)
+                shutil.rmtree(destination)
+
+                row['read_mb_s'] = round(total_mb / row['read_s'], 1)
+                row['copy_mb_s'] = round(total_mb / row['copy_s'], 1)
+                results.append(row)
+                print(f"  depth {depth:>3}: stat {row['stat_s']:6.2f}s   read {row['read_s']:6.2f}s "
+                      f"({row['read_mb_s']:7.1f} MB/s)   copy {row['copy_s']:6.2f}s ({row['copy_mb_s']:7.1f} MB/s)")
+    finally:
+        shutil.rmtree(source, ignore_errors=True)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'io': {'latency_ms': latency_ms, 'files': files, 'file_kb': file_kb},
+        'results': results,
+    }
+
+
+def compare_results(baseline, current):
+    """Print wall/CPU/RSS ratios of current vs baseline per scale and stage"""
+    base = {(r['scale'], r['stage']): r for r in baseline['results']}
+    print(f"{'scale':>7} {'stage':8} {'wall':>8} {'cpu':>8} {'rss':>8} {'bytes':>8}")
+    for r in current['results']:
+        old = base.get((r['scale'], r['stage']))
+        if not old:
+            continue
+        ratios = [r[k] / old[k] if old[k] else float('nan')
+                  for k in ('wall_s', 'cpu_s', 'peak_rss_mb', 'output_bytes')]
+        print(f"{r['scale']:>7} {r['stage']:8} " + " ".join(f"{x:7.2f}x" for x in ratios))
+
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,133 @@
+"""
+Checkpoint journals for resumable stage runs.
+
+A journal is an append-only JSON-lines file under ROOT/.pipeline-state/.
+The first line is a header holding a fingerprint of the render settings;
+every further line records one finished item (a photo, a document page,
+a portal rendition) together with the size/mtime stamp of its source file
+and what was produced: output paths and sizes or small thumbnails, never
+full renditions. Keys use paths relative to the project root.
+
+Appending one line per item keeps the journal O(1) per item. A crash can
+only leave a torn last line, which is ignored on load; a settings change
+invalidates the whole journal. On rerun an item is skipped only if its
+source stamp still matches and its recorded outputs are intact.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+JOURNAL_VERSION = 2
+
+
+def file_stamp(path):
+    """Cheap change detector for a source file"""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def item_key(path, root):
+    """Journal key part for a source file: its path relative to the project
+    root, so `--root .` and the same root given absolute share checkpoints"""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(root)).replace(os.sep, '/')
+
+
+def outputs_intact(base, outputs):
+    """True if every recorded output exists with its recorded size"""
+    for rel, size in outputs.items():
+        try:
+            if os.path.getsize(os.path.join(base, rel)) != size:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class Journal:
+    """Append-only record of finished items for one stage (or source)"""
+
+    def __init__(self, path, fingerprint, resume=True, fsync_interval=1.0):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.fsync_interval = fsync_interval
+        self._superseded = 0
+        self._clean = False
+        self.entries = self._load() if resume else {}
+        if not self._clean or self._superseded:
+            self._rewrite()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._last_sync = time.monotonic()
+
+    def _load(self):
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return {}
+
+        entries = {}
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return {}
+            if header.get('version') != JOURNAL_VERSION or header.get('fingerprint') != self.fingerprint:
+                return {}
+            self._clean = True
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self._clean = False
+                    break  # torn write from an interrupted run
+                if not line.endswith('\n'):
+                    self._clean = False
+                if entry['key'] in entries:
+                    self._superseded += 1
+                entries[entry['key']] = entry
+        return entries
+
+    def _rewrite(self):
+        """Atomically replace the journal with header + live entries (on
+        start, only when the file is missing, stale, torn or has
+        superseded lines)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': JOURNAL_VERSION, 'fingerprint': self.fingerprint}) + '\n')
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def lookup(self, key, stamp):
+        """The recorded entry for key if its source is unchanged, else None"""
+        entry = self.entries.get(key)
+        if entry is not None and entry['stamp'] == stamp:
+            return entry
+        return None
+
+    def record(self, key, stamp, **data):
+        entry = {'key': key, 'stamp': stamp, **data}
+        self.entries[key] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        now = time.monotonic()
+        if now - self._last_sync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,122 @@
+"""
+Per-chunk hashes for very large evidence files.
+
+A whole-file SHA-256 can only be computed front to back by one thread,
+and an interrupted hash starts over. So for every file of at least
+CHUNKED_MIN_SIZE, Stage 1 also records the SHA-256 of each fixed-size
+chunk. It computes them in the same read pass as the whole-file hash, at
+no extra I/O:
+
+  metadata/chunk_hashes/<category>/<file path>.json
+      {"file", "size", "chunk_size", "sha256" (whole file, as in
+       checksums.txt), "chunks": [sha256 of each chunk]}
+
+scripts/verify.py then checks such files chunk by chunk: chunks are
+hashed in parallel, finished chunks are journaled so an interrupted run
+resumes, and a mismatch names the corrupt byte ranges rather than just
+the file. The whole-file SHA-256 in checksums.txt is unchanged and can
+still be re-checked with verify.py --whole-file.
+"""
+
+import hashlib
+import json
+import os
+
+READ_SIZE = 8 * 1024 * 1024  # large sequential reads; hashlib releases the GIL on them
+CHUNK_SIZE = 64 * 1024 * 1024
+CHUNKED_MIN_SIZE = 256 * 1024 * 1024
+CHUNKS_DIR = "chunk_hashes"
+
+
+class StreamHasher:
+    """Whole-file SHA-256, plus per-chunk SHA-256s if chunk_size is set,
+    of the data passed to update() in order"""
+
+    def __init__(self, chunk_size=None):
+        self.whole = hashlib.sha256()
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self._chunk = hashlib.sha256()
+        self._filled = 0
+
+    def update(self, data):
+        self.whole.update(data)
+        if not self.chunk_size:
+            return
+        data = memoryview(data)
+        while data:
+            take = min(len(data), self.chunk_size - self._filled)
+            self._chunk.update(data[:take])
+            self._filled += take
+            data = data[take:]
+            if self._filled == self.chunk_size:
+                self.chunks.append(self._chunk.hexdigest())
+                self._chunk, self._filled = hashlib.sha256(), 0
+
+    def result(self):
+        """(whole-file SHA-256, [chunk SHA-256s] or None without chunk_size)"""
+        if not self.chunk_size:
+            return self.whole.hexdigest(), None
+        chunks = self.chunks + ([self._chunk.hexdigest()] if self._filled or not self.chunks else [])
+        return self.whole.hexdigest(), chunks
+
+
+def hash_with_chunks(path, chunk_size=CHUNK_SIZE, read_size=READ_SIZE):
+    """(whole-file SHA-256, [SHA-256 of each chunk]) in one sequential pass"""
+    hasher = StreamHasher(chunk_size)
+    buffer = bytearray(read_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while n := f.readinto(buffer):
+            hasher.update(view[:n])
+    return hasher.result()
+
+
+def hash_chunk(path, offset, length, read_size=READ_SIZE):
+    """SHA-256 of length bytes of a file from offset (each call opens its
+    own handle, so chunks can be hashed in parallel)"""
+    digest = hashlib.sha256()
+    buffer = bytearray(min(read_size, max(length, 1)))
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        f.seek(offset)
+        while length > 0 and (n := f.readinto(view[:min(len(buffer), length)])):
+            digest.update(view[:n])
+            length -= n
+    return digest.hexdigest()
+
+
+def chunk_record_path(metadata_dir, name):
+    return os.path.join(metadata_dir, CHUNKS_DIR, f"{name}.json")
+
+
+def write_chunk_record(metadata_dir, name, size, checksum, chunks, chunk_size=CHUNK_SIZE):
+    path = chunk_record_path(metadata_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'file': name, 'size': size, 'chunk_size': chunk_size, 'sha256': checksum,
+                   'chunks': chunks}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def read_chunk_record(metadata_dir, name):
+    with open(chunk_record_path(metadata_dir, name), 'r') as f:
+        return json.load(f)
+
+
+def chunked_files(metadata_dir):
+    """Names of the files that have a chunk record"""
+    folder = os.path.join(metadata_dir, CHUNKS_DIR)
+    if not os.path.isdir(folder):
+        return set()
+    return {os.path.relpath(os.path.join(parent, name), folder).replace(os.sep, '/')[:-5]
+            for parent, _, names in os.walk(folder) for name in names if name.endswith('.json')}
+
+
+def chunk_ranges(record):
+    """[(offset, length)] of each chunk in a record"""
+    size, chunk_size = record['size'], record['chunk_size']
+    return [(offset, min(chunk_size, size - offset)) for offset in range(0, max(size, 1), chunk_size)]
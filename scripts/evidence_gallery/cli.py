@@ -0,0 +1,323 @@
+"""
+Command-line entry points behind the scripts/ wrappers.
+
+Each main() parses its own arguments, builds a PipelineConfig and calls
+the matching library function. They return a process exit code.
+"""
+
+import argparse
+from pathlib import Path
+
+from . import progress, tracing
+from .config import PipelineConfig
+from .errors import StageError
+from .profiling import PROFILE_MODES, default_run_dir, profiled
+from .sources import load_sources
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def build_parser(description, default_root=Path(".")):
+    """Argument parser with the options shared by every stage"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--root', type=Path, default=default_root,
+                        help="project folder containing 00-SOURCE-EVIDENCE/ etc. "
+                             "(default: %(default)s)")
+    parser.add_argument('--sources', type=Path,
+                        help="JSON source registry for the website stage "
+                             "(default: the evidence vault)")
+    parser.add_argument('--workers', type=int,
+                        help="worker processes for parallel steps (default: one per CPU)")
+    parser.add_argument('--ocr-lang', default=PipelineConfig.ocr_lang, metavar='LANG',
+                        help="Tesseract language(s) for the OCR stage, e.g. eng+spa (default: %(default)s)")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help="cap the RAM that concurrent image decodes may use together")
+    parser.add_argument('--io-depth', type=int, default=PipelineConfig.io_depth, metavar='N',
+                        help="file reads/copies kept in flight; raise for network shares "
+                             "(default: %(default)s)")
+    parser.add_argument('--fixed-dpi', action='store_true',
+                        help="render every PDF page at the fixed DPI as JPEG (no scan passthrough, "
+                             "text PNGs or blank-page skipping)")
+    parser.add_argument('--trace', type=Path, metavar='DIR',
+                        help="record timing spans; writes DIR/trace.json (Chrome trace) "
+                             "and DIR/trace-summary.txt")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="profile the run with cProfile (cpu) or tracemalloc (mem)")
+    parser.add_argument('--profile-dir', type=Path, metavar='DIR',
+                        help="where to write profiles (default: ROOT/profiles/<stage>-<time>/)")
+    parser.add_argument('--fresh', action='store_true',
+                        help="ignore checkpoints from earlier runs and redo every item")
+    parser.add_argument('--progress', metavar='FILE',
+                        help="write JSON-lines progress events to FILE ('-' for stdout)")
+    return parser
+
+
+def config_from_args(args):
+    """Build a PipelineConfig from parsed arguments"""
+    return PipelineConfig(
+        root=args.root,
+        sources=load_sources(args.sources) if args.sources else [],
+        workers=args.workers,
+        memory_budget_mb=args.memory_budget,
+        io_depth=args.io_depth,
+        adaptive_pages=not args.fixed_dpi,
+        ocr=getattr(args, 'ocr', False),
+        ocr_lang=args.ocr_lang,
+        trace_dir=args.trace,
+        progress=args.progress,
+        resume=not args.fresh,
+    )
+
+
+def start_instrumentation(config):
+    if config.trace_dir:
+        tracing.start(config.trace_dir)
+    if config.progress:
+        progress.start(config.progress)
+
+
+def finish_instrumentation(config):
+    if config.trace_dir:
+        summary = tracing.finish()
+        print()
+        print("TIMING SUMMARY")
+        print("-" * 80)
+        print(summary, end='')
+        print(f"Trace: {config.trace_dir / 'trace.json'} (open in chrome://tracing or ui.perfetto.dev)")
+    progress.finish()  # last: with --progress - the lines above still go to stderr
+
+
+def profile_dir(args, name):
+    return args.profile_dir or default_run_dir(args.root, name)
+
+
+def run_stage(stage, description, argv=None):
+    """Parse arguments and run one stage"""
+    args = build_parser(description).parse_args(argv)
+    config = config_from_args(args)
+    start_instrumentation(config)
+    try:
+        with profiled(args.profile, profile_dir(args, stage.__name__)):
+            stage(config)
+    except StageError:
+        return 1
+    finally:
+        finish_instrumentation(config)
+    return 0
+
+
+def build_vault_main(argv=None):
+    from .vault import build_vault
+    return run_stage(build_vault, "Stage 1: Build Evidence Vault", argv)
+
+
+def optimize_for_web_main(argv=None):
+    from .optimize import optimize_for_web
+    return run_stage(optimize_for_web, "Stage 2: Optimize for Web", argv)
+
+
+def ocr_documents_main(argv=None):
+    from .ocr import ocr_documents
+    return run_stage(ocr_documents, "Optional stage: OCR scanned document pages", argv)
+
+
+def generate_website_main(argv=None):
+    from .website import generate_website
+    return run_stage(generate_website, "Stage 3: Generate Website", argv)
+
+
+def run_all_main(argv=None):
+    from .pipeline import run_pipeline
+
+    parser = build_parser("Run all stages: Vault → Optimize → Website", default_root=PROJECT_ROOT)
+    parser.add_argument('--ocr', action='store_true',
+                        help="also run the optional OCR stage (needs tesseract)")
+    args = parser.parse_args(argv)
+    config = config_from_args(args)
+    start_instrumentation(config)  # first: with --progress - the banners go to stderr
+
+    print("=" * 80)
+    print("DIGITAL EVIDENCE GALLERY - COMPLETE PIPELINE")
+    print("=" * 80)
+    print()
+
+    try:
+        with profiled(args.profile, profile_dir(args, "run_all")):
+            run_pipeline(config)
+    except Exception:
+        return 1
+    else:
+        print("=" * 80)
+        print("✅ COMPLETE! All stages finished successfully")
+        print("=" * 80)
+        print()
+        print("Your evidence gallery is ready at: 03-WEBSITE-OUTPUT/")
+        print()
+        print("Next steps:")
+        print("  1. Review gallery:")
+        print("       python3 scripts/serve.py")
+        print("       Open: http://localhost:8000/index.html")
+        print()
+        print("  2. Test on mobile using browser DevTools")
+        print()
+        print("  3. Deliver to client or publish to web server")
+        print()
+        print("=" * 80)
+        return 0
+    finally:
+        finish_instrumentation(config)
+
+
+def verify_main(argv=None):
+    from .verify import check_proof_file, compare_vaults, verify_vault, write_proof
+
+    parser = build_parser("Verify the evidence vault against its checksums", default_root=PROJECT_ROOT)
+    parser.add_argument('--fast', action='store_true',
+                        help="only hash files whose size/mtime differ from the Stage 1 record")
+    parser.add_argument('--sample', type=float, metavar='FRACTION',
+                        help="hash a random share of the files, e.g. 0.05 (all are checked for existence)")
+    parser.add_argument('--seed', type=int, help="seed for --sample, to repeat an earlier spot check")
+    parser.add_argument('--report', type=Path, metavar='FILE', help="write the full result as JSON")
+    parser.add_argument('--whole-file', action='store_true',
+                        help="re-check large files' whole-file SHA-256 instead of their chunk hashes")
+    tree = parser.add_argument_group("Merkle tree")
+    tree.add_argument('--proof', metavar='NAME',
+                      help="print (or --output) the inclusion proof for one file (category/path, "
+                           "as in checksums.txt)")
+    tree.add_argument('--output', type=Path, metavar='FILE', help="where --proof writes the proof")
+    tree.add_argument('--check-proof', type=Path, metavar='FILE',
+                      help="re-hash the file a proof names and check the proof")
+    tree.add_argument('--compare', type=Path, metavar='OTHER_ROOT',
+                      help="list files that differ from another copy of the project")
+    args = parser.parse_args(argv)
+    if args.sample is not None and not 0 < args.sample <= 1:
+        parser.error("--sample must be between 0 and 1")
+
+    config = config_from_args(args)
+    if args.proof:
+        return 0 if write_proof(config, args.proof, args.output) else 1
+    if args.check_proof:
+        return 0 if check_proof_file(config, args.check_proof) else 1
+    if args.compare:
+        return 1 if compare_vaults(config, PipelineConfig(root=args.compare).metadata) else 0
+    start_instrumentation(config)
+    try:
+        with profiled(args.profile, profile_dir(args, "verify")):
+            summary = verify_vault(config, fast=args.fast, sample=args.sample, seed=args.seed,
+                                   report=args.report, whole_file=args.whole_file)
+    finally:
+        finish_instrumentation(config)
+    return 1 if summary['problems'] else 0
+
+
+def serve_main(argv=None):
+    from .server import serve
+
+    parser = argparse.ArgumentParser(description="Serve the generated evidence portal")
+    parser.add_argument('--root', type=Path, default=PROJECT_ROOT,
+                        help="project folder containing 03-WEBSITE-OUTPUT/ (default: %(default)s)")
+    parser.add_argument('--directory', type=Path,
+                        help="portal folder to serve (default: ROOT/03-WEBSITE-OUTPUT)")
+    parser.add_argument('--host', default="127.0.0.1",
+                        help="address to listen on; 0.0.0.0 for the whole LAN (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=8000, help="(default: %(default)s)")
+    parser.add_argument('--quiet', action='store_true', help="do not log every request")
+    live = parser.add_argument_group("on-demand mode (no Stage 3 build needed)")
+    live.add_argument('--live', action='store_true',
+                      help="serve straight from the sources, rendering images and pages on first request")
+    live.add_argument('--sources', type=Path, help="JSON source registry (default: the evidence vault)")
+    live.add_argument('--workers', type=int, help="render processes (default: one per CPU)")
+    live.add_argument('--memory-budget', type=int, metavar='MB',
+                      help="cap the RAM that concurrent image decodes may use together")
+    live.add_argument('--cache-mb', type=int, default=PipelineConfig.live_cache_mb,
+                      help="disk cap for cached renditions in ROOT/.pipeline-state/live-cache "
+                           "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.live:
+        from .live import serve_live
+
+        config = PipelineConfig(root=args.root,
+                                sources=load_sources(args.sources) if args.sources else [],
+                                workers=args.workers, memory_budget_mb=args.memory_budget,
+                                live_cache_mb=args.cache_mb)
+        serve_live(config, host=args.host, port=args.port, quiet=args.quiet)
+        return 0
+
+    directory = args.directory or PipelineConfig(root=args.root).website_output
+    if not (directory / "index.html").is_file():
+        print(f"❌ No portal found in {directory}")
+        print("   Run Stage 3 first: python3 scripts/3_generate_website.py")
+        print("   or serve on demand: python3 scripts/serve.py --live")
+        return 1
+    serve(directory, host=args.host, port=args.port, quiet=args.quiet)
+    return 0
+
+
+def benchmark_main(argv=None):
+    import json
+    import tempfile
+
+    from .benchmark import CorpusSpec, compare_results, run_benchmarks, run_io_benchmark, write_report
+
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic evidence corpora")
+    parser.add_argument('--scales', default="100,1000,10000",
+                        help="comma-separated corpus sizes in items (default: %(default)s)")
+    parser.add_argument('--megapixels', type=float, default=CorpusSpec.megapixels)
+    parser.add_argument('--document-ratio', type=float, default=CorpusSpec.document_ratio,
+                        help="share of items generated as PDFs (default: %(default)s)")
+    parser.add_argument('--pages', type=int, default=CorpusSpec.pages_per_document,
+                        help="pages per PDF (default: %(default)s)")
+    parser.add_argument('--scan-ratio', type=float, default=CorpusSpec.scan_ratio,
+                        help="share of PDF pages that are full-page scans (default: %(default)s)")
+    parser.add_argument('--videos', type=int, default=0, help="videos per corpus (default: 0)")
+    parser.add_argument('--seed', type=int, default=CorpusSpec.seed)
+    parser.add_argument('--no-full', action='store_true', help="skip the run_all.py measurement")
+    parser.add_argument('--workdir', type=Path, default=Path(tempfile.gettempdir()) / "evidence-gallery-bench")
+    parser.add_argument('--keep', action='store_true', help="keep generated corpora and outputs")
+    parser.add_argument('--output', type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument('--compare', type=Path, help="earlier results JSON to compare against")
+    parser.add_argument('--io-latency', type=float, metavar='MS',
+                        help="instead: benchmark the I/O layer against a folder with this much "
+                             "simulated network latency per round trip")
+    parser.add_argument('--io-depths', default="1,4,16,32",
+                        help="queue depths for --io-latency (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    spec = CorpusSpec(
+        megapixels=args.megapixels,
+        document_ratio=args.document_ratio,
+        pages_per_document=args.pages,
+        scan_ratio=args.scan_ratio,
+        videos=args.videos,
+        seed=args.seed,
+    )
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    print("=" * 80)
+    print("DIGITAL EVIDENCE GALLERY - BENCHMARK")
+    print("=" * 80)
+    print()
+
+    if args.io_latency is not None:
+        print(f"I/O layer, {args.io_latency:g} ms simulated latency per round trip:")
+        depths = [int(d) for d in args.io_depths.split(',') if d.strip()]
+        report = run_io_benchmark(args.workdir, args.io_latency, depths, seed=args.seed)
+        write_report(report, args.output)
+        print()
+        print(f"✅ Results saved to: {args.output}")
+        return 0
+
+    report = run_benchmarks(scales, spec, args.workdir, include_full=not args.no_full, keep=args.keep)
+    write_report(report, args.output)
+    print()
+    print(f"✅ Results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        print(f"Compared with {args.compare} (current / baseline):")
+        compare_results(baseline, report)
+
+    return 0 if all(r['exit_code'] == 0 for r in report['results']) else 1
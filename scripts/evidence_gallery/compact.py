@@ -0,0 +1,158 @@
+"""
+Smaller downloads for the generated portal.
+
+Precompressed siblings
+    Every text asset (HTML, JSON, JS) gets a .gz sibling, plus a .br
+    sibling when the optional brotli package is installed. A server that
+    honours Accept-Encoding (nginx gzip_static/brotli_static, or any
+    static server that looks for them) sends these instead of compressing
+    on every request. The base64 image data compresses poorly; the
+    metadata, search and timeline files shrink 5-20x.
+
+Columnar item index
+    items-index.json holds the metadata of every image and document,
+    without image data, column by column. String columns with few
+    distinct values (agency, camera make/model, ISO, ...) are
+    dictionary-encoded: the column holds indexes into a table of the
+    distinct values. See rows() for decoding.
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings without it
+    brotli = None
+
+ITEM_INDEX_VERSION = 1
+TEXT_SUFFIXES = ('.html', '.json', '.js', '.css', '.svg', '.txt')
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9      # 10-11 are several times slower for a few % on large files
+DICTIONARY_RATIO = 0.5  # dictionary-encode columns with fewer distinct values than this share of rows
+
+
+def columnar(records, skip=()):
+    """Column-oriented, dictionary-encoded table of a list of dicts"""
+    fields = []
+    for record in records:
+        for name in record:
+            if name not in fields and name not in skip:
+                fields.append(name)
+
+    columns = {}
+    dictionaries = {}
+    for name in fields:
+        values = [record.get(name) for record in records]
+        distinct = list(dict.fromkeys(v for v in values if isinstance(v, str)))
+        if distinct and all(v is None or isinstance(v, str) for v in values) \
+                and len(distinct) < len(values) * DICTIONARY_RATIO:
+            codes = {value: i for i, value in enumerate(distinct)}
+            columns[name] = [codes[v] if v is not None else None for v in values]
+            dictionaries[name] = distinct
+        else:
+            columns[name] = values
+    return {'count': len(records), 'columns': columns, 'dictionaries': dictionaries}
+
+
+def rows(table):
+    """Inverse of columnar(): the list of dicts (missing fields come back as None)"""
+    decoded = {}
+    for name, values in table['columns'].items():
+        dictionary = table['dictionaries'].get(name)
+        decoded[name] = [dictionary[v] if v is not None else None for v in values] if dictionary else values
+    return [{name: values[i] for name, values in decoded.items()} for i in range(table['count'])]
+
+
+def write_item_index(images, documents, path):
+    """Write items-index.json for image and document metadata records
+    (in portal order). Returns its size in bytes."""
+    index = {'version': ITEM_INDEX_VERSION,
+             'images': columnar(images, skip=('dataUri', 'thumbnail')),
+             'documents': columnar(documents, skip=('preview',))}
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def _write_compressed(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _siblings(path):
+    return [path + '.gz'] + ([path + '.br'] if brotli is not None else [])
+
+
+def _compressed_newer(path):
+    """True if every sibling of path was written after path itself"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        return all(os.stat(sibling).st_mtime_ns > mtime for sibling in _siblings(path))
+    except OSError:
+        return False
+
+
+def _compressed_matches(path, data):
+    """True if path's .gz sibling holds data (and a .br sibling exists)"""
+    try:
+        if not all(os.path.exists(sibling) for sibling in _siblings(path)):
+            return False
+        with gzip.open(path + '.gz', 'rb') as f:
+            return f.read() == data
+    except (OSError, EOFError):
+        return False
+
+
+def precompress_outputs(output_dir):
+    """Write .gz (and .br) siblings of every text asset in output_dir.
+
+    Files are compressed again only when they changed: siblings newer
+    than the file are kept without reading it, and a file rewritten with
+    the same content (Stage 3 rewrites its JSON on every run) is compared
+    with its .gz. Siblings of files that are removed go with them: the
+    search and timeline writers clear their folders of anything they did
+    not write. Returns a summary dict.
+    """
+    summary = {'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'brotli_bytes': 0, 'brotli': brotli is not None,
+               'reused': 0}
+    for dirpath, _, filenames in os.walk(output_dir):
+        names = set(filenames)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if not name.endswith(TEXT_SUFFIXES):
+                continue  # binary, or already compressed (search shards)
+            summary['files'] += 1
+            summary['bytes'] += os.path.getsize(path)
+            if brotli is None and name + '.br' in names:
+                os.remove(path + '.br')
+
+            unchanged = _compressed_newer(path)
+            if not unchanged:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                unchanged = _compressed_matches(path, data)
+                if unchanged:
+                    for sibling in _siblings(path):
+                        os.utime(sibling)  # newer than the file again: next time it is not read
+            if unchanged:
+                summary['reused'] += 1
+                summary['gzip_bytes'] += os.path.getsize(path + '.gz')
+                if brotli is not None:
+                    summary['brotli_bytes'] += os.path.getsize(path + '.br')
+                continue
+
+            compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+            _write_compressed(path + '.gz', compressed)
+            summary['gzip_bytes'] += len(compressed)
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+                _write_compressed(path + '.br', compressed)
+                summary['brotli_bytes'] += len(compressed)
+    return summary
@@ -0,0 +1,127 @@
+"""
+Pipeline configuration shared by all stages.
+
+Every stage takes a PipelineConfig. The defaults match the settings the
+stage scripts have always used, with all folders resolved relative to
+the project root.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+RENDER_SETTINGS = (
+    'image_resize_percent', 'image_jpeg_quality', 'thumbnail_size', 'thumbnail_quality',
+    'document_dpi', 'document_jpeg_quality', 'pdf_thumbnail_dpi', 'pdf_thumbnail_quality', 'adaptive_pages',
+    'page_preview_dpi', 'page_preview_quality',
+    'max_pages_huge', 'max_pages_large', 'max_pages_small',
+)
+
+
+@dataclass
+class PipelineConfig:
+    """Folder layout and quality settings for one pipeline run"""
+
+    root: Path = Path(".")
+
+    # Image settings
+    image_resize_percent: float = 0.5
+    image_jpeg_quality: int = 75
+    thumbnail_size: tuple = (150, 150)
+    thumbnail_quality: int = 40
+
+    # Document settings (PDF rendering)
+    document_dpi: int = 150
+    document_jpeg_quality: int = 60
+    pdf_thumbnail_dpi: int = 100
+    pdf_thumbnail_quality: int = 50
+    max_pages_huge: int = 50    # Files > 20 MB
+    max_pages_large: int = 75   # Files 5-20 MB
+    max_pages_small: int = 100  # Files < 5 MB
+    # Pass scanned JPEG pages through, text pages as greyscale PNG, blank pages
+    # unrendered (see page_render.py); False renders every page at document_dpi
+    adaptive_pages: bool = True
+    # Low-resolution tier the viewer shows while a page's full rendition loads
+    page_preview_dpi: int = 24
+    page_preview_quality: int = 30
+
+    # Website sources (see sources.py); empty means the vault itself
+    sources: list = field(default_factory=list)
+    default_source_name: str = "Evidence Vault"
+
+    # Worker processes for parallel steps (None = one per CPU)
+    workers: int = None
+
+    # Folder for timing spans (see tracing.py); None disables tracing
+    trace_dir: Path = None
+
+    # JSON-lines progress destination (see progress.py): path, '-' or None
+    progress: str = None
+
+    # Skip items already finished by an earlier run (see checkpoint.py)
+    resume: bool = True
+
+    # Optional OCR stage (see ocr.py)
+    ocr: bool = False
+    ocr_dpi: int = 300
+    ocr_lang: str = 'eng'
+
+    # Reads/copies kept in flight on the source and vault (see parallel_io.py);
+    # raise for network shares, 1 = one at a time
+    io_depth: int = 8
+
+    # RAM budget shared by concurrent image decodes (see memory.py); None = unlimited
+    memory_budget_mb: int = None
+
+    # Portal viewer: images/pages decoded ahead on each side of the one shown
+    prefetch_items: int = 3
+    # Portal viewer: decoded full-size pages kept in memory (least recently used go first)
+    cached_pages: int = 32
+
+    # On-demand server (serve.py --live): disk cap for cached renditions
+    live_cache_mb: int = 2048
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+
+    @property
+    def source(self):
+        return self.root / "00-SOURCE-EVIDENCE"
+
+    @property
+    def vault(self):
+        return self.root / "01-EVIDENCE-VAULT"
+
+    @property
+    def metadata(self):
+        return self.vault / "metadata"
+
+    @property
+    def metadata_index(self):
+        return self.metadata / "evidence_index.sqlite"
+
+    @property
+    def web_opt(self):
+        return self.root / "02-WEB-OPTIMIZED"
+
+    @property
+    def website_output(self):
+        return self.root / "03-WEBSITE-OUTPUT"
+
+    @property
+    def state_dir(self):
+        return self.root / ".pipeline-state"
+
+    def render_fingerprint(self):
+        """Digest of every setting that changes rendered output"""
+        settings = {name: getattr(self, name) for name in RENDER_SETTINGS}
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def max_pages(self, file_size, page_count):
+        """Smart page limit for a PDF based on its size on disk"""
+        if file_size > 20 * 1024 * 1024:
+            return min(page_count, self.max_pages_huge)
+        elif file_size > 5 * 1024 * 1024:
+            return min(page_count, self.max_pages_large)
+        return min(page_count, self.max_pages_small)
@@ -0,0 +1,161 @@
+"""
+Near-duplicate photo detection with perceptual hashes.
+
+Re-saved, resized or re-compressed copies of a photo have different
+SHA-256s but nearly identical perceptual hashes. Every gallery thumbnail
+gets two 64-bit hashes, computed for a whole batch at once with NumPy:
+
+  pHash  DCT of a 32x32 grayscale; the lowest 8x8 frequencies against
+         their median
+  dHash  sign of the horizontal gradient on a 9x8 grayscale
+
+Pairs within PHASH_RADIUS bits (and confirmed by dHash) are found with a
+multi-index hash table instead of comparing every pair: the 64 bits are
+split into four 16-bit chunks, and by the pigeonhole principle a pair
+within radius r agrees on at least one chunk to within r // 4 bits. Only
+the buckets of those few chunk values are compared, which keeps 100k
+photos at roughly linear cost. Matches are merged into groups with
+union-find.
+"""
+
+import numpy as np
+
+HASH_SIZE = 8
+PHASH_INPUT = 32
+PHASH_RADIUS = 6
+DHASH_RADIUS = 10
+CHUNKS = 4
+
+_CHUNK_BITS = 64 // CHUNKS
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def hash_inputs(img):
+    """Grayscale arrays a thumbnail contributes: (32x32 for pHash, 8x9 for dHash)"""
+    from PIL import Image
+
+    gray = img.convert('L')
+    large = gray.resize((PHASH_INPUT, PHASH_INPUT), Image.Resampling.LANCZOS)
+    small = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    return np.asarray(large, dtype=np.float32), np.asarray(small, dtype=np.float32)
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m.astype(np.float32)
+
+
+def _pack(bits):
+    """(n, 64) booleans -> n uint64"""
+    return np.packbits(bits.reshape(len(bits), 64), axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def perceptual_hashes(inputs):
+    """pHash and dHash (uint64 arrays) for a list of hash_inputs() results"""
+    if not inputs:
+        return np.zeros(0, np.uint64), np.zeros(0, np.uint64)
+    large = np.stack([i[0] for i in inputs])
+    small = np.stack([i[1] for i in inputs])
+
+    dct = _dct_matrix(PHASH_INPUT)
+    low = (dct @ large @ dct.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(inputs), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)  # DC term left out of the median
+    phash = _pack(low > median)
+    dhash = _pack(small[:, :, 1:] > small[:, :, :-1])
+    return phash, dhash
+
+
+def popcount(values):
+    """Set bits of every uint64"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _POPCOUNT8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _flip_masks(radius):
+    """All chunk XOR masks with at most radius bits set"""
+    masks = [0]
+    for _ in range(radius):
+        masks = sorted({m | (1 << b) for m in masks for b in range(_CHUNK_BITS)} | set(masks))
+    return np.array(masks, dtype=np.uint64)
+
+
+def near_duplicate_pairs(phash, dhash, radius=PHASH_RADIUS, dhash_radius=DHASH_RADIUS):
+    """Index pairs (i < j) within radius bits on pHash and dhash_radius on dHash"""
+    n = len(phash)
+    found_i, found_j = [], []
+    masks = _flip_masks(radius // CHUNKS)
+    for chunk in range(CHUNKS):
+        values = (phash >> np.uint64(chunk * _CHUNK_BITS)) & np.uint64((1 << _CHUNK_BITS) - 1)
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        for mask in masks:
+            probe = values ^ mask
+            lo = np.searchsorted(sorted_values, probe, 'left')
+            hi = np.searchsorted(sorted_values, probe, 'right')
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Expand every item's bucket into (item, candidate) pairs
+            left = np.repeat(np.arange(n), counts)
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            right = order[starts + np.arange(total)]
+            keep = left < right
+            left, right = left[keep], right[keep]
+            keep = ((popcount(phash[left] ^ phash[right]) <= radius)
+                    & (popcount(dhash[left] ^ dhash[right]) <= dhash_radius))
+            found_i.append(left[keep])
+            found_j.append(right[keep])
+    if not found_i:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    pairs = np.unique(np.stack([np.concatenate(found_i), np.concatenate(found_j)], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def group_near_duplicates(phash, dhash, radius=PHASH_RADIUS, dhash_radius=DHASH_RADIUS):
+    """Group id per item (-1 when it has no near-duplicate); ids start at 1"""
+    parent = list(range(len(phash)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*near_duplicate_pairs(phash, dhash, radius, dhash_radius)):
+        ri, rj = find(int(i)), find(int(j))
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    roots = [find(i) for i in range(len(phash))]
+    sizes = {}
+    for root in roots:
+        sizes[root] = sizes.get(root, 0) + 1
+    ids = {}
+    groups = []
+    for root in roots:
+        if sizes[root] < 2:
+            groups.append(-1)
+        else:
+            groups.append(ids.setdefault(root, len(ids) + 1))
+    return groups
+
+
+def assign_duplicate_groups(records):
+    """Set 'dupGroup' on gallery records with near-duplicates.
+
+    Consumes the 'pHash'/'dHash' hex fields Stage 3 attaches to each
+    thumbnail record. Returns the number of groups.
+    """
+    hashed = [r for r in records if 'pHash' in r]
+    phash = np.array([int(r.pop('pHash'), 16) for r in hashed], dtype=np.uint64)
+    dhash = np.array([int(r.pop('dHash'), 16) for r in hashed], dtype=np.uint64)
+    groups = group_near_duplicates(phash, dhash)
+    for record, group in zip(hashed, groups):
+        if group > 0:
+            record['dupGroup'] = group
+    return max(groups, default=0) if groups else 0
@@ -0,0 +1,7 @@
+"""
+Exceptions raised by the pipeline stages.
+"""
+
+
+class StageError(Exception):
+    """A stage could not run (e.g. no evidence to process)"""
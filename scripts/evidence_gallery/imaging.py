@@ -0,0 +1,158 @@
+"""
+Image helpers shared by the web-optimization and website stages.
+"""
+
+import base64
+import io
+import os
+
+from PIL import Image
+
+from . import memory
+
+SUPPORTED_FORMATS = ['JPEG', 'PNG', 'HEIC']
+
+
+def to_rgb(img):
+    """Flatten transparency onto white and convert to RGB"""
+    if img.mode == 'RGBA':
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[3])
+        return rgb_img
+    elif img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+STRIP_ROWS = 1024  # output rows per resize strip
+
+
+def scaled_size(size, percent):
+    """Size of an image scaled by a fraction (unchanged if percent >= 1)"""
+    if percent >= 1.0:
+        return size
+    return (int(size[0] * percent), int(size[1] * percent))
+
+
+def fit_size(size, box):
+    """Largest size within box with the same aspect ratio (never upscales)"""
+    scale = min(box[0] / size[0], box[1] / size[1], 1.0)
+    return (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+
+
+def reduce_on_decode(img, size):
+    """Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding.
+
+    Picks the strongest reduction that still covers size, so a 200 MP
+    photo is never materialized at full resolution. Must be called before
+    the image is loaded. Returns the source box to hand to resize_strips
+    (None for formats that decode at full size).
+    """
+    result = img.draft(None, size)
+    return result[1] if result else None
+
+
+def decode_footprint(img, size):
+    """Rough peak bytes to decode img (at its drafted size) and resize it to size"""
+    return (img.width * img.height + 2 * size[0] * size[1]) * 4  # Pillow keeps 4 bytes/pixel
+
+
+def resize_strips(img, size, box=None, strip_rows=STRIP_ROWS):
+    """LANCZOS resize done one strip of output rows at a time.
+
+    A single resize keeps a (new width x full height) intermediate alive;
+    going strip by strip caps that at one strip. The filter still reads
+    source rows across strip edges, so the result matches a single resize
+    (to within rounding).
+    """
+    box = box or (0, 0, img.width, img.height)
+    if img.size == size and box == (0, 0, img.width, img.height):
+        return img
+    if size[1] <= strip_rows or img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        return img.resize(size, Image.Resampling.LANCZOS, box=box)
+
+    left, top, right, bottom = box
+    rows_per_out = (bottom - top) / size[1]
+    out = Image.new(img.mode, size)
+    for y in range(0, size[1], strip_rows):
+        rows = min(strip_rows, size[1] - y)
+        strip_box = (left, top + y * rows_per_out, right, top + (y + rows) * rows_per_out)
+        out.paste(img.resize((size[0], rows), Image.Resampling.LANCZOS, box=strip_box), (0, y))
+    return out
+
+
+def load_scaled(img, size, thumbnail=False):
+    """Decode an opened image straight down to size, within the RAM budget.
+
+    The decoded source is released before returning, so only the scaled
+    copy stays alive. Thumbnails decode at up to twice their size first
+    (like Image.thumbnail) to keep the downscale sharp.
+    """
+    draft_to = (size[0] * 2, size[1] * 2) if thumbnail else size
+    box = reduce_on_decode(img, draft_to)
+    with memory.reserve(decode_footprint(img, size)):
+        img.load()
+        scaled = resize_strips(img, size, box)
+        if scaled is not img:
+            img.close()
+        return scaled
+
+
+def encode_jpeg(img, quality):
+    """Encode an RGB image as optimized JPEG bytes"""
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def save_bytes(data, path):
+    """Write encoded image bytes atomically and return their size"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def save_jpeg(img, path, quality):
+    """Write a JPEG atomically (temp file + rename) and return its size.
+
+    An interrupted run can never leave a truncated file under the final name.
+    """
+    tmp = f"{path}.tmp"
+    img.save(tmp, format='JPEG', quality=quality, optimize=True)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def jpeg_data_uri(jpeg_bytes):
+    """Wrap JPEG bytes in a base64 data URI"""
+    return "data:image/jpeg;base64," + base64.b64encode(jpeg_bytes).decode('ascii')
+
+
+def image_type(data):
+    """MIME type of JPEG or PNG bytes"""
+    return "image/png" if data.startswith(b'\x89PNG') else "image/jpeg"
+
+
+def image_extension(data):
+    return ".png" if data.startswith(b'\x89PNG') else ".jpg"
+
+
+def image_data_uri(data):
+    """Wrap JPEG or PNG bytes in a base64 data URI"""
+    return f"data:{image_type(data)};base64," + base64.b64encode(data).decode('ascii')
+
+
+def image_from_data_uri(data_uri):
+    """Decode a base64 data URI (as made by jpeg_data_uri) to a PIL image"""
+    return Image.open(io.BytesIO(base64.b64decode(data_uri.split(',', 1)[1])))
+
+
+def render_pdf_page(page, dpi):
+    """Rasterize a PyMuPDF page to a PIL image at the given DPI"""
+    import fitz
+
+    mat = fitz.Matrix(dpi/72, dpi/72)
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
@@ -0,0 +1,451 @@
+"""
+On-demand portal server (scripts/serve.py --live).
+
+Serves the portal straight from the evidence sources, with no Stage 2/3
+build. Startup only lists the source folders (off the event loop) and
+takes each PDF's page count from Stage 1's documents_metadata.csv where
+it is current; the portal is served as soon as that is done. PDFs
+without a current row are opened in the background and join the portal
+once counted. Every thumbnail, web-size image and document page (and
+its low-resolution preview) is then rendered on its first request, by
+the same PIL/PyMuPDF code as Stage 3. Renditions are kept in a bounded
+on-disk cache (.pipeline-state/live-cache/), which evicts the least
+recently used files first.
+
+An asyncio front end parses HTTP and answers from memory or the cache.
+Renders run in a process pool. Concurrent requests for the same
+rendition share one render.
+
+The timeline works as in a built portal. Search and near-duplicate
+grouping need Stage 3's full pass over every item, so they are not
+available in this mode.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import unquote, urlsplit
+
+from . import memory
+from .checkpoint import file_stamp
+from .imaging import image_type
+from .metadata_index import MetadataIndex
+from .page_render import page_size, render_preview
+from .pdf_metadata import load_table, lookup, pdf_metadata
+from .scanner import list_documents, list_files
+from .sources import default_sources
+from .time_index import write_time_index
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+OPEN_PDFS = 8  # documents each worker keeps open for paging through them
+
+_open_pdfs = OrderedDict()
+
+
+def _pdf(path):
+    """Worker-side cache of open PDFs (page-by-page browsing reuses them)"""
+    import fitz
+
+    stamp = tuple(file_stamp(path))
+    cached = _open_pdfs.get(path)
+    if cached and cached[0] == stamp:
+        _open_pdfs.move_to_end(path)
+        return cached[1]
+    if cached:
+        cached[1].close()
+    pdf = fitz.open(path)
+    _open_pdfs[path] = (stamp, pdf)
+    while len(_open_pdfs) > OPEN_PDFS:
+        _open_pdfs.popitem(last=False)[1][1].close()
+    return pdf
+
+
+def document_info(path):
+    """(page count, PDF metadata) of one document (runs in a worker)"""
+    try:
+        pdf = _pdf(path)
+        return pdf.page_count, pdf.metadata
+    except Exception as e:
+        print(f"  ❌ Error opening {os.path.basename(path)}: {e}")
+        return None
+
+
+def page_sizes(path, count, dpi):
+    """[(width, height)] of a document's first count pages rendered at dpi (runs in a worker)"""
+    pdf = _pdf(path)
+    return [page_size(pdf[n], dpi) for n in range(count)]
+
+
+def render_rendition(kind, path, page, config):
+    """JPEG bytes of one rendition (runs in a worker); None if it cannot be made"""
+    from .website import pdf_page_jpeg, thumbnail_jpeg, web_image_jpeg
+
+    if kind == 'thumb':
+        return thumbnail_jpeg(path, quality=config.thumbnail_quality, size=config.thumbnail_size)
+    if kind == 'image':
+        return web_image_jpeg(path, quality=config.image_jpeg_quality,
+                              resize_percent=config.image_resize_percent)[0]
+    if kind == 'preview':
+        return pdf_page_jpeg(_pdf(path), 0, quality=config.pdf_thumbnail_quality,
+                             dpi=config.pdf_thumbnail_dpi)[0]
+    if kind == 'page-preview':
+        try:
+            return render_preview(_pdf(path)[page], config.page_preview_dpi, config.page_preview_quality,
+                                  config.adaptive_pages)[0]
+        except Exception:
+            return None
+    return pdf_page_jpeg(_pdf(path), page, quality=config.document_jpeg_quality, dpi=config.document_dpi,
+                         adaptive=config.adaptive_pages)[0]
+
+
+class RenditionCache:
+    """Files in one folder, capped at limit_bytes; least recently used go first"""
+
+    def __init__(self, directory, limit_bytes):
+        self.directory = directory
+        self.limit = limit_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        self._files = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self.size = sum(self._files.values())
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # recency survives restarts
+            return data
+        except OSError:
+            with self._lock:
+                self.size -= self._files.pop(name, 0)
+            return None
+
+    def put(self, name, data):
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        evicted = []
+        with self._lock:
+            self.size += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self.size > self.limit and len(self._files) > 1:
+                old, old_size = self._files.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+
+class LivePortal:
+    """Catalog of the sources plus rendition scheduling"""
+
+    def __init__(self, config, sources):
+        self.config = config
+        self.sources = sources
+        self.fingerprint = config.render_fingerprint()
+        self.cache = RenditionCache(str(config.state_dir / "live-cache"), config.live_cache_mb * 1024 * 1024)
+        memory.ensure(config.memory_budget_mb)
+        self.pool = ProcessPoolExecutor(max_workers=config.workers or os.cpu_count() or 1,
+                                        initializer=memory.install, initargs=(memory.current(),))
+        self.pending = {}
+        self.images = []     # [(path, thumbnail record, images-data record)]
+        self.documents = []  # [(path, thumbnail record, metadata record)]
+        self.responses = {}  # static path -> (content type, body, gzipped body)
+        self.ready = None
+
+    async def build_catalog(self):
+        """List the sources (in a thread) and publish the portal. Documents
+        whose page count is not in Stage 1's documents_metadata.csv join it
+        once their PDFs have been opened in the pool (see count_pages)."""
+        from .website import sort_thumbs
+
+        images, docs = await asyncio.to_thread(self._list_sources)
+        images.sort(key=lambda item: sort_thumbs(item[1]))
+        for i, (_, thumb, full) in enumerate(images):
+            thumb['thumbnail'] = f"r/thumb/{i}"
+            full['dataUri'] = f"r/image/{i}"
+        self.images = images
+        self._add_documents([doc for doc in docs if doc[4]])
+        await asyncio.to_thread(self._build_responses)
+        return [doc for doc in docs if not doc[4]]
+
+    async def count_pages(self, docs):
+        """Open the PDFs build_catalog() could not count in the pool, then
+        publish the portal again with them"""
+        if not docs:
+            return 0
+        loop = asyncio.get_running_loop()
+        infos = await asyncio.gather(*(loop.run_in_executor(self.pool, document_info, doc[0]) for doc in docs))
+        self._add_documents([doc[:4] + (info,) for doc, info in zip(docs, infos) if info])
+        await asyncio.to_thread(self._build_responses)
+        return len(docs)
+
+    def _list_sources(self):
+        """([(path, thumbnail record, images-data record)], [(path, file name,
+        agency, size, (page count, metadata) or None)]) of every source"""
+        from .website import image_record
+
+        # Stage 1's documents_metadata.csv saves opening each PDF for its page count
+        table = load_table(self.config)
+        images, docs = [], []
+        for source in self.sources:
+            metadata_map = self._image_metadata(source)
+            for image_dir in source.image_dirs:
+                for path, filename in list_files(image_dir, self.config.io_depth, IMAGE_EXTENSIONS):
+                    meta = metadata_map.get(filename, {})
+                    thumb = {'FileName': filename, 'Agency': source.name,
+                             'DateTimeOriginal': meta.get('DateTimeOriginal', 'Unknown')}
+                    images.append((path, thumb, image_record(filename, source.name, meta, None)))
+            for doc_dir in source.document_dirs:
+                for path, filename in list_documents(doc_dir, self.config.io_depth):
+                    try:
+                        stamp = file_stamp(path)
+                    except OSError:
+                        continue
+                    row = lookup(table, path, stamp)
+                    info = (int(row['PageCount']), pdf_metadata(row)) if row else None
+                    docs.append((path, filename, source.name, stamp[0], info))
+        return images, docs
+
+    def _add_documents(self, docs):
+        """Append documents to the catalog. A document's number (in its
+        preview and page URLs) is its place in self.documents, which only
+        grows, so pages already served keep pointing at the same files."""
+        from .website import document_records
+
+        for path, filename, agency, file_size, (page_count, metadata) in docs:
+            max_pages = self.config.max_pages(file_size, page_count)
+            thumb, meta = document_records(filename, agency, page_count, max_pages, metadata, file_size,
+                                           None, None)
+            d = len(self.documents)
+            thumb['preview'] = f"r/preview/{d}"
+            thumb['pagesUrl'] = f"documents/{d}.json"
+            self.documents.append((path, thumb, meta))
+
+    def _image_metadata(self, source):
+        exif_csv = source.exif_csv
+        with MetadataIndex(self.config.metadata_index) as index:
+            if exif_csv and os.path.exists(exif_csv):
+                index.import_exif_csv(exif_csv, source.name, source.image_dirs)
+            return index.image_metadata(source.name)
+
+    def _build_responses(self):
+        from .website import render_portal_html, sort_doc_thumbs
+
+        documents = sorted((thumb for _, thumb, _ in self.documents), key=sort_doc_thumbs)
+        thumbnails = {'images': [thumb for _, thumb, _ in self.images], 'documents': documents}
+        total_pages = sum(thumb['maxPages'] for _, thumb, _ in self.documents)
+        html = render_portal_html(thumbnails, [s.name for s in self.sources], total_pages,
+                                  self.config.prefetch_items, self.config.cached_pages)
+        bodies = {
+            'index.html': ('text/html; charset=utf-8', html.encode('utf-8')),
+            'images-data.json': ('application/json', json.dumps([full for _, _, full in self.images],
+                                                                ensure_ascii=False).encode('utf-8')),
+            'thumbnails-data.json': ('application/json', json.dumps(thumbnails, ensure_ascii=False).encode('utf-8')),
+        }
+        timeline_dir = self.config.state_dir / "live-timeline"
+        write_time_index(thumbnails['images'], thumbnails['documents'], timeline_dir)
+        for name in os.listdir(timeline_dir):
+            with open(timeline_dir / name, 'rb') as f:
+                bodies[f"timeline/{name}"] = ('application/json', f.read())
+        # Page lists already served stay: document numbers do not change
+        page_lists = {path: response for path, response in self.responses.items() if path.startswith('documents/')}
+        self.responses = {**page_lists, **{path: (content_type, body, gzip.compress(body, compresslevel=6))
+                                           for path, (content_type, body) in bodies.items()}}
+
+    async def page_list(self, index):
+        """Serve documents/<index>.json (opening the PDF once for its page
+        sizes); False for an unknown document, None if it cannot be read"""
+        path = f"documents/{index}.json"
+        if path in self.responses:
+            return True
+        if not 0 <= index < len(self.documents):
+            return False
+        source_path, thumb, meta = self.documents[index]
+        loop = asyncio.get_running_loop()
+        try:
+            sizes = await loop.run_in_executor(self.pool, page_sizes, source_path, thumb['maxPages'],
+                                               self.config.document_dpi)
+        except Exception:
+            return None
+        pages = [{'pageNumber': p + 1, 'width': width, 'height': height,
+                  'preview': f"r/page-preview/{index}/{p}", 'src': f"r/page/{index}/{p}", 'words': []}
+                 for p, (width, height) in enumerate(sizes)]
+        body = json.dumps({'metadata': meta, 'pages': pages}, ensure_ascii=False).encode('utf-8')
+        self.responses[path] = ('application/json', body, gzip.compress(body, compresslevel=6))
+        return True
+
+    def rendition_key(self, kind, index, page=0):
+        """(cache file name, source path), or None for an unknown item"""
+        items = self.images if kind in ('thumb', 'image') else self.documents
+        if not 0 <= index < len(items):
+            return None
+        path = items[index][0]
+        if kind in ('page', 'page-preview') and not 0 <= page < items[index][1]['maxPages']:
+            return None
+        stamp = file_stamp(path)
+        digest = hashlib.sha256(json.dumps([kind, path, stamp, page, self.fingerprint]).encode()).hexdigest()
+        return f"{digest[:32]}.jpg", path
+
+    async def rendition(self, kind, name, path, page=0):
+        """JPEG bytes from the cache, rendering once however many ask"""
+        data = await asyncio.to_thread(self.cache.get, name)
+        if data is not None:
+            return data
+        task = self.pending.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._render(kind, name, path, page))
+            self.pending[name] = task
+            task.add_done_callback(lambda _: self.pending.pop(name, None))
+        return await asyncio.shield(task)  # a client hanging up does not cancel it for the others
+
+    async def _render(self, kind, name, path, page):
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self.pool, render_rendition, kind, path, page, self.config)
+        if data:
+            await asyncio.to_thread(self.cache.put, name, data)
+        return data
+
+
+class LiveServer:
+    """Minimal HTTP/1.1 front end (GET/HEAD, keep-alive) for a LivePortal"""
+
+    def __init__(self, portal, quiet=False):
+        self.portal = portal
+        self.quiet = quiet
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                        f"Date: {formatdate(usegmt=True)}",
+                        f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in response_headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not self.quiet:
+                    print(f"{method} {target} {status.value}")
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'Allow': 'GET, HEAD'}, b''
+        await asyncio.shield(self.portal.ready)
+        path = unquote(urlsplit(target).path).lstrip('/') or 'index.html'
+
+        name = path.partition('/')[2]
+        if path.startswith('documents/') and name.endswith('.json') and name[:-5].isdigit():
+            found = await self.portal.page_list(int(name[:-5]))
+            if found is None:
+                return HTTPStatus.UNPROCESSABLE_ENTITY, {'Content-Type': 'text/plain'}, b"Cannot read this document"
+
+        if path in self.portal.responses:
+            content_type, body, gzipped = self.portal.responses[path]
+            response_headers = {'Content-Type': content_type, 'Cache-Control': 'no-cache',
+                                'Vary': 'Accept-Encoding'}
+            if 'gzip' in headers.get('accept-encoding', ''):
+                response_headers['Content-Encoding'] = 'gzip'
+                body = gzipped
+            return HTTPStatus.OK, response_headers, body
+
+        parts = path.split('/')
+        if len(parts) in (3, 4) and parts[0] == 'r' and all(p.isdigit() for p in parts[2:]):
+            kind, index = parts[1], int(parts[2])
+            page = int(parts[3]) if len(parts) == 4 else 0
+            if kind in ('thumb', 'image', 'preview') and len(parts) == 3 or \
+                    kind in ('page', 'page-preview') and len(parts) == 4:
+                key = self.portal.rendition_key(kind, index, page)
+                if key:
+                    name, source_path = key
+                    etag = f'"{name[:-4]}"'
+                    cache_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+                    if etag in headers.get('if-none-match', ''):
+                        return HTTPStatus.NOT_MODIFIED, cache_headers, b''
+                    data = await self.portal.rendition(kind, name, source_path, page)
+                    if data:
+                        return HTTPStatus.OK, {'Content-Type': image_type(data), **cache_headers}, data
+                    return HTTPStatus.UNPROCESSABLE_ENTITY, {'Content-Type': 'text/plain'}, b"Cannot render this item"
+
+        return HTTPStatus.NOT_FOUND, {'Content-Type': 'text/plain'}, b"Not found"
+
+
+async def _count_pages(portal, docs):
+    if await portal.count_pages(docs):
+        print(f"  ✅ Catalog: {len(portal.documents)} documents (reload the portal to see them all)")
+
+
+async def _serve_live(config, host, port, quiet):
+    sources = config.sources or default_sources(config)
+    portal = LivePortal(config, sources)
+    portal.ready = asyncio.ensure_future(portal.build_catalog())
+    server = await asyncio.start_server(LiveServer(portal, quiet).handle, host, port)
+    shown_host = "localhost" if host in ("127.0.0.1", "0.0.0.0", "::") else host
+    print(f"Serving {len(sources)} source(s) on demand (cache: {portal.cache.directory}, "
+          f"{portal.cache.size / (1024 * 1024):.0f} of {config.live_cache_mb} MB used)")
+    print(f"Open: http://{shown_host}:{port}/index.html")
+    print("Press Ctrl-C to stop")
+
+    uncounted = await portal.ready
+    print(f"  ✅ Catalog: {len(portal.images)} images, {len(portal.documents)} documents"
+          + (f" ({len(uncounted)} more being opened for their page counts)" if uncounted else ""))
+    counting = asyncio.ensure_future(_count_pages(portal, uncounted))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        counting.cancel()
+        portal.pool.shutdown(cancel_futures=True)
+
+
+def serve_live(config, host="127.0.0.1", port=8000, quiet=False):
+    """Serve the portal rendered on demand from the sources until interrupted"""
+    try:
+        asyncio.run(_serve_live(config, host, port, quiet))
+    except KeyboardInterrupt:
+        print("\nStopped")
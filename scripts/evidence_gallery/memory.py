@@ -0,0 +1,73 @@
+"""
+RAM budget shared by every worker process of a run.
+
+With --memory-budget MB, each large decode first reserves its estimated
+peak footprint (see imaging.decode_footprint). A worker whose reservation
+would push the total over the budget waits until others release theirs,
+so concurrent workers together stay under the budget. An item larger
+than the whole budget still runs, but alone, so nothing deadlocks.
+
+Stage 2's read-ahead buffers (parallel_io.read_ahead) get a fixed share
+set aside from the budget rather than reservations: a queued buffer
+waiting for a decode that waits for budget would never be freed.
+
+Without a budget, reserve() is a no-op.
+"""
+
+import contextlib
+import multiprocessing
+
+_budget = None
+
+
+class MemoryBudget:
+    """Byte counter + condition variable that worker processes can share"""
+
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self._used = multiprocessing.Value('q', 0, lock=False)
+        self._cond = multiprocessing.Condition()
+
+    @contextlib.contextmanager
+    def reserve(self, nbytes):
+        nbytes = min(nbytes, self.limit)  # oversized items wait for an empty budget
+        with self._cond:
+            self._cond.wait_for(lambda: self._used.value + nbytes <= self.limit)
+            self._used.value += nbytes
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._used.value -= nbytes
+                self._cond.notify_all()
+
+
+def reserve(nbytes):
+    """Hold nbytes of the run's budget for the enclosed block"""
+    if _budget is None:
+        return contextlib.nullcontext()
+    return _budget.reserve(nbytes)
+
+
+def ensure(limit_mb, set_aside=0):
+    """Set up the run's budget in the main process (kept if the limit is
+    unchanged; none without limit_mb, so a reused process does not keep
+    an earlier run's budget). set_aside bytes of it are left out for
+    buffers held elsewhere."""
+    global _budget
+    limit = limit_mb * 1024 * 1024 - set_aside if limit_mb else None
+    if not limit:
+        _budget = None
+    elif _budget is None or _budget.limit != limit:
+        _budget = MemoryBudget(limit)
+
+
+def current():
+    """The budget to hand to worker processes (None without one)"""
+    return _budget
+
+
+def install(budget):
+    """ProcessPoolExecutor initializer: share the parent's budget"""
+    global _budget
+    _budget = budget
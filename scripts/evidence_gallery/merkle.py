@@ -0,0 +1,278 @@
+"""
+Merkle tree over the vault's file hashes.
+
+Stage 1 keeps two files next to checksums.txt:
+
+  metadata/merkle_leaves.txt    "<sha256>  <category>/<path>" per vault
+                                file, in leaf order (files are appended
+                                as they first enter the vault; never
+                                reordered, dropped when they leave
+                                checksums.txt)
+  metadata/merkle_frontier.json tree size, root hash and the roots of the
+                                perfect subtrees on the right edge
+
+The root hash goes into VAULT_MANIFEST.txt. The tree follows RFC 6962 /
+9162 (Certificate Transparency): leaf = SHA-256(0x00 || name || 0x00 ||
+file hash), node = SHA-256(0x01 || left || right), and a tree of n leaves
+splits at the largest power of two below n. Each leaf binds a file's name
+to its content.
+
+  - The leaves are exactly the files of the current checksums.txt, so the
+    root describes the vault as it is now.
+  - Appending evidence only touches the frontier: O(log n) hashes per file.
+    A changed or removed file rebuilds the tree: O(n) hashes.
+  - An inclusion proof for one file is log2(n) hashes. With the root from
+    the manifest, it proves that file without the rest of the list
+    (verify_inclusion).
+  - Two vault copies are compared by descending only into subtrees whose
+    hashes differ (differing_leaves).
+"""
+
+import hashlib
+import json
+import os
+
+MERKLE_VERSION = 1
+LEAVES_FILE = "merkle_leaves.txt"
+FRONTIER_FILE = "merkle_frontier.json"
+EMPTY_ROOT = hashlib.sha256(b'').digest()
+
+
+def leaf_hash(checksum, name):
+    """Leaf for one file: its name bound to its SHA-256 (hex)"""
+    return hashlib.sha256(b'\x00' + name.encode('utf-8') + b'\x00' + bytes.fromhex(checksum)).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def _split(n):
+    """Largest power of two below n (n > 1)"""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleFrontier:
+    """Append-only tree state: the roots of its perfect right-edge subtrees"""
+
+    def __init__(self, size=0, frontier=()):
+        self.size = size
+        self.frontier = list(frontier)  # [(height, hash)], heights decreasing
+
+    def append(self, leaf):
+        height, node = 0, leaf
+        while self.frontier and self.frontier[-1][0] == height:
+            node = node_hash(self.frontier.pop()[1], node)
+            height += 1
+        self.frontier.append((height, node))
+        self.size += 1
+
+    def root(self):
+        if not self.frontier:
+            return EMPTY_ROOT
+        root = self.frontier[-1][1]
+        for _, node in reversed(self.frontier[:-1]):
+            root = node_hash(node, root)
+        return root
+
+
+class MerkleTree:
+    """Every level of the tree, for proofs and comparisons"""
+
+    def __init__(self, leaves):
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            below = self.levels[-1]
+            self.levels.append([node_hash(below[i], below[i + 1]) for i in range(0, len(below) - 1, 2)])
+
+    @property
+    def size(self):
+        return len(self.levels[0])
+
+    def subtree(self, start, end):
+        """Hash of leaves [start, end), as the tree over just those leaves"""
+        n = end - start
+        if n == 0:
+            return EMPTY_ROOT
+        if n & (n - 1) == 0 and start % n == 0:
+            return self.levels[n.bit_length() - 1][start // n]  # stored perfect subtree
+        k = _split(n)
+        return node_hash(self.subtree(start, start + k), self.subtree(start + k, end))
+
+    def root(self):
+        return self.subtree(0, self.size)
+
+    def inclusion_proof(self, index):
+        """Sibling hashes from leaf index up to the root"""
+        path = []
+        start, end = 0, self.size
+        while end - start > 1:
+            k = _split(end - start)
+            if index < start + k:
+                path.append(self.subtree(start + k, end))
+                end = start + k
+            else:
+                path.append(self.subtree(start, start + k))
+                start += k
+        return path[::-1]
+
+
+def verify_inclusion(leaf, index, size, path, root):
+    """True if path proves leaf is leaf number index of the tree of the
+    given size with this root (RFC 9162, 2.1.3.2)"""
+    if index >= size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for sibling in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(sibling, r)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def differing_leaves(a, b):
+    """Leaf indexes where two trees differ, visiting only differing subtrees.
+    Leaves past the smaller tree's size are all reported."""
+    shared = min(a.size, b.size)
+    found = []
+
+    def walk(start, end):
+        if a.subtree(start, end) == b.subtree(start, end):
+            return
+        if end - start == 1:
+            found.append(start)
+            return
+        k = _split(end - start)
+        walk(start, start + k)
+        walk(start + k, end)
+
+    if shared:
+        walk(0, shared)
+    return found + list(range(shared, max(a.size, b.size)))
+
+
+def read_leaves(metadata_dir):
+    """[(sha256, file name)] in leaf order ([] if there is no tree yet)"""
+    try:
+        with open(os.path.join(metadata_dir, LEAVES_FILE), 'r') as f:
+            return [tuple(line.rstrip('\n').split('  ', 1)) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def load_tree(metadata_dir):
+    """(MerkleTree, [(sha256, file name)]) of a vault's metadata folder"""
+    entries = read_leaves(metadata_dir)
+    return MerkleTree(leaf_hash(checksum, name) for checksum, name in entries), entries
+
+
+def _load_frontier(metadata_dir, entries):
+    try:
+        with open(os.path.join(metadata_dir, FRONTIER_FILE), 'r') as f:
+            data = json.load(f)
+        if data['version'] == MERKLE_VERSION and data['size'] == len(entries):
+            return MerkleFrontier(data['size'], [(h, bytes.fromhex(node)) for h, node in data['frontier']])
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    frontier = MerkleFrontier()  # missing or out of step with the leaves: rebuild
+    for checksum, name in entries:
+        frontier.append(leaf_hash(checksum, name))
+    return frontier
+
+
+def _write_frontier(metadata_dir, frontier):
+    path = os.path.join(metadata_dir, FRONTIER_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'version': MERKLE_VERSION, 'size': frontier.size, 'root': frontier.root().hex(),
+                   'frontier': [[h, node.hex()] for h, node in frontier.frontier]}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def update_tree(metadata_dir, checksums):
+    """Make the vault's tree hold exactly these (sha256, file name) pairs.
+    New files are appended; if a file already in the tree has a different
+    hash, or is no longer listed, the tree is rebuilt with the remaining
+    leaves in their order. Returns a summary dict with the root (hex)."""
+    entries = read_leaves(metadata_dir)
+    frontier = _load_frontier(metadata_dir, entries)
+    current = {name: checksum for checksum, name in checksums}
+
+    removed = [name for _, name in entries if name not in current]
+    if removed:
+        entries = [(checksum, name) for checksum, name in entries if name in current]
+    position = {name: i for i, (_, name) in enumerate(entries)}
+
+    changed = []
+    added = []
+    for name, checksum in sorted(current.items()):
+        i = position.get(name)
+        if i is None:
+            position[name] = len(entries) + len(added)
+            added.append((checksum, name))
+        elif entries[i][0] != checksum:
+            entries[i] = (checksum, name)
+            changed.append(name)
+
+    leaves_path = os.path.join(metadata_dir, LEAVES_FILE)
+    if changed or removed:
+        entries += added
+        tmp = f"{leaves_path}.tmp"
+        with open(tmp, 'w') as f:
+            f.writelines(f"{checksum}  {name}\n" for checksum, name in entries)
+        os.replace(tmp, leaves_path)
+        frontier = MerkleFrontier()
+        for checksum, name in entries:
+            frontier.append(leaf_hash(checksum, name))
+    else:
+        with open(leaves_path, 'a') as f:
+            f.writelines(f"{checksum}  {name}\n" for checksum, name in added)
+        for checksum, name in added:
+            frontier.append(leaf_hash(checksum, name))
+    _write_frontier(metadata_dir, frontier)
+
+    return {'root': frontier.root().hex(), 'size': frontier.size, 'added': len(added), 'changed': changed,
+            'removed': removed}
+
+
+def read_root(metadata_dir):
+    """(root hex, size) recorded for a vault, or None"""
+    try:
+        with open(os.path.join(metadata_dir, FRONTIER_FILE), 'r') as f:
+            data = json.load(f)
+        return data['root'], data['size']
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def inclusion_proof(metadata_dir, name):
+    """Self-contained JSON-ready proof that one file is in the vault's tree"""
+    tree, entries = load_tree(metadata_dir)
+    index = next((i for i, (_, entry) in enumerate(entries) if entry == name), None)
+    if index is None:
+        return None
+    return {
+        'version': MERKLE_VERSION,
+        'file': name,
+        'sha256': entries[index][0],
+        'index': index,
+        'size': tree.size,
+        'path': [node.hex() for node in tree.inclusion_proof(index)],
+        'root': tree.root().hex(),
+    }
+
+
+def check_proof(proof, checksum=None, root=None):
+    """True if the proof holds for its file hash (or checksum, e.g. freshly
+    computed) against its root (or root, e.g. from the manifest)"""
+    return verify_inclusion(leaf_hash(checksum or proof['sha256'], proof['file']), proof['index'],
+                            proof['size'], [bytes.fromhex(node) for node in proof['path']],
+                            bytes.fromhex(root or proof['root']))
@@ -0,0 +1,218 @@
+"""
+Persistent metadata index: 01-EVIDENCE-VAULT/metadata/evidence_index.sqlite
+
+One row per evidence file (agency, kind, file name), holding its size,
+SHA-256, typed capture/creation time, camera make/model and every
+EXIF/PDF field as JSON. Stage 1 records the vault's checksums and EXIF;
+Stage 3 imports each source's exiftool CSV (skipped while the CSV is
+unchanged) and the PDF metadata it reads anyway.
+
+Timestamps are stored as ISO-8601 text ("2023-05-01T14:03:22", wall
+clock as recorded), so they sort and compare correctly; unknown dates
+are NULL and sort last. For tooling:
+
+    with MetadataIndex(config.metadata_index) as index:
+        index.query(agency="El Paso PD", make="Apple", since="2023-01-01")
+
+or plain `sqlite3 evidence_index.sqlite "SELECT ..."`.
+"""
+
+import csv
+import json
+import os
+import posixpath
+import re
+import sqlite3
+from pathlib import Path, PurePath
+
+from .checkpoint import file_stamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id        INTEGER PRIMARY KEY,
+    agency    TEXT NOT NULL,
+    kind      TEXT NOT NULL,             -- image | document | video
+    file_name TEXT NOT NULL,
+    size      INTEGER,
+    sha256    TEXT,
+    taken_at  TEXT,                      -- ISO-8601, NULL if unknown
+    make      TEXT,
+    model     TEXT,
+    fields    TEXT NOT NULL DEFAULT '{}', -- all EXIF/PDF fields (JSON)
+    UNIQUE (agency, kind, file_name)
+);
+CREATE INDEX IF NOT EXISTS files_taken_at ON files (taken_at);
+CREATE INDEX IF NOT EXISTS files_camera ON files (make, model);
+CREATE INDEX IF NOT EXISTS files_agency ON files (agency, kind);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+
+CREATE TABLE IF NOT EXISTS imports (
+    agency   TEXT PRIMARY KEY,
+    csv_path TEXT NOT NULL,
+    stamp    TEXT NOT NULL
+);
+"""
+
+# First populated EXIF tag wins for taken_at
+EXIF_DATE_TAGS = ('DateTimeOriginal', 'CreateDate', 'DateTimeCreated', 'ModifyDate')
+
+QUERY_ORDERS = {
+    'taken_at': 'taken_at IS NULL, taken_at, file_name',
+    'file_name': 'file_name',
+    'size': 'size DESC',
+    'agency': 'agency, taken_at IS NULL, taken_at, file_name',
+}
+
+_TIMESTAMP = re.compile(
+    r'^(?:D:)?(\d{4})[:\-]?(\d{2})?[:\-]?(\d{2})?(?:[ T]?(\d{2}):?(\d{2})?:?(\d{2})?)?')
+
+
+def parse_timestamp(value):
+    """EXIF ("2023:05:01 14:03:22"), PDF ("D:20230501140322+02'00") or ISO
+    date text to "YYYY-MM-DDTHH:MM:SS"; None if missing or invalid"""
+    if not value or not isinstance(value, str):
+        return None
+    match = _TIMESTAMP.match(value.strip())
+    if not match:
+        return None
+    year, month, day, hour, minute, second = (int(g) if g else None for g in match.groups())
+    month, day = month or 1, day or 1
+    if year == 0 or not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}T{hour or 0:02d}:{minute or 0:02d}:{second or 0:02d}"
+
+
+def exif_key(source_file, roots=()):
+    """An exiftool SourceFile as a path relative to the image folder
+    holding it ("scene1/IMG_0001.JPG"), the name the renderers look up.
+    Absolute paths are made relative to the first of roots containing
+    them; relative ones are taken as already relative to their folder
+    (exiftool run inside it)."""
+    path = PurePath(source_file)
+    if path.is_absolute():
+        for root in roots:
+            try:
+                return path.relative_to(os.path.abspath(root)).as_posix()
+            except ValueError:
+                continue
+        return path.as_posix()
+    return posixpath.normpath(path.as_posix())
+
+
+def read_exif_csv(csv_path, roots=()):
+    """All columns of an exiftool -csv file, keyed by exif_key() of each
+    row's SourceFile (the bare FileName only when SourceFile is missing)"""
+    rows = {}
+    with open(csv_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            source_file = row.get('SourceFile')
+            filename = exif_key(source_file, roots) if source_file else row.get('FileName')
+            if filename:
+                rows[filename] = {k: v for k, v in row.items() if k and v not in (None, '')}
+    return rows
+
+
+class MetadataIndex:
+    """SQLite metadata index; safe to open from several worker processes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=60)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _upsert(self, rows, columns):
+        """Insert or update rows keyed by (agency, kind, file_name)"""
+        names = ', '.join(columns)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c not in ('agency', 'kind', 'file_name'))
+        self._db.executemany(
+            f"INSERT INTO files ({names}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (agency, kind, file_name) DO UPDATE SET {updates}",
+            rows)
+
+    def import_exif_csv(self, csv_path, agency, roots=()):
+        """Load an exiftool CSV for one agency's images, found in the
+        folders roots (see exif_key()).
+
+        Skipped when this agency's CSV was already imported unchanged;
+        returns True if the CSV was (re)read.
+        """
+        stamp = json.dumps(file_stamp(csv_path))
+        seen = self._db.execute("SELECT csv_path, stamp FROM imports WHERE agency = ?", (agency,)).fetchone()
+        if seen and seen['csv_path'] == str(csv_path) and seen['stamp'] == stamp:
+            return False
+
+        rows = read_exif_csv(csv_path, roots)
+        with self._db:
+            self._upsert(
+                [(agency, 'image', name,
+                  parse_timestamp(next((fields[t] for t in EXIF_DATE_TAGS if t in fields), None)),
+                  fields.get('Make'), fields.get('Model'), json.dumps(fields, ensure_ascii=False))
+                 for name, fields in rows.items()],
+                ('agency', 'kind', 'file_name', 'taken_at', 'make', 'model', 'fields'))
+            # Images gone from the CSV lose their EXIF, not their checksums
+            self._db.execute(
+                f"UPDATE files SET fields = '{{}}', taken_at = NULL, make = NULL, model = NULL "
+                f"WHERE agency = ? AND kind = 'image' AND file_name NOT IN "
+                f"(SELECT value FROM json_each(?))",
+                (agency, json.dumps(list(rows))))
+            self._db.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?)", (agency, str(csv_path), stamp))
+        return True
+
+    def record_checksums(self, agency, kind, files):
+        """Store size and SHA-256 for (file name, size, sha256) tuples"""
+        with self._db:
+            self._upsert([(agency, kind, name, size, sha) for name, size, sha in files],
+                         ('agency', 'kind', 'file_name', 'size', 'sha256'))
+
+    def add_document(self, agency, file_name, size, page_count, pdf_metadata):
+        """Store a PDF's metadata dictionary (as returned by PyMuPDF)"""
+        fields = {k: v for k, v in (pdf_metadata or {}).items() if v}
+        fields['pageCount'] = page_count
+        with self._db:
+            self._upsert([(agency, 'document', file_name, size, parse_timestamp(fields.get('creationDate')),
+                           json.dumps(fields, ensure_ascii=False))],
+                         ('agency', 'kind', 'file_name', 'size', 'taken_at', 'fields'))
+
+    def image_metadata(self, agency):
+        """{file name: EXIF fields} for one agency's images"""
+        rows = self._db.execute(
+            "SELECT file_name, fields FROM files WHERE agency = ? AND kind = 'image'", (agency,))
+        return {row['file_name']: json.loads(row['fields']) for row in rows if row['fields'] != '{}'}
+
+    def query(self, agency=None, kind=None, make=None, model=None, since=None, until=None,
+              sha256=None, order='taken_at', limit=None):
+        """Files matching every given filter, as dicts with their fields decoded.
+
+        since/until compare against taken_at, e.g. since="2023-01-01".
+        """
+        filters = {'agency = ?': agency, 'kind = ?': kind, 'make = ?': make, 'model = ?': model,
+                   'taken_at >= ?': since, 'taken_at < ?': until, 'sha256 = ?': sha256}
+        where = [clause for clause, value in filters.items() if value is not None]
+        sql = "SELECT * FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {QUERY_ORDERS[order]}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        results = []
+        for row in self._db.execute(sql, [v for v in filters.values() if v is not None]):
+            record = dict(row)
+            record['fields'] = json.loads(record['fields'])
+            results.append(record)
+        return results
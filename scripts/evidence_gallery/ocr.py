@@ -0,0 +1,262 @@
+"""
+Optional OCR stage (between Stage 2 and Stage 3)
+
+Purpose:
+  - Find PDF pages without a usable text layer (image-only scans)
+  - Render them at OCR resolution and run the local Tesseract over them,
+    in parallel worker processes
+  - Cache results by page-image hash, so reruns and identical pages are free
+  - Write per-page text and word boxes that Stage 3 feeds into the
+    portal's search index and hit highlighting
+
+Input:  document folders of every source (01-EVIDENCE-VAULT/documents/ by default)
+Output: 02-WEB-OPTIMIZED/ocr/<source>/<file name>.json
+
+Word boxes are stored as [token, x, y, width, height] with coordinates in
+thousandths of the page, so they fit any rendition of the page.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import progress, tracing
+from .checkpoint import file_stamp
+from .errors import StageError
+from .scanner import list_documents
+from .search_index import tokenize
+from .sources import default_sources
+from .tracing import span
+
+OCR_VERSION = 1
+MIN_TEXT_CHARS = 20  # pages with less text than this in their text layer get OCR'd
+PAGES_PER_TASK = 8
+
+
+def tesseract_version():
+    """First line of `tesseract --version`, or None if it is not installed"""
+    if not shutil.which('tesseract'):
+        return None
+    result = subprocess.run(['tesseract', '--version'], capture_output=True, text=True)
+    return (result.stdout or result.stderr).splitlines()[0].strip()
+
+
+def ocr_output_path(config, source, filename):
+    return config.web_opt / "ocr" / source.slug / f"{filename}.json"
+
+
+def load_ocr(path):
+    """{page number: {'text', 'words'}} from an OCR output file ({} if none)"""
+    try:
+        with open(path, 'r') as f:
+            return {int(page): result for page, result in json.load(f)['pages'].items()}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def parse_tesseract_tsv(tsv, width, height):
+    """Tesseract TSV output to (text, word boxes, mean word confidence)"""
+    lines = {}
+    words = []
+    confidences = []
+    rows = tsv.splitlines()
+    for row in rows[1:]:
+        cols = row.split('\t')
+        if len(cols) < 12 or cols[0] != '5' or not cols[11].strip():
+            continue
+        left, top, w, h = (int(c) for c in cols[6:10])
+        conf = float(cols[10])
+        text = cols[11].strip()
+        lines.setdefault(tuple(cols[2:5]), []).append(text)
+        if conf >= 0:
+            confidences.append(conf)
+        box = [round(left * 1000 / width), round(top * 1000 / height),
+               round(w * 1000 / width), round(h * 1000 / height)]
+        words += [[token] + box for token in tokenize(text)]
+    text = '\n'.join(' '.join(line) for line in lines.values())
+    confidence = round(sum(confidences) / len(confidences), 1) if confidences else None
+    return text, words, confidence
+
+
+def ocr_image(png_bytes, width, height, lang):
+    """Run Tesseract over one PNG image"""
+    result = subprocess.run(
+        ['tesseract', 'stdin', 'stdout', '-l', lang, 'tsv'],
+        input=png_bytes, capture_output=True, check=True,
+        env={**os.environ, 'OMP_THREAD_LIMIT': '1'},  # one core per worker process
+    )
+    return parse_tesseract_tsv(result.stdout.decode('utf-8', 'replace'), width, height)
+
+
+def ocr_pages(doc_path, page_numbers, dpi, lang, engine, cache_dir, trace_dir=None, progress_to=None):
+    """OCR the given pages of one PDF (runs in a worker process).
+
+    Returns {page number: result or None (has a text layer)} and the
+    page numbers served from the cache.
+    """
+    import fitz
+
+    tracing.ensure(trace_dir)
+    progress.ensure(progress_to)
+    results = {}
+    hits = []
+    try:
+        with fitz.open(doc_path) as pdf:
+            for page_number in page_numbers:
+                page = pdf[page_number - 1]
+                if len(page.get_text().strip()) >= MIN_TEXT_CHARS:
+                    results[page_number] = None
+                    continue
+
+                with span("ocr.render", item=os.path.basename(doc_path), page=page_number):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72),
+                                          colorspace=fitz.csGRAY, alpha=False)
+                    digest = hashlib.sha256(pix.samples)
+                    digest.update(f"{pix.width}x{pix.height}|{lang}|{engine}|{OCR_VERSION}".encode())
+                    key = digest.hexdigest()
+
+                cache_file = os.path.join(cache_dir, key[:2], f"{key}.json")
+                try:
+                    with open(cache_file, 'r') as f:
+                        results[page_number] = json.load(f)
+                    hits.append(page_number)
+                    continue
+                except (OSError, ValueError):
+                    pass
+
+                with span("tesseract", item=os.path.basename(doc_path), page=page_number):
+                    text, words, confidence = ocr_image(pix.tobytes("png"), pix.width, pix.height, lang)
+                result = {'text': text, 'words': words, 'confidence': confidence, 'imageHash': key}
+
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                tmp = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(result, f, ensure_ascii=False)
+                os.replace(tmp, cache_file)
+                results[page_number] = result
+    finally:
+        tracing.flush()
+    return results, hits
+
+
+def write_ocr_output(path, stamp, settings, pages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'stamp': stamp, 'settings': settings,
+            'pages': {str(n): r for n, r in sorted(pages.items()) if r is not None}}
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _up_to_date(path, stamp, settings):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return data.get('stamp') == stamp and data.get('settings') == settings
+    except (OSError, ValueError):
+        return False
+
+
+def ocr_documents(config):
+    """Run the OCR stage and return a summary"""
+    with span("ocr"):
+        return _ocr_documents(config)
+
+
+def _ocr_documents(config):
+    import fitz
+
+    print("=" * 80)
+    print("OCR: EXTRACTING TEXT FROM SCANNED PAGES")
+    print("=" * 80)
+    print()
+
+    engine = tesseract_version()
+    if not engine:
+        print("⚠️  Tesseract not found. Install it (e.g. brew install tesseract /")
+        print("   apt install tesseract-ocr) or skip this optional stage.")
+        raise StageError("tesseract not found")
+    print(f"Using {engine} (language: {config.ocr_lang}, {config.ocr_dpi} DPI)")
+
+    settings = {'dpi': config.ocr_dpi, 'lang': config.ocr_lang, 'engine': engine, 'version': OCR_VERSION}
+    cache_dir = str(config.state_dir / "ocr-cache")
+
+    # Documents whose OCR output is missing or stale, split into page batches
+    documents = {}
+    tasks = []
+    up_to_date = 0
+    for source in config.sources or default_sources(config):
+        for doc_dir in source.document_dirs:
+            for doc_path, filename in list_documents(doc_dir, config.io_depth):
+                out_path = ocr_output_path(config, source, filename)
+                stamp = file_stamp(doc_path)
+                if config.resume and _up_to_date(out_path, stamp, settings):
+                    up_to_date += 1
+                    continue
+                try:
+                    with fitz.open(doc_path) as pdf:
+                        pages = config.max_pages(stamp[0], pdf.page_count)
+                except Exception as e:
+                    print(f"  ❌ Error opening {filename}: {e}")
+                    continue
+                if pages == 0:
+                    write_ocr_output(out_path, stamp, settings, {})
+                    continue
+                key = (source.slug, doc_path)
+                documents[key] = {'out': out_path, 'stamp': stamp, 'pending': pages, 'pages': {}}
+                for start in range(1, pages + 1, PAGES_PER_TASK):
+                    tasks.append((key, list(range(start, min(start + PAGES_PER_TASK, pages + 1)))))
+
+    total_pages = sum(doc['pending'] for doc in documents.values())
+    print(f"  {len(documents)} documents to check ({total_pages} pages), {up_to_date} already done")
+    print()
+
+    ocr_count = cache_hits = text_layer = 0
+    workers = max(1, min(len(tasks), config.workers or os.cpu_count() or 1))
+    with progress.phase("ocr", "pages", total_pages) as p, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(ocr_pages, key[1], pages, config.ocr_dpi, config.ocr_lang, engine,
+                               cache_dir, config.trace_dir, config.progress): (key, pages)
+                   for key, pages in tasks}
+        for future in as_completed(futures):
+            key, pages = futures[future]
+            doc_path = key[1]
+            doc = documents[key]
+            try:
+                results, hits = future.result()
+            except Exception as e:
+                print(f"  ❌ Error in {os.path.basename(doc_path)} pages {pages[0]}-{pages[-1]}: {e}")
+                results, hits = {}, []
+                for _ in pages:
+                    p.error(os.path.basename(doc_path), e)
+                doc['failed'] = True
+            else:
+                for page_number, result in results.items():
+                    p.advance(cached=page_number in hits)
+            doc['pages'].update(results)
+            text_layer += sum(1 for r in results.values() if r is None)
+            ocr_count += sum(1 for r in results.values() if r is not None)
+            cache_hits += len(hits)
+
+            doc['pending'] -= len(pages)
+            if doc['pending'] == 0 and not doc.get('failed'):
+                write_ocr_output(doc['out'], doc['stamp'], settings, doc['pages'])
+                scanned = sum(1 for r in doc['pages'].values() if r is not None)
+                print(f"  ✅ {os.path.basename(doc_path)}: {scanned} scanned page(s) OCR'd")
+
+    print()
+    print("=" * 80)
+    print("✅ OCR COMPLETE")
+    print("=" * 80)
+    print(f"Pages OCR'd: {ocr_count} ({cache_hits} from cache)")
+    print(f"Pages with a text layer (skipped): {text_layer}")
+    print(f"Output: {config.web_opt / 'ocr'}/")
+    print()
+    print("Next stage: python3 scripts/3_generate_website.py")
+    print("=" * 80)
+
+    return {'documents': len(documents), 'ocr_pages': ocr_count, 'cache_hits': cache_hits,
+            'text_layer_pages': text_layer}
@@ -0,0 +1,384 @@
+"""
+Stage 2: Optimize for Web
+
+Purpose:
+  - Create web-optimized versions of photos (50% resolution, JPEG Q75)
+  - Generate thumbnails for gallery (150×150, JPEG Q40)
+  - Render PDF pages at 150 DPI (JPEG Q60); scanned pages keep their
+    embedded JPEG, text pages become greyscale PNG, blank pages are not
+    rendered (see page_render.py)
+  - Apply smart page limiting for large PDFs
+
+Input:  01-EVIDENCE-VAULT/
+Output: 02-WEB-OPTIMIZED/
+"""
+
+import io
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from . import memory, progress
+from .checkpoint import Journal, file_stamp, outputs_intact
+from .imaging import (SUPPORTED_FORMATS, fit_size, image_extension, load_scaled, save_bytes, save_jpeg,
+                      scaled_size, to_rgb)
+from .page_render import render_page
+from .parallel_io import read_ahead, read_ahead_limit, stat_all
+from .pdf_metadata import LazyPDF, load_table, lookup
+from .scanner import list_documents, list_files
+from .tracing import span
+
+
+def create_output_structure(config):
+    """Create the web-optimized output folders"""
+    web_opt = config.web_opt
+    web_opt.mkdir(exist_ok=True)
+    (web_opt / "photos").mkdir(exist_ok=True)
+    (web_opt / "thumbnails").mkdir(exist_ok=True)
+    (web_opt / "documents").mkdir(exist_ok=True)
+
+
+def vault_rel(path, config, category):
+    """Path of a vault file within its category folder ('/' separators);
+    outputs and journal keys follow it, so nested evidence keeps its folders"""
+    return path.relative_to(config.vault / category).as_posix()
+
+
+def output_path(config, rel):
+    """Output file under 02-WEB-OPTIMIZED/, creating its folder"""
+    path = config.web_opt / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def optimize_photo(photo_path, config, data=None):
+    """Write the web version and thumbnail of one photo (data: its bytes,
+    if already read).
+
+    Returns {output path relative to 02-WEB-OPTIMIZED/: bytes}, empty if
+    the format is not supported.
+    """
+    name = vault_rel(photo_path, config, "photos")
+    stem = name[:-len(photo_path.suffix)] if photo_path.suffix else name
+    img = Image.open(io.BytesIO(data) if data is not None else photo_path)
+
+    # Skip non-photos
+    if img.format not in SUPPORTED_FORMATS:
+        print(f"  ⚠️  Skipping {name} (unsupported format: {img.format})")
+        return {}
+
+    # Create optimized version (decoded at reduced size where the format allows;
+    # the full-size original is released as soon as it has been scaled)
+    with span("photo.decode", item=name):
+        img_resized = to_rgb(load_scaled(img, scaled_size(img.size, config.image_resize_percent)))
+
+    output_rel = f"photos/{stem}.jpg"
+    with span("photo.encode", item=name):
+        output_size = save_jpeg(img_resized, output_path(config, output_rel), config.image_jpeg_quality)
+
+    # Create thumbnail from the web version
+    with span("thumbnail", item=name):
+        img_thumb = img_resized.resize(fit_size(img_resized.size, config.thumbnail_size),
+                                       Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+        thumb_rel = f"thumbnails/{stem}_thumb.jpg"
+        thumb_size = save_jpeg(img_thumb, output_path(config, thumb_rel), config.thumbnail_quality)
+
+    return {output_rel: output_size, thumb_rel: thumb_size}
+
+
+def render_document(doc_path, config, journal=None, data=None, info=None):
+    """Render the first pages of one PDF to JPEG (data: its bytes, if
+    already read; info: its documents_metadata.csv row, if current).
+
+    Pages already recorded in the journal with intact output are skipped;
+    with info, a PDF whose pages are all reused is not opened at all.
+    Returns (pages in output, pages reused from an earlier run, Counter
+    of rendered pages by kind: scan, blank, text or page).
+    """
+    name = vault_rel(doc_path, config, "documents")
+    stem = name[:-len(doc_path.suffix)] if doc_path.suffix else name
+    stamp = file_stamp(doc_path)
+    reused = 0
+    kinds = Counter()
+    pdf = LazyPDF(doc_path, data)
+    try:
+        page_count = int(info['PageCount']) if info else pdf.doc.page_count
+
+        # Determine page limit based on file size
+        file_size = stamp[0]
+        max_pages = config.max_pages(file_size, page_count)
+
+        print(f"      {page_count} pages, {file_size / (1024*1024):.1f} MB")
+        print(f"      → Rendering first {max_pages} pages at {config.document_dpi} DPI...")
+
+        for page_num in range(max_pages):
+            key = f"documents/{name}#{page_num + 1}"
+            entry = journal.lookup(key, stamp) if journal else None
+            if entry and outputs_intact(config.web_opt, entry['outputs']):
+                reused += 1
+                continue
+
+            with span("pdf.render", item=name, page=page_num + 1):
+                data, _, kind = render_page(pdf.doc[page_num], config.document_dpi,
+                                            config.document_jpeg_quality, config.adaptive_pages)
+            kinds[kind] += 1
+            output_rel = f"documents/{stem}_page_{page_num+1:03d}{image_extension(data)}"
+            size = save_bytes(data, output_path(config, output_rel))
+            if journal:
+                journal.record(key, stamp, outputs={output_rel: size})
+    finally:
+        pdf.close()
+
+    return max_pages, reused, kinds
+
+
+def _done(journal, key, path, config):
+    """True if key is journaled for path's current stamp with intact outputs"""
+    entry = journal.lookup(key, file_stamp(path)) if journal else None
+    return bool(entry) and outputs_intact(config.web_opt, entry['outputs'])
+
+
+def _split_sizes(outputs):
+    optimized = sum(size for rel, size in outputs.items() if rel.startswith("photos/"))
+    return optimized, sum(outputs.values()) - optimized
+
+
+def optimize_photos(photos, config, journal=None):
+    """Process all photos and print a size summary"""
+    print(f"Processing {len(photos)} photos...")
+    photo_original_size = 0
+    photo_optimized_size = 0
+    thumbnail_size = 0
+    reused = 0
+
+    sizes = {path: st.st_size for path, st in stat_all(photos, config.io_depth).items()}
+    # The next --io-depth photos are read while this one is processed
+    ahead = read_ahead(photos, sizes, config.io_depth,
+                       want=lambda path: not _done(journal, f"photos/{vault_rel(path, config, 'photos')}",
+                                                  path, config),
+                       max_bytes=read_ahead_limit(config.memory_budget_mb))
+    with progress.phase("stage2", "photos", len(photos), sum(sizes.values())) as p:
+        for idx, (photo_path, data) in enumerate(ahead, 1):
+            try:
+                # Track original size
+                photo_original_size += sizes[photo_path]
+
+                name = vault_rel(photo_path, config, "photos")
+                key = f"photos/{name}"
+                stamp = file_stamp(photo_path)
+                entry = journal.lookup(key, stamp) if journal else None
+                if entry and outputs_intact(config.web_opt, entry['outputs']):
+                    outputs = entry['outputs']
+                    reused += 1
+                    p.advance(sizes[photo_path], cached=True)
+                else:
+                    with span("photo", item=name):
+                        outputs = optimize_photo(photo_path, config, data)
+                    if journal:
+                        journal.record(key, stamp, outputs=outputs)
+                    p.advance(sizes[photo_path])
+                if not outputs:
+                    continue
+                optimized, thumb = _split_sizes(outputs)
+                photo_optimized_size += optimized
+                thumbnail_size += thumb
+
+                if idx % 5 == 0:
+                    print(f"  ✅ Processed {idx}/{len(photos)} photos...")
+
+            except Exception as e:
+                print(f"  ❌ Error processing {vault_rel(photo_path, config, 'photos')}: {e}")
+                p.error(vault_rel(photo_path, config, 'photos'), e)
+
+    print()
+    print(f"Photos Summary:")
+    if reused:
+        print(f"  Reused from earlier run: {reused}")
+    print(f"  Original Total: {photo_original_size / (1024*1024):.1f} MB")
+    print(f"  Optimized Total: {photo_optimized_size / (1024*1024):.1f} MB")
+    print(f"  Thumbnails Total: {thumbnail_size / (1024):.0f} KB")
+    if photo_original_size > 0:
+        print(f"  Reduction: {((photo_original_size - photo_optimized_size) / photo_original_size * 100):.0f}%")
+    print()
+
+    return photo_original_size, photo_optimized_size
+
+
+def optimize_documents(documents, config, journal=None):
+    """Render all documents and print a summary"""
+    print(f"Processing {len(documents)} documents...")
+    print("  NOTE: PDF rendering requires PyMuPDF (fitz)")
+    print("  Install with: pip3 install PyMuPDF")
+    print()
+
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        print("  ⚠️  PyMuPDF not installed - skipping document optimization")
+        print("     Install with: pip3 install PyMuPDF")
+        print()
+        return 0, 0
+
+    doc_original_size = 0
+    doc_pages_total = 0
+    pages_reused = 0
+    page_kinds = Counter()
+
+    table = load_table(config)  # page counts from Stage 1's documents_metadata.csv
+    sizes = {path: st.st_size for path, st in stat_all(documents, config.io_depth).items()}
+    # Documents whose first page is journaled were most likely finished: not read ahead
+    ahead = read_ahead(documents, sizes, config.io_depth,
+                       want=lambda path: not _done(journal, f"documents/{vault_rel(path, config, 'documents')}#1",
+                                                  path, config),
+                       max_bytes=read_ahead_limit(config.memory_budget_mb))
+    with progress.phase("stage2", "documents", len(documents), sum(sizes.values())) as p:
+        for idx, (doc_path, data) in enumerate(ahead, 1):
+            try:
+                doc_original_size += sizes[doc_path]
+                name = vault_rel(doc_path, config, "documents")
+                print(f"  [{idx}/{len(documents)}] {name}")
+                with span("document", item=name):
+                    rendered, reused, kinds = render_document(doc_path, config, journal, data,
+                                                              lookup(table, doc_path))
+                page_kinds.update(kinds)
+                doc_pages_total += rendered
+                pages_reused += reused
+                p.advance(sizes[doc_path], cached=rendered > 0 and reused == rendered)
+                if reused:
+                    print(f"      ✅ Rendered {rendered - reused} pages ({reused} reused from earlier run)")
+                else:
+                    print(f"      ✅ Rendered {rendered} pages")
+
+            except Exception as e:
+                print(f"  ❌ Error processing {vault_rel(doc_path, config, 'documents')}: {e}")
+                p.error(vault_rel(doc_path, config, 'documents'), e)
+
+    print()
+    print(f"Documents Summary:")
+    print(f"  Original Total: {doc_original_size / (1024*1024):.1f} MB")
+    print(f"  Pages Rendered: {doc_pages_total}")
+    if pages_reused:
+        print(f"  Reused from earlier run: {pages_reused}")
+    if config.adaptive_pages and page_kinds:
+        print(f"  Scans passed through: {page_kinds['scan']}, text pages (PNG): {page_kinds['text']}, "
+              f"blank: {page_kinds['blank']}, rasterized: {page_kinds['page']}")
+    print(f"  Est. Optimized Size: {doc_pages_total * 0.1:.1f} MB (~100 KB/page)")
+    print()
+
+    return doc_original_size, doc_pages_total
+
+
+def write_optimization_log(config, photos, photo_original_size, photo_optimized_size,
+                           doc_original_size, doc_pages_total):
+    """Write OPTIMIZATION_LOG.txt"""
+    web_opt = config.web_opt
+    log_content = f"""WEB OPTIMIZATION LOG
+====================
+Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SETTINGS USED:
+  Image Resize: {int(config.image_resize_percent * 100)}%
+  Image JPEG Quality: {config.image_jpeg_quality}
+  Thumbnail Size: {config.thumbnail_size[0]}×{config.thumbnail_size[1]}
+  Thumbnail Quality: {config.thumbnail_quality}
+  Document DPI: {config.document_dpi}
+  Adaptive Pages: {'on' if config.adaptive_pages else 'off (--fixed-dpi)'}
+  Document JPEG Quality: {config.document_jpeg_quality}
+
+RESULTS:
+  Photos Optimized: {len(photos)}
+  Thumbnails Created: {len(photos)}
+  Document Pages Rendered: {doc_pages_total}
+
+  Original Size: {(photo_original_size + doc_original_size) / (1024*1024):.1f} MB
+  Optimized Size: {(photo_optimized_size + doc_pages_total * 100000) / (1024*1024):.1f} MB
+  Reduction: {((photo_original_size - photo_optimized_size) / photo_original_size * 100 if photo_original_size > 0 else 0):.0f}%
+
+FILES CREATED:
+  {web_opt}/photos/ ({len(photos)} files)
+  {web_opt}/thumbnails/ ({len(photos)} files)
+  {web_opt}/documents/ ({doc_pages_total} pages)
+
+Next stage: Generate website (scripts/3_generate_website.py)
+"""
+
+    with open(web_opt / "OPTIMIZATION_LOG.txt", 'w') as f:
+        f.write(log_content)
+
+
+def optimize_for_web(config):
+    """Run Stage 2 and return a summary of what was produced"""
+    with span("stage2"):
+        return _optimize_for_web(config)
+
+
+def _optimize_for_web(config):
+    vault = config.vault
+    web_opt = config.web_opt
+    # Decodes share what the read-ahead buffers leave of the budget
+    memory.ensure(config.memory_budget_mb,
+                  set_aside=read_ahead_limit(config.memory_budget_mb) if config.io_depth > 1 else 0)
+
+    print("=" * 80)
+    print("STAGE 2: OPTIMIZING FOR WEB")
+    print("=" * 80)
+    print()
+
+    # Create output structure
+    print("Creating optimization directories...")
+    create_output_structure(config)
+    print("✅ Directories created")
+    print()
+
+    # Process photos
+    # Nested folders too (Stage 1 keeps the source's folder layout)
+    photos = [Path(path) for path, _ in list_files(vault / "photos", config.io_depth)]
+    photo_original_size = photo_optimized_size = 0
+
+    documents = [Path(path) for path, _ in list_documents(vault / "documents", config.io_depth)]
+    doc_original_size = doc_pages_total = 0
+
+    # Journal of finished photos/pages, so an interrupted run resumes
+    with Journal(config.state_dir / "stage2.jsonl", config.render_fingerprint(), resume=config.resume) as journal:
+        if journal.entries:
+            print(f"Resuming: {len(journal.entries)} items recorded by an earlier run")
+            print()
+
+        if photos:
+            photo_original_size, photo_optimized_size = optimize_photos(photos, config, journal)
+        else:
+            print("No photos to process")
+            print()
+
+        # Process documents
+        if documents:
+            doc_original_size, doc_pages_total = optimize_documents(documents, config, journal)
+        else:
+            print("No documents to process")
+            print()
+
+    write_optimization_log(config, photos, photo_original_size, photo_optimized_size,
+                           doc_original_size, doc_pages_total)
+
+    print("=" * 80)
+    print("✅ STAGE 2 COMPLETE: Web Optimization Done")
+    print("=" * 80)
+    print()
+    print(f"Output Location: {web_opt}/")
+    print(f"Photos: {len(photos)} files")
+    print(f"Thumbnails: {len(photos)} files")
+    print(f"Document Pages: {doc_pages_total}")
+    print()
+    print("Next stage: python3 scripts/3_generate_website.py")
+    print("=" * 80)
+
+    return {
+        'photos': len(photos),
+        'documents': len(documents),
+        'document_pages': doc_pages_total,
+        'original_bytes': photo_original_size + doc_original_size,
+        'optimized_bytes': photo_optimized_size,
+    }
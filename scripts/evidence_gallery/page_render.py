@@ -0,0 +1,208 @@
+"""
+Adaptive rendering of PDF pages (Stages 2 and 3 and the live server).
+
+Rasterizing every page at one DPI and re-encoding it as JPEG is slow for
+scanned productions (each embedded JPEG is decoded, composited and
+compressed again, losing quality) and wasteful for plain text. Each page
+is looked at first (analyse_page) and handled by its kind:
+
+  scan   one JPEG image filling the page, nothing drawn over it: the
+         embedded JPEG is served as it is, with no decode and no
+         re-encode. If it is much larger than the DPI asks for, it is
+         decoded at reduced size (JPEG DCT scaling) and re-encoded.
+  blank  nothing visible (no images, drawings or visible text), or a
+         scan that is uniformly white: a tiny white JPEG of the page's
+         shape, nothing rendered.
+  text   only text and line art, all black or grey: rendered in
+         greyscale and stored as a 16-level PNG, which keeps text
+         sharper at about half the bytes of the JPEG.
+  page   anything else (photos, colour, annotations): rendered at the
+         DPI and encoded as JPEG, as before.
+
+PipelineConfig.adaptive_pages = False (--fixed-dpi) renders every page
+the old way.
+
+render_preview() makes the viewer's low-resolution preview tier: always
+a JPEG, from the same analysis (scans decoded at reduced size, blank
+pages not rendered, text pages rendered in greyscale).
+"""
+
+import io
+from functools import lru_cache
+
+from PIL import Image, ImageStat
+
+from .imaging import encode_jpeg, render_pdf_page
+
+FULL_PAGE = 0.02          # a scan may miss each page edge by this share of the page
+OVERSIZE = 1.5            # embedded JPEGs up to this many times the target size pass through
+BLANK_MIN_MEAN = 235      # a scan whose reduced copy is this bright on average ...
+BLANK_MAX_STDDEV = 4      # ... and this even is a blank sheet
+BLANK_SCALE = 8           # blank pages are stored at 1/8 of the DPI
+TEXT_LEVELS = 16          # grey levels kept for text pages (4-bit PNG)
+
+
+def _grey(colour, tolerance=0.02):
+    """True for a PDF colour tuple with no hue (grey, RGB with equal
+    channels or CMYK with ink only in K)"""
+    if not colour or len(colour) == 1:
+        return True
+    if len(colour) == 4:
+        return max(colour[:3]) <= tolerance
+    return max(colour) - min(colour) <= tolerance
+
+
+def _full_page(bbox, rect):
+    dx, dy = rect.width * FULL_PAGE, rect.height * FULL_PAGE
+    return (abs(bbox[0] - rect.x0) <= dx and abs(bbox[1] - rect.y0) <= dy and
+            abs(bbox[2] - rect.x1) <= dx and abs(bbox[3] - rect.y1) <= dy)
+
+
+def _passthrough_jpeg(doc, image, xref):
+    """The raw JPEG stream of an image placement, if a browser shows it
+    exactly as the PDF does; else None"""
+    a, b, c, d = image['transform'][:4]
+    if not xref or abs(b) > 1e-6 or abs(c) > 1e-6 or a <= 0 or d <= 0:
+        return None  # inline, rotated or mirrored
+    if image['colorspace'] not in (1, 3) or image.get('has-mask'):
+        return None  # CMYK/Lab JPEGs and masked images need compositing
+    if doc.xref_get_key(xref, "Filter") != ('name', '/DCTDecode'):
+        return None
+    if any(doc.xref_get_key(xref, key)[0] != 'null' for key in ("SMask", "Mask", "Decode")):
+        return None
+    raw = doc.xref_stream_raw(xref)
+    try:
+        if Image.open(io.BytesIO(raw)).getexif().get(0x0112, 1) != 1:
+            return None  # browsers would apply the EXIF rotation; PDF viewers do not
+    except Exception:
+        return None
+    return raw
+
+
+def analyse_page(page):
+    """(kind, raw JPEG or None): kind is scan, blank, text or page (see
+    the module docstring)"""
+    if page.rotation or page.first_annot is not None:
+        return 'page', None
+    images = page.get_image_info()  # placements (cheap without xrefs=True, which hashes every image)
+    visible = [span for span in page.get_texttrace() if span['type'] != 3 and span['opacity'] > 0]
+    drawings = page.get_drawings()
+
+    if not images:
+        if not visible and not drawings:
+            return 'blank', None
+        if all(_grey(span['color']) for span in visible) and \
+                all(_grey(path.get('color')) and _grey(path.get('fill')) for path in drawings):
+            return 'text', None
+        return 'page', None
+
+    if len(images) == 1 and not visible and not drawings and _full_page(images[0]['bbox'], page.rect):
+        listed = page.get_images(full=True)
+        if len(listed) == 1 and listed[0][2:4] == (images[0]['width'], images[0]['height']):
+            raw = _passthrough_jpeg(page.parent, images[0], listed[0][0])
+            if raw is not None:
+                return 'scan', raw
+    return 'page', None
+
+
+def page_size(page, dpi):
+    """Pixel size of a page rendered at dpi"""
+    return max(1, round(page.rect.width * dpi / 72)), max(1, round(page.rect.height * dpi / 72))
+
+
+@lru_cache(maxsize=32)
+def blank_jpeg(size):
+    """A white JPEG of the given size"""
+    return encode_jpeg(Image.new('L', size, 255), 75)
+
+
+def _blank(target):
+    size = (max(1, target[0] // BLANK_SCALE), max(1, target[1] // BLANK_SCALE))
+    return blank_jpeg(size), size, 'blank'
+
+
+def _is_blank(img):
+    stat = ImageStat.Stat(img.convert('L'))
+    return stat.mean[0] >= BLANK_MIN_MEAN and stat.stddev[0] <= BLANK_MAX_STDDEV
+
+
+def _scan(raw, target, quality):
+    """(bytes, size, kind) for a passthrough scan: the JPEG itself,
+    a reduced re-encode if it is oversized, or blank"""
+    img = Image.open(io.BytesIO(raw))
+    size = img.size
+    if size[0] <= target[0] * OVERSIZE:
+        img.draft(img.mode, (max(1, size[0] // BLANK_SCALE), max(1, size[1] // BLANK_SCALE)))
+        return _blank(target) if _is_blank(img) else (raw, size, 'scan')
+
+    img.draft(img.mode, target)
+    img = img.convert('RGB' if img.mode != 'L' else 'L')
+    if _is_blank(img):
+        return _blank(target)
+    scale = min(target[0] / img.width, target[1] / img.height, 1.0)
+    img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                     Image.Resampling.LANCZOS)
+    return encode_jpeg(img, quality), img.size, 'scan'
+
+
+def _render_grey(page, dpi):
+    import fitz
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombytes('L', (pix.width, pix.height), pix.samples)
+
+
+def _text_png(page, dpi):
+    """Greyscale render of a text page as a TEXT_LEVELS-level PNG"""
+    shift = 8 - (TEXT_LEVELS - 1).bit_length()
+    levels = _render_grey(page, dpi).point(lambda v: v >> shift)
+    img = Image.frombytes('P', levels.size, levels.tobytes())
+    step = 255 // (TEXT_LEVELS - 1)
+    img.putpalette([v * step for v in range(TEXT_LEVELS) for _ in range(3)])
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', bits=(TEXT_LEVELS - 1).bit_length(), compress_level=3)
+    return buffer.getvalue(), img.size
+
+
+def _render(page, dpi, quality, kind, raw):
+    target = page_size(page, dpi)
+    if kind == 'scan':
+        return _scan(raw, target, quality)
+    if kind == 'blank':
+        return _blank(target)
+    if kind == 'text':
+        data, size = _text_png(page, dpi)
+        return data, size, 'text'
+    img = render_pdf_page(page, dpi)
+    return encode_jpeg(img, quality), img.size, 'page'
+
+
+def _preview(page, dpi, quality, kind, raw):
+    target = page_size(page, dpi)
+    if kind == 'scan':
+        return _scan(raw, target, quality)[:2]
+    if kind == 'blank':
+        return _blank(target)[:2]
+    img = _render_grey(page, dpi) if kind == 'text' else render_pdf_page(page, dpi)
+    return encode_jpeg(img, quality), img.size
+
+
+def render_page(page, dpi, quality, adaptive=True):
+    """(image bytes, pixel size, kind) of one page. The bytes are JPEG,
+    or PNG for text pages (see imaging.image_type)."""
+    kind, raw = analyse_page(page) if adaptive else ('page', None)
+    return _render(page, dpi, quality, kind, raw)
+
+
+def render_preview(page, dpi, quality, adaptive=True):
+    """(JPEG bytes, pixel size) of a low-resolution preview of one page"""
+    kind, raw = analyse_page(page) if adaptive else ('page', None)
+    return _preview(page, dpi, quality, kind, raw)
+
+
+def render_tiers(page, dpi, quality, preview_dpi, preview_quality, adaptive=True):
+    """render_page() and render_preview() of one page, analysed once:
+    (image bytes, pixel size, kind, preview JPEG bytes)"""
+    kind, raw = analyse_page(page) if adaptive else ('page', None)
+    data, size, kind = _render(page, dpi, quality, kind, raw)
+    return data, size, kind, _preview(page, preview_dpi, preview_quality, kind, raw)[0]
@@ -0,0 +1,139 @@
+"""
+Overlapped file I/O for evidence on network shares and slow volumes.
+
+On an SMB/NFS mount every stat, open and read waits a network round
+trip. Issued one after another (as a plain loop does), they leave the
+link idle most of the time. These helpers keep up to `depth` operations
+in flight on a thread pool (the waits release the GIL), while handing
+results back in the caller's order:
+
+  stat_all(paths, depth)               {path: os.stat_result}
+  read_ahead(paths, sizes, depth, ...) (path, bytes) with the next reads
+                                       already under way
+  map_ahead(fn, items, depth)          (item, fn(item)), same idea for any
+                                       I/O-bound function (e.g. hashing)
+  copy_all(pairs, depth)               copy2 of (source, destination) pairs
+
+depth comes from --io-depth (PipelineConfig.io_depth); depth 1 runs
+everything inline, exactly as before. read_ahead buffers at most
+read_ahead_limit() bytes in total (a share of --memory-budget when one is
+set); files that do not fit are opened by path.
+
+run_io_benchmark() in benchmark.py measures these against a directory
+with simulated network latency (scripts/benchmark.py --io-latency).
+"""
+
+import os
+import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+READ_AHEAD_BYTES = 256 * 1024 * 1024  # all read-ahead buffers together
+READ_AHEAD_SHARE = 4  # with --memory-budget: at most 1/4 of it
+
+
+# The primitive operations (the I/O benchmark wraps these with simulated latency)
+def _stat(path):
+    return os.stat(path)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _copy(source, destination):
+    shutil.copy2(source, destination)
+
+
+def map_ahead(fn, items, depth):
+    """Yield (item, fn(item)) in order, running up to depth calls at once.
+    An exception from fn is raised when its item is reached."""
+    if depth <= 1:
+        for item in items:
+            yield item, fn(item)
+        return
+    with ThreadPoolExecutor(max_workers=depth) as pool:
+        pending = deque()
+        for item in items:
+            pending.append((item, pool.submit(fn, item)))
+            if len(pending) >= depth:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+
+def stat_all(paths, depth):
+    """{path: os.stat_result} of every path"""
+    return dict(map_ahead(_stat, paths, depth))
+
+
+def read_ahead_limit(memory_budget_mb):
+    """Bytes read_ahead may buffer in a run with this memory budget (MB or None)"""
+    if not memory_budget_mb:
+        return READ_AHEAD_BYTES
+    return min(READ_AHEAD_BYTES, memory_budget_mb * 1024 * 1024 // READ_AHEAD_SHARE)
+
+
+def read_ahead(paths, sizes, depth, want=None, max_bytes=READ_AHEAD_BYTES):
+    """Yield (path, file contents) in order with up to depth reads in flight.
+
+    sizes maps each path to its size. Buffered contents (read ahead, plus
+    the one the caller is working on) never exceed max_bytes. Contents
+    are None (the caller opens the file itself) for paths that want(path)
+    rejects, files larger than max_bytes and files that could not be
+    read; in the last case the caller's own open reports the error as
+    before.
+    """
+    def read(path):
+        if want is not None and not want(path):
+            return None
+        try:
+            return _read(path)
+        except OSError:
+            return None
+
+    if depth <= 1:
+        for path in paths:
+            yield path, None  # inline: the caller reads the file as it always did
+        return
+
+    skipped = Future()
+    skipped.set_result(None)
+    pending = deque()  # (path, future, bytes buffered)
+    buffered = 0
+
+    def oldest():
+        """Hand out the oldest read; its buffer counts until the caller asks for more"""
+        nonlocal buffered
+        path, future, size = pending[0]
+        yield path, future.result()
+        pending.popleft()
+        buffered -= size
+
+    with ThreadPoolExecutor(max_workers=depth) as pool:
+        try:
+            for path in paths:
+                size = sizes[path]
+                if size > max_bytes:
+                    pending.append((path, skipped, 0))  # opened by path
+                    continue
+                while pending and (len(pending) >= depth or buffered + size > max_bytes):
+                    yield from oldest()
+                buffered += size
+                pending.append((path, pool.submit(read, path), size))
+            while pending:
+                yield from oldest()
+        finally:
+            for _, future, _ in pending:
+                future.cancel()  # the caller stopped early: drop reads not yet started
+
+
+def copy_all(pairs, depth):
+    """Copy (source, destination) pairs with copy2, up to depth at once.
+    Yields each source once it is copied; an error is raised when its
+    pair is reached."""
+    for (source, _), _ in map_ahead(lambda pair: _copy(*pair), pairs, depth):
+        yield source
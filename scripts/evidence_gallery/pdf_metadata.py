@@ -0,0 +1,183 @@
+"""
+PDF metadata table: 01-EVIDENCE-VAULT/metadata/documents_metadata.csv
+
+Stage 1 opens every vault PDF once, in a process pool working through
+batches of files, and records one row per document:
+
+  FileName             path within 01-EVIDENCE-VAULT/documents/
+  FileSize, FileModifyNs, SHA256
+  PageCount, PDFVersion, Title, Author, Subject, Keywords, Creator,
+  Producer, CreationDate, ModDate   (as stored in the PDF)
+  Encrypted, NeedsPassword          yes / no
+  PageSizes            distinct page sizes in points with their page
+                       counts, e.g. "612x792 (10); 792x612 (2)"
+  TextPages            pages that carry a text layer (use fonts)
+  HasTextLayer         yes / partial / no (no = scans: run OCR)
+  Error                why the PDF could not be read, if it could not
+
+Only new or changed documents (by size, mtime and SHA-256) are opened
+again on a re-run. Stages 2 and 3 and the live server take page counts
+and metadata from the table (lookup() checks the row still matches the
+file) and only open a PDF when they have pages to render.
+"""
+
+import csv
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .checkpoint import file_stamp
+from .tracing import span
+
+CSV_NAME = "documents_metadata.csv"
+COLUMNS = ['FileName', 'FileSize', 'FileModifyNs', 'SHA256', 'PageCount', 'PDFVersion', 'Title', 'Author',
+           'Subject', 'Keywords', 'Creator', 'Producer', 'CreationDate', 'ModDate', 'Encrypted',
+           'NeedsPassword', 'PageSizes', 'TextPages', 'HasTextLayer', 'Error']
+# Table column for each key of PyMuPDF's metadata dictionary
+PDF_KEYS = {'format': 'PDFVersion', 'title': 'Title', 'author': 'Author', 'subject': 'Subject',
+            'keywords': 'Keywords', 'creator': 'Creator', 'producer': 'Producer',
+            'creationDate': 'CreationDate', 'modDate': 'ModDate'}
+MAX_BATCH = 32  # documents per task sent to a worker
+
+
+def read_pdf(path):
+    """Table row (without the file columns) for one PDF (runs in a worker)"""
+    import fitz
+
+    row = {}
+    try:
+        with fitz.open(path) as pdf:
+            row['PageCount'] = pdf.page_count
+            for key, column in PDF_KEYS.items():
+                row[column] = (pdf.metadata or {}).get(key) or ''
+            row['Encrypted'] = 'yes' if pdf.is_encrypted or (pdf.metadata or {}).get('encryption') else 'no'
+            row['NeedsPassword'] = 'yes' if pdf.needs_pass else 'no'
+            if not pdf.needs_pass:
+                sizes = Counter()
+                text_pages = 0
+                for n in range(pdf.page_count):
+                    box = pdf.page_cropbox(n)
+                    sizes[f"{round(box.width)}x{round(box.height)}"] += 1
+                    text_pages += bool(pdf.get_page_fonts(n))
+                row['PageSizes'] = "; ".join(f"{size} ({count})" for size, count in sizes.most_common())
+                row['TextPages'] = text_pages
+                row['HasTextLayer'] = ('no' if not text_pages else
+                                       'yes' if text_pages == pdf.page_count else 'partial')
+    except Exception as e:
+        row['Error'] = str(e)[:200]
+    return row
+
+
+def read_pdfs(paths):
+    """read_pdf() of a batch of files (one worker task)"""
+    return [read_pdf(path) for path in paths]
+
+
+def read_table(metadata_dir):
+    """{file name: row} from documents_metadata.csv ({} if absent or
+    written with other columns)"""
+    try:
+        with open(os.path.join(metadata_dir, CSV_NAME), 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != COLUMNS:
+                return {}
+            return {row['FileName']: row for row in reader}
+    except FileNotFoundError:
+        return {}
+
+
+def write_table(metadata_dir, rows):
+    path = os.path.join(metadata_dir, CSV_NAME)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def extract_documents(metadata_dir, documents, workers):
+    """Write documents_metadata.csv for [(file name, vault path, sha256)].
+
+    Rows of unchanged documents are kept from the previous table; the
+    rest are read in batches by up to workers processes. Returns
+    (rows, number read, number reused).
+    """
+    import fitz  # noqa: F401  (ImportError here, not one error row per document)
+
+    previous = read_table(metadata_dir)
+    rows = {}
+    todo = []
+    for name, path, checksum in documents:
+        size, mtime_ns = file_stamp(path)
+        row = {'FileName': name, 'FileSize': size, 'FileModifyNs': mtime_ns, 'SHA256': checksum}
+        old = previous.get(name)
+        if old and not old['Error'] and [old['FileSize'], old['FileModifyNs'], old['SHA256']] == \
+                [str(size), str(mtime_ns), checksum]:
+            row = old
+        else:
+            todo.append((name, path))
+        rows[name] = row
+
+    workers = max(1, min(workers, len(todo)))
+    batch = max(1, min(MAX_BATCH, len(todo) // (workers * 4)))
+    batches = [todo[i:i + batch] for i in range(0, len(todo), batch)]
+    paths = [[path for _, path in b] for b in batches]
+    with span("pdf.metadata", files=len(todo)):
+        if workers == 1:
+            results = list(map(read_pdfs, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_pdfs, paths))
+    for b, found in zip(batches, results):
+        for (name, _), row in zip(b, found):
+            rows[name].update(row)
+
+    ordered = [rows[name] for name, _, _ in documents]
+    write_table(metadata_dir, ordered)
+    return ordered, len(todo), len(documents) - len(todo)
+
+
+def load_table(config):
+    """{absolute path: row} of the vault's documents_metadata.csv"""
+    documents = config.vault / "documents"
+    return {os.path.join(documents, name): row for name, row in read_table(config.metadata).items()}
+
+
+def lookup(table, path, stamp=None):
+    """The row for path if it still describes the file on disk, else None"""
+    row = table.get(os.fspath(path)) if table else None
+    if not row or row['Error'] or row['NeedsPassword'] == 'yes':
+        return None
+    size, mtime_ns = stamp or file_stamp(path)
+    if row['FileSize'] != str(size) or row['FileModifyNs'] != str(mtime_ns):
+        return None
+    return row
+
+
+def pdf_metadata(row):
+    """The row's PDF fields as PyMuPDF's metadata dictionary"""
+    return {key: row[column] for key, column in PDF_KEYS.items()}
+
+
+class LazyPDF:
+    """A PDF that is only opened when first needed (from data, its bytes,
+    if already read)"""
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self.data = data
+        self._doc = None
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            import fitz
+            self._doc = (fitz.open(stream=self.data, filetype="pdf") if self.data is not None
+                         else fitz.open(self.path))
+        return self._doc
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
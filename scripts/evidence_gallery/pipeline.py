@@ -0,0 +1,49 @@
+"""
+Digital Evidence Gallery - Complete Pipeline
+Runs all stages in-process: Vault → Optimize → (OCR) → Website
+"""
+
+from .ocr import ocr_documents
+from .optimize import optimize_for_web
+from .vault import build_vault
+from .website import generate_website
+
+STAGES = [
+    ("1/3", "Building Evidence Vault", build_vault, "scripts/1_build_vault.py"),
+    ("2/3", "Optimizing for Web", optimize_for_web, "scripts/2_optimize_for_web.py"),
+    ("3/3", "Generating Website", generate_website, "scripts/3_generate_website.py"),
+]
+
+# Optional, runs before the website stage when config.ocr is set
+OCR_STAGE = ("2b/3", "Running OCR on scanned pages", ocr_documents, "scripts/2b_ocr_documents.py")
+
+
+def pipeline_stages(config):
+    """The stages run_pipeline() will run for this config, in order"""
+    if not config.ocr:
+        return STAGES
+    return STAGES[:2] + [OCR_STAGE] + STAGES[2:]
+
+
+def run_pipeline(config):
+    """Run every stage against one config. Returns per-stage summaries.
+
+    A failing stage prints how to re-run it and re-raises.
+    """
+    results = {}
+    for stage_num, stage_name, stage, script in pipeline_stages(config):
+        print(f"Stage {stage_num}: {stage_name}...")
+        print("-" * 80)
+
+        try:
+            results[stage.__name__] = stage(config)
+        except Exception as e:
+            print(f"❌ Stage {stage_num} failed: {e}")
+            print(f"   Check the error messages above")
+            print(f"   Fix issues and run: python3 {script}")
+            raise
+
+        print(f"✅ Stage {stage_num} completed successfully")
+        print()
+
+    return results
@@ -0,0 +1,1489 @@
+"""
+HTML/CSS/JS shell of the lazy-loading evidence portal.
+
+Placeholders filled in by the website stage:
+  THUMBNAILS_DATA_PLACEHOLDER - embedded gallery thumbnails (JSON)
+  LAZY_PAGE_COUNT             - total number of rendered document pages
+  IMAGE_COUNT / DOCUMENT_COUNT / AGENCY_COUNT - header statistics
+  IMAGE_AGENCY_FILTERS / DOCUMENT_AGENCY_FILTERS - one filter button per source
+"""
+
+HTML_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Unified Forensic Evidence Portal</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #2a5298 0%, #1e3c72 100%);
+            min-height: 100vh;
+            padding: 10px;
+            color: #172144;
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+        }
+
+        .header {
+            background: #172144;
+            color: white;
+            padding: 20px;
+            text-align: center;
+        }
+
+        .header h1 {
+            font-size: clamp(24px, 5vw, 36px);
+            margin-bottom: 8px;
+        }
+
+        .header p {
+            font-size: clamp(12px, 3vw, 14px);
+            opacity: 0.9;
+        }
+
+        .stats {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
+            gap: 15px;
+            margin-top: 15px;
+            padding-top: 15px;
+            border-top: 1px solid rgba(255,255,255,0.2);
+        }
+
+        .stat-item {
+            text-align: center;
+        }
+
+        .stat-number {
+            font-size: clamp(20px, 4vw, 24px);
+            font-weight: bold;
+        }
+
+        .stat-label {
+            font-size: 12px;
+            opacity: 0.8;
+            margin-top: 4px;
+        }
+
+        .nav-tabs {
+            display: flex;
+            background: #f5f5f5;
+            border-bottom: 2px solid #e0e0e0;
+            flex-wrap: wrap;
+        }
+
+        .nav-tab {
+            flex: 1;
+            min-width: 120px;
+            padding: 14px 12px;
+            background: none;
+            border: none;
+            cursor: pointer;
+            font-size: clamp(13px, 2vw, 16px);
+            font-weight: 600;
+            color: #666;
+            transition: all 0.3s;
+            border-bottom: 3px solid transparent;
+        }
+
+        .nav-tab.active {
+            color: #172144;
+            background: white;
+            border-bottom-color: #172144;
+        }
+
+        .nav-tab:hover {
+            background: #fafafa;
+        }
+
+        .content-area {
+            display: none;
+            padding: clamp(15px, 4vw, 30px);
+        }
+
+        .content-area.active {
+            display: block;
+        }
+
+        .agency-filter {
+            display: flex;
+            gap: 10px;
+            margin-bottom: 20px;
+            flex-wrap: wrap;
+        }
+
+        .filter-btn {
+            padding: 8px 16px;
+            border: 2px solid #172144;
+            background: white;
+            color: #172144;
+            border-radius: 4px;
+            cursor: pointer;
+            font-weight: 600;
+            transition: all 0.3s;
+            min-height: 44px;
+        }
+
+        .filter-btn.active {
+            background: #172144;
+            color: white;
+        }
+
+        .filter-btn:hover {
+            background: #172144;
+            color: white;
+        }
+
+        .search-box {
+            width: 100%;
+            padding: 10px 14px;
+            border: 2px solid #172144;
+            border-radius: 4px;
+            font-size: 16px;
+            min-height: 44px;
+            margin-bottom: 12px;
+        }
+
+        .search-results {
+            margin-bottom: 20px;
+        }
+
+        .search-summary {
+            font-size: 13px;
+            color: #666;
+            margin-bottom: 8px;
+        }
+
+        .search-hit {
+            padding: 8px 0;
+            border-bottom: 1px solid #eee;
+        }
+
+        .search-doc {
+            font-weight: 600;
+            color: #172144;
+            margin-right: 8px;
+            word-break: break-word;
+        }
+
+        .page-chip {
+            border: 1px solid #172144;
+            background: white;
+            color: #172144;
+            border-radius: 3px;
+            padding: 2px 8px;
+            margin: 4px 4px 0 0;
+            font-size: 12px;
+            cursor: pointer;
+        }
+
+        .page-chip:hover {
+            background: #172144;
+            color: white;
+        }
+
+        .page-chip.muted {
+            border-color: #bbb;
+            background: white;
+            color: #999;
+            cursor: default;
+        }
+
+        .timeline-controls {
+            display: flex;
+            gap: 10px;
+            align-items: center;
+            flex-wrap: wrap;
+            margin-bottom: 12px;
+        }
+
+        .timeline-controls input {
+            padding: 8px;
+            border: 2px solid #172144;
+            border-radius: 4px;
+            min-height: 44px;
+        }
+
+        .timeline-month {
+            margin-bottom: 24px;
+        }
+
+        .timeline-month-title {
+            color: #172144;
+            border-bottom: 2px solid #172144;
+            padding-bottom: 4px;
+            margin-bottom: 8px;
+        }
+
+        .timeline-strip {
+            display: flex;
+            align-items: flex-end;
+            gap: 2px;
+            height: 40px;
+            margin-bottom: 10px;
+        }
+
+        .timeline-bar {
+            width: 10px;
+            min-height: 2px;
+            background: #172144;
+            opacity: 0.7;
+            cursor: pointer;
+        }
+
+        .timeline-bar:hover {
+            opacity: 1;
+        }
+
+        .timeline-day {
+            color: #172144;
+            margin: 14px 0 6px;
+        }
+
+        .timeline-hour {
+            font-size: 12px;
+            color: #666;
+            margin: 8px 0 6px;
+        }
+
+        .gallery {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(120px, 1fr));
+            gap: 12px;
+        }
+
+        @media (min-width: 640px) {
+            .gallery {
+                grid-template-columns: repeat(auto-fill, minmax(160px, 1fr));
+                gap: 15px;
+            }
+        }
+
+        @media (min-width: 1024px) {
+            .gallery {
+                grid-template-columns: repeat(auto-fill, minmax(180px, 1fr));
+                gap: 15px;
+            }
+        }
+
+        .gallery-item {
+            background: #f9f9f9;
+            border: 1px solid #e0e0e0;
+            border-radius: 6px;
+            overflow: hidden;
+            cursor: pointer;
+            transition: all 0.3s;
+            min-height: 160px;
+        }
+
+        .gallery-item:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 8px 20px rgba(0,0,0,0.15);
+            border-color: #172144;
+        }
+
+        .gallery-thumb {
+            width: 100%;
+            height: 120px;
+            object-fit: cover;
+            background: #f0f0f0;
+        }
+
+        .gallery-info {
+            padding: 10px;
+        }
+
+        .gallery-title {
+            font-size: clamp(11px, 1.5vw, 12px);
+            font-weight: 600;
+            color: #172144;
+            margin-bottom: 6px;
+            word-break: break-word;
+            line-height: 1.3;
+        }
+
+        .gallery-badge {
+            display: inline-block;
+            font-size: 10px;
+            padding: 3px 6px;
+            background: #e8e8e8;
+            border-radius: 3px;
+            color: #172144;
+            font-weight: 600;
+        }
+
+        .gallery-badge.duplicate {
+            background: #fff3cd;
+            margin-top: 4px;
+        }
+
+        .duplicate-group-header {
+            grid-column: 1 / -1;
+            padding: 8px 4px 0;
+            font-size: 13px;
+            font-weight: 600;
+            color: #172144;
+            border-top: 1px solid #e0e0e0;
+        }
+
+        .agency-badge {
+            display: inline-block;
+            font-size: 10px;
+            padding: 3px 6px;
+            background: #172144;
+            color: white;
+            border-radius: 3px;
+            margin-right: 4px;
+            font-weight: 600;
+        }
+
+        .modal {
+            display: none;
+            position: fixed;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background: rgba(0,0,0,0.8);
+            z-index: 1000;
+            align-items: center;
+            justify-content: center;
+            padding: 10px;
+        }
+
+        .modal.active {
+            display: flex;
+        }
+
+        .modal-content {
+            background: white;
+            border-radius: 8px;
+            max-width: 95vw;
+            max-height: 90vh;
+            display: flex;
+            overflow: hidden;
+            flex-direction: column;
+        }
+
+        @media (min-width: 768px) {
+            .modal-content {
+                flex-direction: row-reverse;
+                width: 90vw;
+                height: 85vh;
+            }
+        }
+
+        @media (min-width: 1200px) {
+            .modal-content {
+                width: 1000px;
+                height: 700px;
+            }
+        }
+
+        .modal-header {
+            background: #172144;
+            color: white;
+            padding: 15px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            flex-wrap: nowrap;
+            gap: 10px;
+            flex: 0 0 auto;
+        }
+
+        .modal-title {
+            font-size: clamp(14px, 3vw, 16px);
+            font-weight: 600;
+            flex: 1;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            white-space: nowrap;
+        }
+
+        .close-btn {
+            background: none;
+            border: none;
+            color: white;
+            font-size: 28px;
+            cursor: pointer;
+            padding: 5px;
+            min-width: 44px;
+            min-height: 44px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+        }
+
+        .modal-image {
+            flex: 1 1 60%;
+            padding: 15px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            background: #f9f9f9;
+            overflow: auto;
+            min-width: 0;
+            position: relative;
+        }
+
+        .modal-image img {
+            max-width: 100%;
+            max-height: 100%;
+            object-fit: contain;
+        }
+
+        .hit-box {
+            position: absolute;
+            background: rgba(255, 213, 0, 0.4);
+            outline: 1px solid rgba(200, 150, 0, 0.9);
+            pointer-events: none;
+        }
+
+        .modal-meta {
+            flex: 0 0 350px;
+            padding: 15px;
+            background: white;
+            overflow-y: auto;
+            border-right: 1px solid #e0e0e0;
+        }
+
+        @media (min-width: 768px) {
+            .modal-meta {
+                border-right: 1px solid #e0e0e0;
+                border-left: none;
+            }
+        }
+
+        @media (max-width: 767px) {
+            .modal-content {
+                flex-direction: column;
+                width: auto;
+                height: auto;
+            }
+            .modal-meta {
+                flex: 0 0 auto;
+                max-height: 200px;
+                border-right: none;
+                border-top: 1px solid #e0e0e0;
+            }
+        }
+
+        .modal-controls {
+            display: flex;
+            gap: 8px;
+            margin-top: 15px;
+            flex-wrap: wrap;
+        }
+
+        .control-btn {
+            background: #172144;
+            color: white;
+            border: none;
+            padding: 10px 12px;
+            border-radius: 4px;
+            cursor: pointer;
+            min-height: 44px;
+            font-weight: 600;
+            flex: 1;
+            min-width: 80px;
+        }
+
+        .control-btn:hover {
+            background: #0f1630;
+        }
+
+        .control-btn:disabled {
+            background: #ccc;
+            cursor: not-allowed;
+        }
+
+        .counter {
+            font-size: 13px;
+            color: #172144;
+            padding: 10px;
+            white-space: nowrap;
+        }
+
+        .meta-field {
+            margin-bottom: 12px;
+        }
+
+        .meta-label {
+            font-size: 10px;
+            color: #999;
+            text-transform: uppercase;
+            font-weight: 600;
+        }
+
+        .meta-value {
+            font-size: 13px;
+            color: #172144;
+            margin-top: 3px;
+            word-break: break-word;
+        }
+
+        .divider {
+            margin: 15px 0;
+            border-top: 1px solid #e0e0e0;
+        }
+
+        .loading {
+            text-align: center;
+            padding: 20px;
+            color: #172144;
+        }
+
+        .loading::after {
+            content: '';
+            animation: dots 1.5s steps(4, end) infinite;
+        }
+
+        @keyframes dots {
+            0%, 20% { content: ''; }
+            40% { content: '.'; }
+            60% { content: '..'; }
+            80%, 100% { content: '...'; }
+        }
+
+        @media (max-width: 480px) {
+            .container { border-radius: 4px; }
+            .header { padding: 15px; }
+            .nav-tab { padding: 10px 8px; font-size: 12px; }
+            .content-area { padding: 12px; }
+            .gallery { grid-template-columns: repeat(auto-fill, minmax(100px, 1fr)); gap: 10px; }
+            .modal-header { padding: 12px; }
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🔍 Unified Forensic Evidence Portal</h1>
+            <p>Comprehensive evidence review system for law enforcement agencies</p>
+            <div class="stats">
+                <div class="stat-item">
+                    <div class="stat-number">IMAGE_COUNT</div>
+                    <div class="stat-label">Photographs</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-number">DOCUMENT_COUNT</div>
+                    <div class="stat-label">Documents</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-number">LAZY_PAGE_COUNT</div>
+                    <div class="stat-label">Pages (Lazy Loaded)</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-number">AGENCY_COUNT</div>
+                    <div class="stat-label">Agencies</div>
+                </div>
+            </div>
+        </div>
+
+        <div class="nav-tabs">
+            <button class="nav-tab active" onclick="switchTab('images')">📸 Images</button>
+            <button class="nav-tab" onclick="switchTab('documents')">📄 Documents</button>
+            <button class="nav-tab" onclick="switchTab('timeline')">🕒 Timeline</button>
+        </div>
+
+        <div id="images" class="content-area active">
+            <h2 style="margin-bottom: 15px; color: #172144;">Evidence Photographs</h2>
+            <div class="agency-filter">
+                <button class="filter-btn active" onclick="filterByAgency('images', 'all')">All Agencies</button>
+IMAGE_AGENCY_FILTERS
+            </div>
+            <div class="agency-filter">
+                <button class="filter-btn" id="duplicateToggle" onclick="toggleDuplicateView()" style="display: none;"></button>
+            </div>
+            <div id="imageGallery" class="gallery"></div>
+        </div>
+
+        <div id="documents" class="content-area">
+            <h2 style="margin-bottom: 15px; color: #172144;">Evidence Documents</h2>
+            <div class="agency-filter">
+                <button class="filter-btn active" onclick="filterByAgency('documents', 'all')">All Agencies</button>
+DOCUMENT_AGENCY_FILTERS
+            </div>
+            <input id="documentSearch" class="search-box" type="search" placeholder="Search document text and metadata…"
+                   oninput="onDocumentSearch()" autocomplete="off">
+            <div id="searchResults" class="search-results"></div>
+            <div id="documentGallery" class="gallery"></div>
+        </div>
+
+        <div id="timeline" class="content-area">
+            <h2 style="margin-bottom: 15px; color: #172144;">Timeline</h2>
+            <div class="timeline-controls">
+                <label>From <input type="date" id="timelineFrom"></label>
+                <label>To <input type="date" id="timelineTo"></label>
+                <button class="filter-btn" onclick="applyTimelineRange()">Go</button>
+                <button class="filter-btn" onclick="clearTimelineRange()">All dates</button>
+            </div>
+            <div id="timelineSummary" class="search-summary"></div>
+            <div id="timelineView"></div>
+        </div>
+    </div>
+
+    <div id="imageModal" class="modal">
+        <div class="modal-content">
+            <div style="width: 100%; background: #172144; color: white; padding: 12px; display: flex; justify-content: space-between; align-items: center;">
+                <div class="modal-title" id="imageModalTitle"></div>
+                <button class="close-btn" onclick="closeModal('imageModal')">✕</button>
+            </div>
+            <div class="modal-image">
+                <img id="modalImage" src="" alt="">
+            </div>
+            <div class="modal-meta">
+                <div id="imageMetaContent"></div>
+                <div class="modal-controls">
+                    <button class="control-btn" id="imagePrevBtn" onclick="previousImage()">← Prev</button>
+                    <div class="counter"><span id="imageCounter"></span></div>
+                    <button class="control-btn" id="imageNextBtn" onclick="nextImage()">Next →</button>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <div id="documentModal" class="modal">
+        <div class="modal-content">
+            <div style="width: 100%; background: #172144; color: white; padding: 12px; display: flex; justify-content: space-between; align-items: center;">
+                <div class="modal-title" id="documentModalTitle"></div>
+                <button class="close-btn" onclick="closeModal('documentModal')">✕</button>
+            </div>
+            <div class="modal-image">
+                <img id="documentImage" src="" alt="">
+                <div id="documentHighlights"></div>
+            </div>
+            <div class="modal-meta">
+                <div id="documentMetaContent"></div>
+                <div class="modal-controls">
+                    <button class="control-btn" id="documentPrevBtn" onclick="previousPage()">← Prev Page</button>
+                    <div class="counter"><span id="pageCounter"></span></div>
+                    <button class="control-btn" id="documentNextBtn" onclick="nextPage()">Next Page →</button>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <script>
+        // Embedded thumbnail data (small, fast to load)
+        const thumbnailData = THUMBNAILS_DATA_PLACEHOLDER;
+
+        // These will be loaded on demand
+        let imageDataCache = null;
+
+        let currentImageFilter = 'all';
+        let showDuplicatesOnly = false;
+        let currentDocumentFilter = 'all';
+        let currentImageIndex = 0;
+        let currentDocumentIndex = 0;
+        let currentPageIndex = 0;
+
+        // Load image data on demand
+        async function loadImageData() {
+            if (imageDataCache) return imageDataCache;
+            try {
+                const response = await fetch('images-data.json');
+                imageDataCache = await response.json();
+                return imageDataCache;
+            } catch (e) {
+                console.error('Failed to load image data:', e);
+                return [];
+            }
+        }
+
+        // Document page lists (documents/<id>.json: metadata, low-resolution previews,
+        // search words and full-size page URLs), fetched when a document is opened
+        const DOCUMENTS_KEPT = 8;
+        const documentPages = new Map();  // page list URL -> Promise, least recently used first
+
+        function loadDocument(idx) {
+            const url = thumbnailData.documents[idx].pagesUrl;
+            let promise = documentPages.get(url);
+            if (promise) {
+                documentPages.delete(url);
+            } else {
+                promise = fetch(url).then(response => {
+                    if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+                    return response.json();
+                });
+                promise.catch(() => documentPages.delete(url));
+            }
+            documentPages.set(url, promise);
+            while (documentPages.size > DOCUMENTS_KEPT) documentPages.delete(documentPages.keys().next().value);
+            return promise;
+        }
+
+        function switchTab(tabName) {
+            document.querySelectorAll('.content-area').forEach(el => el.classList.remove('active'));
+            document.querySelectorAll('.nav-tab').forEach(el => el.classList.remove('active'));
+            document.getElementById(tabName).classList.add('active');
+            event.target.classList.add('active');
+            if (tabName === 'timeline') openTimeline();
+        }
+
+        function filterByAgency(type, agency) {
+            if (type === 'images') {
+                currentImageFilter = agency;
+                renderImageGallery();
+            } else {
+                currentDocumentFilter = agency;
+                renderDocumentGallery();
+                showSearchResults();
+            }
+
+            event.target.parentElement.querySelectorAll('.filter-btn').forEach(btn => btn.classList.remove('active'));
+            event.target.classList.add('active');
+        }
+
+        // Near-duplicate groups: group id -> image indexes (from Stage 3's perceptual hashes)
+        const duplicateGroups = new Map();
+        thumbnailData.images.forEach((img, idx) => {
+            if (img.dupGroup === undefined) return;
+            if (!duplicateGroups.has(img.dupGroup)) duplicateGroups.set(img.dupGroup, []);
+            duplicateGroups.get(img.dupGroup).push(idx);
+        });
+
+        function updateDuplicateToggle() {
+            const button = document.getElementById('duplicateToggle');
+            button.style.display = duplicateGroups.size ? '' : 'none';
+            button.textContent = showDuplicatesOnly ?
+                '← Show all photos' :
+                `≈ Near-duplicates (${duplicateGroups.size} group${duplicateGroups.size === 1 ? '' : 's'})`;
+            button.classList.toggle('active', showDuplicatesOnly);
+        }
+
+        function toggleDuplicateView() {
+            showDuplicatesOnly = !showDuplicatesOnly;
+            updateDuplicateToggle();
+            renderImageGallery();
+        }
+
+        function imageGalleryItem(img, idx) {
+            const group = img.dupGroup !== undefined ? duplicateGroups.get(img.dupGroup) : null;
+            return `<div class="gallery-item" onclick="openImageModal(${idx})">
+                    <img src="${img.thumbnail}" class="gallery-thumb" alt="${escapeHtml(img.FileName)}">
+                    <div class="gallery-info">
+                        <div class="agency-badge">${escapeHtml(img.Agency.split(' ')[0])}</div>
+                        <div class="gallery-title" title="${escapeHtml(img.FileName)}">${escapeHtml(img.FileName.substring(0, 20))}</div>
+                        ${group ? `<div class="gallery-badge duplicate" title="Near-duplicate group ${img.dupGroup}">≈ ${group.length - 1} similar</div>` : ''}
+                    </div>
+                </div>`;
+        }
+
+        function renderImageGallery() {
+            const gallery = document.getElementById('imageGallery');
+            const matches = img => currentImageFilter === 'all' || img.Agency === currentImageFilter;
+
+            let html = '';
+            if (showDuplicatesOnly) {
+                // One block per group; a group shows when any member passes the agency filter
+                duplicateGroups.forEach((members, groupId) => {
+                    if (!members.some(idx => matches(thumbnailData.images[idx]))) return;
+                    html += `<div class="duplicate-group-header">Group ${groupId} · ${members.length} photos</div>`;
+                    members.forEach(idx => { html += imageGalleryItem(thumbnailData.images[idx], idx); });
+                });
+            } else {
+                thumbnailData.images.forEach((img, idx) => {
+                    if (matches(img)) html += imageGalleryItem(img, idx);
+                });
+            }
+            gallery.innerHTML = html || '<div class="loading">No images found</div>';
+        }
+
+        function renderDocumentGallery() {
+            const gallery = document.getElementById('documentGallery');
+            const filtered = currentDocumentFilter === 'all' ?
+                thumbnailData.documents :
+                thumbnailData.documents.filter(doc => doc.Agency === currentDocumentFilter);
+
+            let html = '';
+            filtered.forEach((doc, idx) => {
+                const actualIdx = thumbnailData.documents.indexOf(doc);
+                html += `<div class="gallery-item" onclick="openDocumentModal(${actualIdx})">
+                    ${doc.preview ? `<img src="${doc.preview}" class="gallery-thumb">` : '<div class="gallery-thumb" style="display:flex;align-items:center;justify-content:center;background:#e0e0e0;"><span style="color:#999;">📄</span></div>'}
+                    <div class="gallery-info">
+                        <div class="agency-badge">${escapeHtml(doc.Agency.split(' ')[0])}</div>
+                        <div class="gallery-title" title="${escapeHtml(doc.FileName)}">${escapeHtml(doc.FileName.substring(0, 20))}</div>
+                        <div class="gallery-badge">${doc.pageCount} pages</div>
+                    </div>
+                </div>`;
+            });
+            gallery.innerHTML = html || '<div class="loading">No documents found</div>';
+        }
+
+        async function openImageModal(idx) {
+            const imageData = await loadImageData();
+            currentImageIndex = idx;
+            displayImage(imageData);
+            document.getElementById('imageModal').classList.add('active');
+        }
+
+        async function openDocumentModal(idx, pageIndex = 0, query = '') {
+            highlightQuery = query;
+            currentDocumentIndex = idx;
+            currentPageIndex = Math.max(0, Math.min(pageIndex, thumbnailData.documents[idx].maxPages - 1));
+            document.getElementById('documentModal').classList.add('active');
+            displayDocument();
+        }
+
+        function closeModal(modalId) {
+            document.getElementById(modalId).classList.remove('active');
+        }
+
+        async function displayImage(imageData) {
+            const img = imageData[currentImageIndex];
+            document.getElementById('modalImage').src = img.dataUri;
+            document.getElementById('imageModalTitle').textContent = escapeHtml(img.FileName);
+            document.getElementById('imageCounter').textContent = `${currentImageIndex + 1} / ${imageData.length}`;
+
+            let meta = `<span class="agency-badge">${escapeHtml(img.Agency)}</span>`;
+            meta += '<div class="divider"></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Date/Time</div><div class="meta-value">' + escapeHtml(img.DateTimeOriginal) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Camera</div><div class="meta-value">' + escapeHtml(img.Make) + ' ' + escapeHtml(img.Model) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">ISO</div><div class="meta-value">' + escapeHtml(img.ISO) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Aperture</div><div class="meta-value">' + escapeHtml(img.FNumber) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Shutter Speed</div><div class="meta-value">' + escapeHtml(img.ShutterSpeed) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Focal Length</div><div class="meta-value">' + escapeHtml(img.FocalLength) + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Resolution</div><div class="meta-value">' + escapeHtml(img.ImageWidth) + ' × ' + escapeHtml(img.ImageHeight) + '</div></div>';
+            const thumb = thumbnailData.images[currentImageIndex];
+            if (thumb && thumb.dupGroup !== undefined) {
+                const others = duplicateGroups.get(thumb.dupGroup).filter(idx => idx !== currentImageIndex)
+                    .map(idx => thumbnailData.images[idx].FileName);
+                meta += '<div class="meta-field"><div class="meta-label">Near-duplicates</div><div class="meta-value">' + escapeHtml(others.join(', ')) + '</div></div>';
+            }
+
+            document.getElementById('imageMetaContent').innerHTML = meta;
+            document.getElementById('imagePrevBtn').disabled = currentImageIndex === 0;
+            document.getElementById('imageNextBtn').disabled = currentImageIndex === imageData.length - 1;
+            prefetchNeighbours('i', currentImageIndex, imageData.length, i => imageData[i].dataUri);
+        }
+
+        async function displayDocument() {
+            const docIndex = currentDocumentIndex, pageIndex = currentPageIndex;
+            const docThumb = thumbnailData.documents[docIndex];
+            document.getElementById('documentModalTitle').textContent = escapeHtml(docThumb.FileName);
+
+            let doc;
+            try {
+                doc = await loadDocument(docIndex);
+            } catch (e) {
+                console.error('Failed to load document pages:', e);
+                document.getElementById('documentMetaContent').innerHTML = '<div class="loading">Could not load document</div>';
+                return;
+            }
+            if (docIndex !== currentDocumentIndex || pageIndex !== currentPageIndex) return;  // paged on meanwhile
+
+            const pages = doc.pages;
+            if (pages.length === 0) {
+                document.getElementById('documentMetaContent').innerHTML = '<div class="loading">No pages available</div>';
+                return;
+            }
+            currentPageIndex = Math.min(currentPageIndex, pages.length - 1);
+
+            // Low-resolution preview at once (unless the full page is decoded already),
+            // then the full page once it has been fetched and decoded
+            const page = pages[currentPageIndex];
+            const image = document.getElementById('documentImage');
+            const decoded = cachedPage(page.src);
+            currentPage = page;
+            currentPageWords = page.words || [];
+            sizeDocumentImage();
+            image.src = decoded ? decoded.src : page.preview;
+            drawHighlights();
+            loadPageWindow(pages, currentPageIndex);
+            if (!decoded) {
+                loadPage(page.src).then(img => {
+                    if (currentPage === page) image.src = img.src;
+                }).catch(e => {
+                    if (e.name !== 'AbortError') console.warn('Failed to load page:', e);
+                });
+            }
+            document.getElementById('pageCounter').textContent = `Page ${currentPageIndex + 1} of ${pages.length}`;
+
+            const metadata = doc.metadata;
+            let meta = `<span class="agency-badge">${escapeHtml(metadata.Agency)}</span>`;
+            meta += '<div class="divider"></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Created</div><div class="meta-value">' + metadata.CreationDateEmbedded + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Total Pages</div><div class="meta-value">' + metadata.pageCount + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Embedded Pages</div><div class="meta-value">' + metadata.embeddedPages + '</div></div>';
+            meta += '<div class="meta-field"><div class="meta-label">Author</div><div class="meta-value">' + metadata.DocumentAuthor + '</div></div>';
+
+            document.getElementById('documentMetaContent').innerHTML = meta;
+            document.getElementById('documentPrevBtn').disabled = currentPageIndex === 0;
+            document.getElementById('documentNextBtn').disabled = currentPageIndex === pages.length - 1;
+        }
+
+        // Decode the next/previous PREFETCH_ITEMS images in the background,
+        // so Prev/Next shows them without waiting
+        const PREFETCH_ITEMS = PREFETCH_COUNT;
+        const prefetched = new Map();  // key -> decoding Image, oldest first
+
+        function prefetchNeighbours(prefix, index, length, dataUri) {
+            for (let step = 1; step <= PREFETCH_ITEMS; step++) {
+                for (const i of [index + step, index - step]) {
+                    const key = prefix + i;
+                    if (i < 0 || i >= length || prefetched.has(key)) continue;
+                    const img = new Image();
+                    img.src = dataUri(i);
+                    img.decode().catch(() => {});
+                    prefetched.set(key, img);
+                }
+            }
+            while (prefetched.size > PREFETCH_ITEMS * 4) prefetched.delete(prefetched.keys().next().value);
+        }
+
+        // Full-size document pages: fetched with an AbortController so that paging
+        // quickly cancels pages that are no longer wanted, decoded off the main
+        // thread, and kept in a bounded LRU of decoded pages
+        const PAGE_CACHE_ITEMS = Math.max(PAGE_CACHE_COUNT, 2 * PREFETCH_ITEMS + 1);
+        const decodedPages = new Map();  // page URL -> decoded Image (blob URL), least recently used first
+        const pageLoads = new Map();     // page URL -> { controller, promise }
+        let currentPage = null;
+
+        function cachedPage(url) {
+            const img = decodedPages.get(url);
+            if (img) {
+                decodedPages.delete(url);
+                decodedPages.set(url, img);
+            }
+            return img;
+        }
+
+        function keepPage(url, img) {
+            decodedPages.set(url, img);
+            while (decodedPages.size > PAGE_CACHE_ITEMS) {
+                const [oldest, old] = decodedPages.entries().next().value;
+                decodedPages.delete(oldest);
+                URL.revokeObjectURL(old.src);
+            }
+        }
+
+        function loadPage(url) {
+            const img = cachedPage(url);
+            if (img) return Promise.resolve(img);
+            if (!pageLoads.has(url)) {
+                const controller = new AbortController();
+                const promise = fetch(url, { signal: controller.signal })
+                    .then(response => {
+                        if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+                        return response.blob();
+                    })
+                    .then(async blob => {
+                        const img = new Image();
+                        img.src = URL.createObjectURL(blob);
+                        try {
+                            await img.decode();
+                        } catch (e) {
+                            URL.revokeObjectURL(img.src);
+                            throw e;
+                        }
+                        if (controller.signal.aborted) {
+                            URL.revokeObjectURL(img.src);
+                            throw new DOMException('Page no longer wanted', 'AbortError');
+                        }
+                        keepPage(url, img);
+                        return img;
+                    })
+                    .finally(() => {
+                        if (pageLoads.get(url)?.controller === controller) pageLoads.delete(url);
+                    });
+                pageLoads.set(url, { controller, promise });
+            }
+            return pageLoads.get(url).promise;
+        }
+
+        // Load the shown page and PREFETCH_ITEMS on each side; cancel every other load in flight
+        function loadPageWindow(pages, index) {
+            const wanted = new Set();
+            for (let i = Math.max(0, index - PREFETCH_ITEMS); i <= Math.min(pages.length - 1, index + PREFETCH_ITEMS); i++) {
+                wanted.add(pages[i].src);
+            }
+            for (const [url, load] of pageLoads) {
+                if (!wanted.has(url)) {
+                    load.controller.abort();
+                    pageLoads.delete(url);
+                }
+            }
+            for (const url of wanted) {
+                if (url !== pages[index].src) loadPage(url).catch(() => {});
+            }
+        }
+
+        // Show previews and full pages in the same box: the page's size at the
+        // full rendition's DPI, scaled down to fit the viewer
+        function sizeDocumentImage() {
+            const image = document.getElementById('documentImage');
+            if (!currentPage || !currentPage.width) {
+                image.style.width = image.style.height = '';
+                return;
+            }
+            const box = image.parentElement;
+            const style = getComputedStyle(box);
+            const width = box.clientWidth - parseFloat(style.paddingLeft) - parseFloat(style.paddingRight);
+            const height = box.clientHeight - parseFloat(style.paddingTop) - parseFloat(style.paddingBottom);
+            const scale = Math.min(width / currentPage.width, height / currentPage.height, 1);
+            image.style.width = Math.floor(currentPage.width * scale) + 'px';
+            image.style.height = Math.floor(currentPage.height * scale) + 'px';
+        }
+
+        async function previousImage() {
+            if (currentImageIndex > 0) {
+                const imageData = await loadImageData();
+                currentImageIndex--;
+                displayImage(imageData);
+            }
+        }
+
+        async function nextImage() {
+            const imageData = await loadImageData();
+            if (currentImageIndex < imageData.length - 1) {
+                currentImageIndex++;
+                displayImage(imageData);
+            }
+        }
+
+        async function previousPage() {
+            if (currentPageIndex > 0) {
+                currentPageIndex--;
+                displayDocument();
+            }
+        }
+
+        async function nextPage() {
+            const doc = await loadDocument(currentDocumentIndex);
+            if (currentPageIndex < doc.pages.length - 1) {
+                currentPageIndex++;
+                displayDocument();
+            }
+        }
+
+        // Full-text search (index written by Stage 3, fetched on the first search)
+        let highlightQuery = '';     // search that opened the document viewer
+        let currentPageWords = [];   // [token, x, y, w, h] in thousandths of the page
+        let searchManifest = null;
+        const searchShards = new Map();
+        let searchTimer = null;
+        let searchGeneration = 0;
+
+        function searchTokens(text) {
+            // Must match search_index.tokenize()
+            return text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase().match(/[\p{L}\p{N}]{2,}/gu) || [];
+        }
+
+        async function fetchJsonMaybeGzip(url) {
+            const response = await fetch(url);
+            if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+            const bytes = new Uint8Array(await response.arrayBuffer());
+            // Still gzip unless the server sent it with Content-Encoding: gzip
+            if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                return JSON.parse(await new Response(stream).text());
+            }
+            return JSON.parse(new TextDecoder().decode(bytes));
+        }
+
+        async function loadSearchManifest() {
+            if (!searchManifest) {
+                searchManifest = await fetchJsonMaybeGzip('search/index.json');
+            }
+            return searchManifest;
+        }
+
+        function loadShard(key) {
+            if (!searchShards.has(key)) {
+                const promise = fetchJsonMaybeGzip('search/' + searchManifest.shards[key])
+                    .then(shard => ({ terms: shard.terms, postings: shard.postings, decoded: new Map() }));
+                promise.catch(() => searchShards.delete(key));
+                searchShards.set(key, promise);
+            }
+            return searchShards.get(key);
+        }
+
+        function lowerBound(sorted, value) {
+            let lo = 0, hi = sorted.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (sorted[mid] < value) lo = mid + 1; else hi = mid;
+            }
+            return lo;
+        }
+
+        function shardPostings(shard, i) {
+            let ids = shard.decoded.get(i);
+            if (!ids) {
+                const deltas = shard.postings[i];
+                ids = new Uint32Array(deltas.length);
+                let id = 0;
+                for (let j = 0; j < deltas.length; j++) {
+                    id += deltas[j];
+                    ids[j] = id;
+                }
+                shard.decoded.set(i, ids);
+            }
+            return ids;
+        }
+
+        // Sorted page ids containing term (with prefix: any term starting with it)
+        async function termPageIds(term, prefix) {
+            const keys = Object.keys(searchManifest.shards)
+                .filter(key => term.startsWith(key) || (prefix && key.startsWith(term)));
+            const shards = await Promise.all(keys.map(loadShard));
+            const lists = [];
+            for (const shard of shards) {
+                let i = lowerBound(shard.terms, term);
+                if (prefix) {
+                    for (; i < shard.terms.length && shard.terms[i].startsWith(term); i++) lists.push(shardPostings(shard, i));
+                } else if (shard.terms[i] === term) {
+                    lists.push(shardPostings(shard, i));
+                }
+            }
+            if (lists.length === 1) return lists[0];
+            // Union via a page bitmap: linear in the number of pages, no sorting
+            const hit = new Uint8Array(searchManifest.pageIds);
+            let count = 0;
+            for (const list of lists) {
+                for (let j = 0; j < list.length; j++) {
+                    if (!hit[list[j]]) { hit[list[j]] = 1; count++; }
+                }
+            }
+            const merged = new Uint32Array(count);
+            for (let id = 0, k = 0; k < count; id++) {
+                if (hit[id]) merged[k++] = id;
+            }
+            return merged;
+        }
+
+        function intersectIds(a, b) {
+            const out = [];
+            let i = 0, j = 0;
+            while (i < a.length && j < b.length) {
+                if (a[i] < b[j]) i++;
+                else if (a[i] > b[j]) j++;
+                else { out.push(a[i]); i++; j++; }
+            }
+            return Uint32Array.from(out);
+        }
+
+        // Every term must occur on the page; the last one is matched as a prefix while typing
+        async function searchPages(query) {
+            const tokens = searchTokens(query);
+            if (!tokens.length) return new Uint32Array(0);
+            await loadSearchManifest();
+            const prefixLast = !/\s$/.test(query);
+            const lists = await Promise.all(tokens.map((t, i) => termPageIds(t, prefixLast && i === tokens.length - 1)));
+            lists.sort((a, b) => a.length - b.length);
+            return lists.reduce((acc, list) => intersectIds(acc, list));
+        }
+
+        // Global page id -> [index into thumbnailData.documents, page number (0 = name/metadata)]
+        function pageLocation(id) {
+            const offsets = searchManifest.offsets;
+            let lo = 0, hi = offsets.length - 1;
+            while (lo < hi) {
+                const mid = (lo + hi + 1) >> 1;
+                if (offsets[mid] <= id) lo = mid; else hi = mid - 1;
+            }
+            return [lo, id - offsets[lo]];
+        }
+
+        function onDocumentSearch() {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(showSearchResults, 150);
+        }
+
+        async function showSearchResults() {
+            const query = document.getElementById('documentSearch').value;
+            const box = document.getElementById('searchResults');
+            const generation = ++searchGeneration;
+            if (!query.trim()) {
+                box.innerHTML = '';
+                return;
+            }
+
+            let ids;
+            try {
+                ids = await searchPages(query);
+            } catch (e) {
+                console.error('Search failed:', e);
+                box.innerHTML = '<div class="loading">Search index not available</div>';
+                return;
+            }
+            if (generation !== searchGeneration) return;  // a newer query superseded this one
+
+            const byDoc = new Map();
+            for (const id of ids) {
+                const [doc, page] = pageLocation(id);
+                const info = thumbnailData.documents[doc];
+                if (currentDocumentFilter !== 'all' && info.Agency !== currentDocumentFilter) continue;
+                if (!byDoc.has(doc)) byDoc.set(doc, []);
+                byDoc.get(doc).push(page);
+            }
+
+            const matches = [...byDoc.values()].reduce((n, pages) => n + pages.length, 0);
+            let html = `<div class="search-summary">${matches} match(es) in ${byDoc.size} document(s)</div>`;
+            let shown = 0;
+            for (const [doc, pages] of byDoc) {
+                if (shown++ === 200) {
+                    html += '<div class="search-summary">Showing the first 200 documents</div>';
+                    break;
+                }
+                const info = thumbnailData.documents[doc];
+                html += `<div class="search-hit"><span class="agency-badge">${escapeHtml(info.Agency.split(' ')[0])}</span>`;
+                html += `<span class="search-doc">${escapeHtml(info.FileName)}</span><br>`;
+                for (const page of pages.slice(0, 30)) {
+                    if (page === 0) {
+                        html += `<button class="page-chip" onclick="openDocumentModal(${doc}, 0)">name/metadata</button>`;
+                    } else if (page <= info.maxPages) {
+                        html += `<button class="page-chip" onclick="openSearchHit(${doc}, ${page - 1})">p. ${page}</button>`;
+                    } else {
+                        html += `<button class="page-chip muted" title="Page not included in the portal">p. ${page}</button>`;
+                    }
+                }
+                if (pages.length > 30) html += `<span class="search-summary"> +${pages.length - 30} more pages</span>`;
+                html += '</div>';
+            }
+            box.innerHTML = html;
+        }
+
+        // Timeline (index written by Stage 3; month buckets fetched as they scroll into view)
+        let timelineManifest = null;
+        const timelineMonths = new Map();  // month -> promise of its [time, kind, index] items
+        let timelineObserver = null;
+        let timelineRange = ['', ''];      // inclusive YYYY-MM-DD bounds, '' = open
+
+        async function openTimeline() {
+            if (timelineManifest) return;
+            try {
+                timelineManifest = await fetchJsonMaybeGzip('timeline/index.json');
+            } catch (e) {
+                console.error('Failed to load timeline:', e);
+                document.getElementById('timelineView').innerHTML = '<div class="loading">Timeline not available</div>';
+                return;
+            }
+            const days = timelineManifest.days;
+            if (days.length) {
+                for (const id of ['timelineFrom', 'timelineTo']) {
+                    document.getElementById(id).min = days[0][0];
+                    document.getElementById(id).max = days[days.length - 1][0];
+                }
+            }
+            renderTimeline();
+        }
+
+        // Index of the first manifest day >= date (> date when after is set)
+        function timelineDayIndex(date, after) {
+            const days = timelineManifest.days;
+            let lo = 0, hi = days.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (days[mid][0] < date || (after && days[mid][0] === date)) lo = mid + 1; else hi = mid;
+            }
+            return lo;
+        }
+
+        function timelineDayCount(day) {
+            return day[1].reduce((n, hour) => n + hour[1], 0);
+        }
+
+        function formatTimelineDate(date, options) {
+            return new Date(date + 'T00:00:00').toLocaleDateString(undefined, options);
+        }
+
+        // Lay out every month in range from the manifest alone; items load per month on scroll
+        function renderTimeline() {
+            const days = timelineManifest.days;
+            const [from, to] = timelineRange;
+            const start = from ? timelineDayIndex(from, false) : 0;
+            const end = to ? timelineDayIndex(to, true) : days.length;
+
+            const months = new Map();
+            for (let i = start; i < end; i++) {
+                const month = days[i][0].slice(0, 7);
+                if (!months.has(month)) months.set(month, []);
+                months.get(month).push(days[i]);
+            }
+
+            let html = '', total = 0;
+            for (const [month, monthDays] of months) {
+                const counts = monthDays.map(timelineDayCount);
+                const count = counts.reduce((a, b) => a + b, 0);
+                const peak = Math.max(...counts);
+                total += count;
+                html += `<section class="timeline-month" data-month="${month}">
+                    <h3 class="timeline-month-title">${formatTimelineDate(month + '-01', { year: 'numeric', month: 'long' })} · ${count} item(s)</h3>
+                    <div class="timeline-strip">`;
+                monthDays.forEach((day, i) => {
+                    const hours = day[1].map(h => String(h[0]).padStart(2, '0') + 'h').join(' ');
+                    html += `<span class="timeline-bar" style="height:${Math.max(2, Math.round(40 * counts[i] / peak))}px" ` +
+                            `title="${day[0]}: ${counts[i]} item(s) (${hours})" onclick="jumpToTimelineDay('${day[0]}')"></span>`;
+                });
+                html += `</div>
+                    <div class="timeline-month-body" style="min-height:${Math.ceil(count / 6) * 180}px"><div class="loading">Loading…</div></div>
+                </section>`;
+            }
+
+            const undated = timelineManifest.undated.images + timelineManifest.undated.documents;
+            let summary = `${total} dated item(s) on ${end - start} day(s)`;
+            if (undated) summary += ` · ${undated} item(s) without a date are not shown`;
+            document.getElementById('timelineSummary').textContent = summary;
+
+            const view = document.getElementById('timelineView');
+            view.innerHTML = html || '<div class="loading">No dated items in this range</div>';
+            if (timelineObserver) timelineObserver.disconnect();
+            timelineObserver = new IntersectionObserver(entries => {
+                for (const entry of entries) {
+                    if (!entry.isIntersecting) continue;
+                    timelineObserver.unobserve(entry.target);
+                    renderTimelineMonth(entry.target);
+                }
+            }, { rootMargin: '600px 0px' });
+            view.querySelectorAll('.timeline-month').forEach(section => timelineObserver.observe(section));
+        }
+
+        function loadTimelineMonth(month) {
+            if (!timelineMonths.has(month)) {
+                const items = fetchJsonMaybeGzip('timeline/' + timelineManifest.months[month]).then(data => data.items);
+                items.catch(() => timelineMonths.delete(month));
+                timelineMonths.set(month, items);
+            }
+            return timelineMonths.get(month);
+        }
+
+        function timelineItem(kind, index, time) {
+            const item = kind === 'i' ? thumbnailData.images[index] : thumbnailData.documents[index];
+            const src = kind === 'i' ? item.thumbnail : item.preview;
+            const open = kind === 'i' ? `openImageModal(${index})` : `openDocumentModal(${index})`;
+            return `<div class="gallery-item" onclick="${open}">
+                    ${src ? `<img src="${src}" class="gallery-thumb" loading="lazy" alt="${escapeHtml(item.FileName)}">` : '<div class="gallery-thumb" style="display:flex;align-items:center;justify-content:center;background:#e0e0e0;"><span style="color:#999;">📄</span></div>'}
+                    <div class="gallery-info">
+                        <div class="agency-badge">${escapeHtml(item.Agency.split(' ')[0])}</div>
+                        <div class="gallery-title" title="${escapeHtml(item.FileName)}">${escapeHtml(item.FileName.substring(0, 20))}</div>
+                        <div class="gallery-badge">${kind === 'i' ? '📸' : '📄'} ${time.slice(11, 16)}</div>
+                    </div>
+                </div>`;
+        }
+
+        async function renderTimelineMonth(section) {
+            const body = section.querySelector('.timeline-month-body');
+            let items;
+            try {
+                items = await loadTimelineMonth(section.dataset.month);
+            } catch (e) {
+                console.error('Failed to load timeline month:', e);
+                body.innerHTML = '<div class="loading">Could not load this month</div>';
+                return;
+            }
+            const [from, to] = timelineRange;
+            let html = '', day = '', hour = '';
+            for (const [time, kind, index] of items) {
+                const d = time.slice(0, 10), h = time.slice(11, 13);
+                if ((from && d < from) || (to && d > to)) continue;
+                if (d !== day || h !== hour) {
+                    if (hour) html += '</div>';
+                    if (d !== day) html += `<h4 class="timeline-day">${formatTimelineDate(d, { weekday: 'short', year: 'numeric', month: 'short', day: 'numeric' })}</h4>`;
+                    html += `<div class="timeline-hour">${h}:00</div><div class="gallery">`;
+                    day = d;
+                    hour = h;
+                }
+                html += timelineItem(kind, index, time);
+            }
+            if (hour) html += '</div>';
+            body.style.minHeight = '';
+            body.innerHTML = html;
+        }
+
+        function applyTimelineRange() {
+            timelineRange = [document.getElementById('timelineFrom').value, document.getElementById('timelineTo').value];
+            renderTimeline();
+            document.getElementById('timelineView').scrollIntoView({ block: 'start' });
+        }
+
+        function clearTimelineRange() {
+            document.getElementById('timelineFrom').value = '';
+            document.getElementById('timelineTo').value = '';
+            applyTimelineRange();
+        }
+
+        function jumpToTimelineDay(day) {
+            document.getElementById('timelineFrom').value = day;
+            document.getElementById('timelineTo').value = day;
+            applyTimelineRange();
+        }
+
+        function openSearchHit(doc, pageIndex) {
+            openDocumentModal(doc, pageIndex, document.getElementById('documentSearch').value);
+        }
+
+        // Outline the words of the shown page that match the search it was opened from
+        function drawHighlights() {
+            const layer = document.getElementById('documentHighlights');
+            const img = document.getElementById('documentImage');
+            const tokens = searchTokens(highlightQuery);
+            const prefixLast = !/\s$/.test(highlightQuery);
+            let html = '';
+            if (tokens.length && img.complete && img.naturalWidth) {
+                const sx = img.clientWidth / 1000, sy = img.clientHeight / 1000;
+                for (const [token, x, y, w, h] of currentPageWords) {
+                    const hit = tokens.some((t, i) => token === t ||
+                        (prefixLast && i === tokens.length - 1 && token.startsWith(t)));
+                    if (!hit) continue;
+                    html += `<div class="hit-box" style="left:${img.offsetLeft + x * sx}px;top:${img.offsetTop + y * sy}px;` +
+                            `width:${w * sx}px;height:${h * sy}px"></div>`;
+                }
+            }
+            layer.innerHTML = html;
+        }
+
+        function escapeHtml(text) {
+            const map = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#039;' };
+            return String(text).replace(/[&<>"']/g, m => map[m]);
+        }
+
+        document.addEventListener('keydown', async (e) => {
+            if (document.getElementById('imageModal').classList.contains('active')) {
+                if (e.key === 'ArrowLeft') previousImage();
+                if (e.key === 'ArrowRight') nextImage();
+                if (e.key === 'Escape') closeModal('imageModal');
+            }
+            if (document.getElementById('documentModal').classList.contains('active')) {
+                if (e.key === 'ArrowLeft') previousPage();
+                if (e.key === 'ArrowRight') nextPage();
+                if (e.key === 'Escape') closeModal('documentModal');
+            }
+        });
+
+        document.getElementById('documentImage').addEventListener('load', drawHighlights);
+        window.addEventListener('resize', () => {
+            sizeDocumentImage();
+            drawHighlights();
+        });
+
+        // Initialize galleries
+        // Offline cache (sw.js, written by Stage 3); needs the portal served over HTTP(S)
+        if ('serviceWorker' in navigator && location.protocol.startsWith('http')) {
+            navigator.serviceWorker.register('sw.js').then(() => navigator.serviceWorker.ready).then(registration => {
+                // Once the page has settled, fetch the remaining data into the cache for offline use
+                setTimeout(() => registration.active.postMessage({
+                    type: 'prefetch',
+                    paths: ['images-data.json', ...new Set(thumbnailData.documents.map(doc => doc.pagesUrl))]
+                }), 3000);
+            }).catch(e => console.warn('Service worker unavailable:', e));
+        }
+
+        updateDuplicateToggle();
+        renderImageGallery();
+        renderDocumentGallery();
+    </script>
+</body>
+</html>'''
@@ -0,0 +1,143 @@
+"""
+Optional cProfile / tracemalloc profiling around a stage run.
+
+  --profile cpu   cProfile; writes RUN_DIR/cpu.prof (pstats, snakeviz) and
+                  RUN_DIR/cpu-top.txt, prints the top functions
+  --profile mem   tracemalloc; writes RUN_DIR/mem.snapshot (taken near
+                  the peak of traced memory) and RUN_DIR/mem-top.txt,
+                  prints the top allocation sites at that peak
+
+tracemalloc only sees Python allocations (bytes, base64 strings, JSON);
+pixel buffers allocated inside Pillow/PyMuPDF are not traced, so the
+memory report also prints the process's peak RSS.
+
+Only the main process is profiled; work done in worker processes shows
+up as time spent waiting on the pool.
+"""
+
+import contextlib
+import cProfile
+import io
+import pstats
+import resource
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_MODES = ('cpu', 'mem')
+
+
+def default_run_dir(root, name):
+    return Path(root) / "profiles" / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+
+@contextlib.contextmanager
+def profiled(mode, run_dir, top=20):
+    """Profile the enclosed block and report on exit"""
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode: {mode}")
+
+    run_dir = Path(run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    if mode == 'cpu':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _report_cpu(profiler, run_dir, top)
+    else:
+        tracemalloc.start(25)
+        sampler = _PeakSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            snapshot = sampler.snapshot or tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _report_mem(snapshot, current, peak, run_dir, top)
+
+
+class _PeakSampler(threading.Thread):
+    """Keeps a snapshot from (close to) the highest traced memory seen.
+
+    Polling get_traced_memory() is cheap; a snapshot is only taken when
+    usage grows 10% past the previous snapshot.
+    """
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.snapshot = None
+        self.snapshot_size = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self.snapshot_size * 1.1:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_size = current
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _report_cpu(profiler, run_dir, top):
+    profiler.dump_stats(run_dir / "cpu.prof")
+
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out).strip_dirs()
+    stats.sort_stats('cumulative').print_stats(top)
+    stats.sort_stats('tottime').print_stats(top)
+    (run_dir / "cpu-top.txt").write_text(out.getvalue())
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats('tottime').print_stats(top)
+    print()
+    print("CPU PROFILE (top functions by own time)")
+    print("-" * 80)
+    print(out.getvalue().split("\n\n", 1)[-1].strip())
+    print(f"Profile: {run_dir / 'cpu.prof'}")
+
+
+def _report_mem(snapshot, current, peak, run_dir, top):
+    snapshot.dump(str(run_dir / "mem.snapshot"))
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss = max_rss if sys.platform == 'darwin' else max_rss * 1024  # KiB on Linux
+
+    lines = [f"Peak traced memory: {peak / (1024*1024):.1f} MB (still allocated at end: {current / (1024*1024):.1f} MB)",
+             f"Peak RSS (incl. Pillow/PyMuPDF buffers): {max_rss / (1024*1024):.1f} MB",
+             "", f"Top {top} allocation sites (snapshot near peak):"]
+    for stat in snapshot.statistics('lineno')[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size / (1024*1024):8.2f} MB  {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
+
+    lines += ["", "Largest allocation tracebacks:"]
+    for stat in snapshot.statistics('traceback')[:3]:
+        lines.append(f"  {stat.size / (1024*1024):.2f} MB in {stat.count} blocks")
+        lines += [f"    {line}" for line in stat.traceback.format(limit=8)]
+
+    report = "\n".join(lines) + "\n"
+    (run_dir / "mem-top.txt").write_text(report)
+
+    print()
+    print("MEMORY PROFILE")
+    print("-" * 80)
+    print("\n".join(lines[:top + 4]))
+    print(f"Snapshot: {run_dir / 'mem.snapshot'}")
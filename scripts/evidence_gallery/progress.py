@@ -0,0 +1,210 @@
+"""
+Machine-readable progress stream.
+
+With --progress FILE (or --progress - for stdout) every stage writes
+JSON-lines events that orchestration can tail:
+
+  {"event": "phase_start", "stage": "stage2", "phase": "photos", "total": 5000, "total_bytes": ...}
+  {"event": "progress", ..., "done": 1200, "bytes": ..., "items_per_s": 8.1,
+   "bytes_per_s": ..., "eta_s": 470.2, "errors": 0, "cache_hits": 0}
+  {"event": "error", ..., "item": "IMG_0042.JPG", "error": "..."}
+  {"event": "heartbeat", ..., "idle_s": 31.0}
+  {"event": "phase_end", ..., "elapsed_s": 612.4}
+
+"progress" lines are rate-limited (one per second per phase at most), so
+the per-item cost in hot loops is a counter update and a clock read. A
+heartbeat is written every 15 s while a phase is open; "idle_s" is the
+time since the last finished item, which is what stall alerts should
+watch. Without --progress, phase() returns a shared no-op tracker.
+
+With --progress - everything else the stages print goes to stderr until
+finish(), so stdout can be parsed line by line.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+_stream = None
+_stdout = None  # the real stdout while it carries the events ('-')
+
+
+class ProgressStream:
+    """Serialized JSON-lines writer shared by all phases of a process"""
+
+    def __init__(self, destination, heartbeat=15.0):
+        self.destination = destination
+        self.pid = os.getpid()
+        if destination == '-':
+            self._file = _claim_stdout()
+        else:
+            self._file = open(destination, 'a', buffering=1)
+        self._lock = threading.Lock()
+        self._open = set()
+        self._heartbeat = heartbeat
+        self._thread = None
+        self._closed = False
+
+    def emit(self, event, **fields):
+        line = json.dumps({'ts': round(time.time(), 3), 'event': event, 'pid': self.pid, **fields},
+                          default=str)
+        with self._lock:
+            if self._closed:
+                return
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def opened(self, tracker):
+        with self._lock:
+            self._open.add(tracker)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._beat, daemon=True)
+                self._thread.start()
+
+    def closed(self, tracker):
+        with self._lock:
+            self._open.discard(tracker)
+
+    def _beat(self):
+        while not self._closed:
+            time.sleep(self._heartbeat)
+            with self._lock:
+                trackers = list(self._open)
+            for tracker in trackers:
+                self.emit('heartbeat', **tracker.snapshot(),
+                          idle_s=round(time.monotonic() - tracker.last_item, 1))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self.destination != '-':
+                self._file.close()
+
+
+class PhaseProgress:
+    """Counters for one phase (e.g. stage2/photos)"""
+
+    def __init__(self, stream, stage, phase, total, total_bytes=None, interval=1.0):
+        self.stream = stream
+        self.stage = stage
+        self.phase = phase
+        self.total = total
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.done = 0
+        self.bytes = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.started = self.last_item = self._last_emit = time.monotonic()
+
+    def __enter__(self):
+        self.stream.emit('phase_start', stage=self.stage, phase=self.phase,
+                         total=self.total, total_bytes=self.total_bytes)
+        self.stream.opened(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.stream.closed(self)
+        self.stream.emit('phase_end', **self.snapshot(),
+                         elapsed_s=round(time.monotonic() - self.started, 3))
+        return False
+
+    def advance(self, nbytes=0, cached=False):
+        """One item finished"""
+        self.done += 1
+        self.bytes += nbytes
+        if cached:
+            self.cache_hits += 1
+        now = self.last_item = time.monotonic()
+        if now - self._last_emit >= self.interval or self.done == self.total:
+            self._last_emit = now
+            self.stream.emit('progress', **self.snapshot())
+
+    def error(self, item, error):
+        """One item failed (still counts as done)"""
+        self.errors += 1
+        self.stream.emit('error', stage=self.stage, phase=self.phase, item=str(item), error=str(error)[:500])
+        self.advance()
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        items_per_s = self.done / elapsed
+        remaining = (self.total - self.done) if self.total is not None else None
+        if self.total_bytes and self.bytes:
+            eta = (self.total_bytes - self.bytes) / (self.bytes / elapsed)
+        elif remaining is not None and items_per_s > 0:
+            eta = remaining / items_per_s
+        else:
+            eta = None
+        return {
+            'stage': self.stage,
+            'phase': self.phase,
+            'done': self.done,
+            'total': self.total,
+            'bytes': self.bytes,
+            'total_bytes': self.total_bytes,
+            'items_per_s': round(items_per_s, 3),
+            'bytes_per_s': round(self.bytes / elapsed),
+            'eta_s': round(eta, 1) if eta is not None else None,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+        }
+
+
+class _NullProgress:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def advance(self, nbytes=0, cached=False):
+        pass
+
+    def error(self, item, error):
+        pass
+
+
+_NULL_PROGRESS = _NullProgress()
+
+
+def _claim_stdout():
+    """The real stdout, for events; from now on the rest of this process's
+    output (print banners included) goes to stderr"""
+    global _stdout
+    if _stdout is None:
+        _stdout = sys.stdout
+        sys.stdout = sys.stderr
+    return _stdout
+
+
+def phase(stage, name, total=None, total_bytes=None):
+    """Progress tracker for one phase: `with phase("stage2", "photos", len(photos)) as p:`"""
+    if _stream is None:
+        return _NULL_PROGRESS
+    return PhaseProgress(_stream, stage, name, total, total_bytes)
+
+
+def start(destination):
+    """Open the progress stream for this run"""
+    global _stream
+    _stream = ProgressStream(destination)
+
+
+def ensure(destination):
+    """Open the progress stream in a worker process (no-op if open)"""
+    global _stream
+    if destination is not None and (_stream is None or _stream.pid != os.getpid()):
+        _stream = ProgressStream(destination)
+
+
+def finish():
+    global _stream, _stdout
+    if _stream is not None:
+        _stream.close()
+        _stream = None
+    if _stdout is not None:
+        sys.stdout, _stdout = _stdout, None
+_stdout = None  # the real stdout while it carries the events ('-')
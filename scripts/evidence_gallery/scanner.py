@@ -0,0 +1,151 @@
+"""
+Recursive evidence discovery.
+
+walk_files() lists a folder tree with os.scandir on a thread pool, one
+directory per task, and yields files as soon as each directory has been
+read. A consumer (Stage 1's hash-and-copy loop) starts on the first
+files while the rest of a large or remote tree is still being
+enumerated. Results are not in tree order; list_files() sorts them.
+
+classify() decides what a file is from its first bytes, not its name,
+so misnamed files and upper-case extensions (.PDF, .JPG) land in the
+right vault category:
+
+  photos     JPEG, PNG, GIF, TIFF (incl. most camera raw), BMP, WebP, HEIF/AVIF
+  documents  PDF
+  videos     MP4/MOV/3GP/M4V, AVI, Matroska/WebM, MPEG-PS/TS, ASF/WMV, FLV
+  other      anything else (still preserved and checksummed)
+"""
+
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CATEGORIES = ("photos", "documents", "videos", "other")
+HEAD_BYTES = 1024  # readers accept a PDF header anywhere in the first KB
+SKIP_NAMES = {'.DS_Store', 'Thumbs.db', 'desktop.ini'}
+# The template's own guides at the top of 00-SOURCE-EVIDENCE/, not evidence
+GUIDE_FILES = {'START_HERE.md', 'README.md'}
+
+_IMAGE_BRANDS = (b'heic', b'heix', b'hevc', b'heim', b'heis', b'mif1', b'msf1', b'avif', b'avis')
+_BMP_HEADER_SIZES = (12, 16, 40, 52, 56, 64, 108, 124)  # BITMAPCOREHEADER ... BITMAPV5HEADER
+# %PDF-<version> at the start of the file or of a line (after a junk prefix)
+_PDF_HEADER = re.compile(rb'(?:^|[\r\n])%PDF-[12]\.\d')
+_DONE = object()
+
+
+def classify(head):
+    """Vault category for a file starting with these bytes"""
+    if head.startswith((b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a',
+                        b'II*\x00', b'MM\x00*')):
+        return "photos"
+    if head[:2] == b'BM' and int.from_bytes(head[14:18], 'little') in _BMP_HEADER_SIZES:
+        return "photos"
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return "photos"
+    if head[4:8] == b'ftyp':
+        return "photos" if head[8:12] in _IMAGE_BRANDS else "videos"
+    if _PDF_HEADER.search(head, 0, HEAD_BYTES):
+        return "documents"
+    if head[:4] == b'RIFF' and head[8:12] == b'AVI ':
+        return "videos"
+    if head.startswith((b'\x1a\x45\xdf\xa3', b'\x00\x00\x01\xba', b'\x30\x26\xb2\x75\x8e\x66\xcf\x11', b'FLV')):
+        return "videos"
+    if len(head) > 188 and head[0] == 0x47 and head[188] == 0x47:
+        return "videos"  # MPEG transport stream: sync byte every 188 bytes
+    return "other"
+
+
+def sniff(path):
+    """classify() of a file on disk"""
+    with open(path, 'rb') as f:
+        return classify(f.read(HEAD_BYTES))
+
+
+def walk_files(root, workers=8, max_queued=10000):
+    """Yield (path, path relative to root with '/' separators) for every
+    file below root, in discovery order. Hidden files and OS clutter
+    (SKIP_NAMES) are left out. Symlinked files are listed (their target
+    is read); symlinked folders are skipped with a warning, since they
+    can loop."""
+    root = os.fspath(root)
+    if not os.path.isdir(root):
+        return
+    found = queue.Queue(maxsize=max_queued)  # bounded: scanning waits for a slow consumer
+    stopped = threading.Event()
+    lock = threading.Lock()
+    pending = [1]
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                found.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def visit(directory, prefix):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or entry.name in SKIP_NAMES:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        with lock:
+                            pending[0] += 1
+                        pool.submit(visit, entry.path, f"{prefix}{entry.name}/")
+                    elif entry.is_file():
+                        put((entry.path, prefix + entry.name))
+                    elif entry.is_symlink():
+                        kind = "link to a folder" if entry.is_dir() else "broken link"
+                        print(f"  ⚠️  Skipped {kind}: {prefix}{entry.name}")
+        except OSError as e:
+            print(f"  ⚠️  Cannot read folder {directory}: {e}")
+        finally:
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        pool.submit(visit, root, "")
+        while (item := found.get()) is not _DONE:
+            yield item
+    finally:
+        stopped.set()
+        pool.shutdown(wait=True)
+
+
+def walk_evidence(source, workers=8):
+    """walk_files() of 00-SOURCE-EVIDENCE/ without the template's guide files"""
+    return ((path, rel) for path, rel in walk_files(source, workers) if rel not in GUIDE_FILES)
+
+
+def list_files(root, workers=8, suffixes=None):
+    """Sorted [(path, relative path)] below root, optionally only names
+    ending in suffixes (compared case-insensitively)"""
+    files = [(path, rel) for path, rel in walk_files(root, workers)
+             if suffixes is None or rel.lower().endswith(suffixes)]
+    files.sort(key=lambda item: item[1])
+    return files
+
+
+def list_documents(root, workers=8):
+    """Sorted [(path, relative path)] of the PDFs below root: names ending
+    in .pdf, and any other file whose content classify()s as a document
+    (Stage 1 files PDFs by content, whatever their extension)"""
+    return [(path, rel) for path, rel in list_files(root, workers)
+            if rel.lower().endswith('.pdf') or sniff_quietly(path) == "documents"]
+
+
+def sniff_quietly(path):
+    """sniff(), or None if the file cannot be read"""
+    try:
+        return sniff(path)
+    except OSError:
+        return None
+
@@ -0,0 +1,171 @@
+"""
+Full-text search index over document text and metadata for the portal.
+
+Stage 3 extracts the text layer of each PDF's rendered pages while it
+has the document open (or, for scanned pages, takes the OCR stage's
+words) and keeps the distinct terms of every page. The index written
+here is:
+
+  search/index.json        manifest: page offsets per document + shard list
+  search/<prefix>.json.gz  terms starting with <prefix> and their postings
+
+Every document page gets a global page id (document offset + page number,
+page 0 being the file name/metadata), and each term's postings are its
+sorted page ids, delta-encoded. Terms are sharded by their first two
+characters; a shard with too many postings is split on a longer prefix.
+The viewer fetches the manifest on the first search and then only the
+shards the query's terms fall into, so a 100k-page case answers searches
+from a few small downloads.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from array import array
+
+INDEX_VERSION = 1
+MIN_PREFIX = 2
+MAX_PREFIX = 4
+SHARD_POSTINGS = 200_000  # split a shard holding more postings than this
+
+_TERM = re.compile(r"[^\W_]{2,}")
+
+
+def tokenize(text):
+    """Lower-cased, accent-folded words of two or more letters/digits.
+
+    The viewer's tokenizer (portal_template.py) must stay in step with this.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _TERM.findall(text.lower())
+
+
+def page_words(page):
+    """Tokens of a page's text layer as [token, x, y, width, height], with
+    coordinates in thousandths of the (rotated) page like OCR word boxes"""
+    import fitz
+
+    width, height = page.rect.width, page.rect.height
+    words = []
+    for x0, y0, x1, y1, text, *_ in page.get_text("words"):
+        r = fitz.Rect(x0, y0, x1, y1) * page.rotation_matrix
+        box = [round(r.x0 * 1000 / width), round(r.y0 * 1000 / height),
+               round(r.width * 1000 / width), round(r.height * 1000 / height)]
+        words += [[token] + box for token in tokenize(text)]
+    return words
+
+
+def document_words(pdf_doc, max_pages, ocr_pages=None):
+    """Word boxes of the first max_pages pages (the ones the portal
+    renders); entry 0 is the file name/metadata and has none. Pages found
+    in ocr_pages ({page number: OCR result}) use the OCR words."""
+    ocr_pages = ocr_pages or {}
+    words = [[]]
+    for number in range(1, max_pages + 1):
+        words.append(ocr_pages[number]['words'] if number in ocr_pages else page_words(pdf_doc[number - 1]))
+    return words
+
+
+def document_terms(metadata_text, words):
+    """Distinct terms per page: entry 0 from the file name/metadata, the
+    rest from document_words()"""
+    return [sorted(set(tokenize(' '.join(t for t in metadata_text if t))))] + \
+        [sorted({w[0] for w in page_boxes}) for page_boxes in words[1:]]
+
+
+def words_digest(words):
+    """Short hash of document_words() output, to tell whether a stored copy is current"""
+    return hashlib.sha256(json.dumps(words, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+
+
+def _shard_keys(terms, postings):
+    """Map every term to its shard key, splitting heavy prefixes"""
+    keys = {}
+
+    def assign(group, length):
+        by_prefix = {}
+        for term in group:
+            by_prefix.setdefault(term[:length], []).append(term)
+        for prefix, members in by_prefix.items():
+            heavy = sum(len(postings[t]) for t in members) > SHARD_POSTINGS
+            if heavy and length < MAX_PREFIX:
+                short = [t for t in members if len(t) <= length]
+                for term in short:
+                    keys[term] = prefix
+                assign([t for t in members if len(t) > length], length + 1)
+            else:
+                for term in members:
+                    keys[term] = prefix
+
+    assign(terms, MIN_PREFIX)
+    return keys
+
+
+def _delta(ids):
+    previous = 0
+    out = []
+    for page_id in ids:
+        out.append(page_id - previous)
+        previous = page_id
+    return out
+
+
+def write_search_index(documents, document_text, out_dir):
+    """Build the sharded index for documents (in portal order).
+
+    document_text maps (agency, file name) to the per-page term lists
+    from document_terms().
+    Returns a summary dict.
+    """
+    offsets = []
+    postings = {}
+    next_id = 0
+    for doc in documents:
+        pages = document_text.get((doc['Agency'], doc['FileName']), [[]])
+        offsets.append(next_id)
+        for page_number, terms in enumerate(pages):
+            page_id = next_id + page_number
+            for term in terms:
+                ids = postings.get(term)
+                if ids is None:
+                    ids = postings[term] = array('I')
+                ids.append(page_id)
+        next_id += len(pages)
+
+    os.makedirs(out_dir, exist_ok=True)
+    keys = _shard_keys(sorted(postings), postings)
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(keys[term], []).append(term)
+
+    files = {}
+    total_bytes = 0
+    for key, terms in shards.items():
+        name = key.encode('utf-8').hex() + ".json.gz"
+        payload = json.dumps({'terms': terms, 'postings': [_delta(postings[t]) for t in terms]},
+                             ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp = os.path.join(out_dir, name + ".tmp")
+        with gzip.open(tmp, 'wb', compresslevel=9) as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(out_dir, name))
+        files[key] = name
+        total_bytes += os.path.getsize(os.path.join(out_dir, name))
+
+    manifest = {'version': INDEX_VERSION, 'minPrefix': MIN_PREFIX,
+                'offsets': offsets, 'pageIds': next_id, 'shards': files}
+    tmp = os.path.join(out_dir, "index.json.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, os.path.join(out_dir, "index.json"))
+
+    # Shards from earlier runs that no longer exist
+    live = set(files.values()) | {"index.json"}
+    for name in os.listdir(out_dir):
+        if name not in live:
+            os.remove(os.path.join(out_dir, name))
+
+    return {'terms': len(postings), 'shards': len(files), 'bytes': total_bytes}
@@ -0,0 +1,202 @@
+"""
+Local web server for the generated portal (scripts/serve.py).
+
+Compared with `python3 -m http.server` it:
+  - handles every connection in its own thread, with HTTP/1.1 keep-alive,
+    so many reviewers on a LAN can browse at once
+  - answers Range requests (206 / 416), so large files resume and seek
+  - sends content-hash ETags and answers If-None-Match with 304
+  - marks `?v=<hash>` URLs whose hash matches the file as immutable
+    (the Service Worker requests files this way), and tells browsers to
+    revalidate everything else
+  - serves the .br/.gz siblings Stage 3 writes when the browser accepts them
+  - streams file bodies with sendfile()
+
+Directory listings are disabled.
+"""
+
+import email.utils
+import os
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .service_worker import file_digest
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # preferred first
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def parse_range(header, size):
+    """(start, length) for a single 'bytes=' range; None to ignore the
+    header; ValueError if the range cannot be satisfied"""
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None  # other units and multi-range requests get the whole file
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start, end = max(0, size - int(last)), size - 1  # suffix range: the last N bytes
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+class PortalRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "EvidencePortal/1"
+
+    def do_GET(self):
+        self.serve_file(send_body=True)
+
+    def do_HEAD(self):
+        self.serve_file(send_body=False)
+
+    def list_directory(self, path):
+        self.send_error(HTTPStatus.NOT_FOUND, "Directory listing is disabled")
+        return None
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def accepted_encodings(self):
+        accepted = set()
+        for part in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = part.partition(';')
+            quality = params.strip().removeprefix('q=')
+            try:
+                if params.strip() and float(quality) == 0:
+                    continue  # explicitly refused
+            except ValueError:
+                pass
+            accepted.add(name.strip().lower())
+        return accepted
+
+    def serve_file(self, send_body):
+        url = urlsplit(self.path)
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not url.path.endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', url.path + '/' + (f'?{url.query}' if url.query else ''))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path) or path.endswith('.tmp'):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        stat = os.stat(path)
+        digest = self.server.digest(path, stat)
+
+        # Precompressed sibling, if the browser takes it
+        variant, encoding = path, None
+        siblings = [(name, path + suffix) for name, suffix in ENCODINGS if os.path.isfile(path + suffix)]
+        accepted = self.accepted_encodings()
+        for name, sibling in siblings:
+            if name in accepted:
+                variant, encoding = sibling, name
+                break
+        etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+        immutable = parse_qs(url.query).get('v', [None])[0] == digest
+
+        def common_headers():
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', IMMUTABLE if immutable else REVALIDATE)
+            self.send_header('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True))
+            if siblings:
+                self.send_header('Vary', 'Accept-Encoding')
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in
+                              [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = os.path.getsize(variant)
+        start, length, status = 0, size, HTTPStatus.OK
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', etag) == etag:
+            try:
+                wanted = parse_range(range_header, size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if wanted:
+                start, length = wanted
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header('Content-Type', self.guess_type(path))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', f'bytes {start}-{start + length - 1}/{size}')
+        self.send_header('Content-Length', str(length))
+        common_headers()
+        self.end_headers()
+
+        if send_body and length:
+            with open(variant, 'rb') as f:
+                try:
+                    self.connection.sendfile(f, start, length)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+
+class PortalServer(ThreadingHTTPServer):
+    """Threaded server for one portal folder, with a content-hash cache"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, directory, quiet=False):
+        self.directory = os.fspath(directory)
+        self.quiet = quiet
+        self._digests = {}
+        self._lock = threading.Lock()
+        super().__init__(address, partial(PortalRequestHandler, directory=self.directory))
+
+    def digest(self, path, stat):
+        """Short SHA-256 of a file (as in sw.js), recomputed when it changes"""
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = file_digest(path)[:16]
+        with self._lock:
+            self._digests[path] = (key, digest)
+        return digest
+
+
+def serve(directory, host="127.0.0.1", port=8000, quiet=False):
+    """Serve a generated portal until interrupted"""
+    with PortalServer((host, port), directory, quiet=quiet) as server:
+        shown_host = "localhost" if host in ("127.0.0.1", "0.0.0.0", "::") else host
+        print(f"Serving {directory}")
+        print(f"Open: http://{shown_host}:{server.server_address[1]}/index.html")
+        if host in ("0.0.0.0", "::"):
+            print("Listening on all interfaces: reviewers on the LAN can use this machine's address")
+        print("Press Ctrl-C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped")
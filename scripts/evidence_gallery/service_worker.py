@@ -0,0 +1,133 @@
+"""
+Service Worker for the generated portal: offline use and instant restarts.
+
+Once every other output is written, Stage 3 hashes each portal file and
+writes sw.js with that content-hashed manifest baked in. The worker:
+
+  - precaches the portal shell (HTML, thumbnails, search and timeline
+    manifests) when installed
+  - caches every other portal file the first time it is fetched, keyed
+    by its content hash, and answers later requests from the cache
+  - on a rebuild (new manifest = new worker version) keeps the cached
+    files whose hash did not change and drops the old cache
+  - fetches files the page asks it to prefetch in the background
+
+Service Workers only run when the portal is served over HTTP(S) (or
+localhost); opened straight from disk (file://) the portal works as before.
+"""
+
+import hashlib
+import json
+import os
+
+from .compact import COMPRESSED_SUFFIXES
+
+SHELL_FILES = ('index.html', 'thumbnails-data.json', 'search/index.json', 'timeline/index.json')
+SKIP_FILES = ('sw.js', 'README.md')
+
+SW_TEMPLATE = r"""// Generated by Stage 3 (evidence_gallery/service_worker.py) - do not edit
+const VERSION = 'SW_VERSION';
+const ASSETS = SW_ASSETS;  // portal path -> content hash
+const SHELL = SW_SHELL;    // precached on install
+const CACHE_PREFIX = 'evidence-portal-';
+const CACHE = CACHE_PREFIX + VERSION;
+
+function assetPath(url) {
+    const scope = new URL(self.registration.scope);
+    if (url.origin !== scope.origin || !url.pathname.startsWith(scope.pathname)) return null;
+    const path = decodeURIComponent(url.pathname.slice(scope.pathname.length)) || 'index.html';
+    return Object.prototype.hasOwnProperty.call(ASSETS, path) ? path : null;
+}
+
+// Cache key that only changes when the file's content does
+function hashedKey(path) {
+    return new URL(path + '?v=' + ASSETS[path], self.registration.scope).href;
+}
+
+async function cachedAsset(path) {
+    const cache = await caches.open(CACHE);
+    const key = hashedKey(path);
+    let response = await cache.match(key) || await caches.match(key);  // unchanged since an older version
+    if (!response) {
+        response = await fetch(key, { cache: 'no-cache' });  // scripts/serve.py marks ?v=<hash> URLs immutable
+        if (!response.ok) return response;
+    }
+    await cache.put(key, response.clone());
+    return response;
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(Promise.all(SHELL.map(cachedAsset)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        // Carry unchanged files over from older versions, then drop their caches
+        const cache = await caches.open(CACHE);
+        const old = (await caches.keys()).filter(name => name.startsWith(CACHE_PREFIX) && name !== CACHE);
+        for (const name of old) {
+            const previous = await caches.open(name);
+            for (const path of Object.keys(ASSETS)) {
+                const key = hashedKey(path);
+                const response = await previous.match(key);
+                if (response && !(await cache.match(key))) await cache.put(key, response);
+            }
+            await caches.delete(name);
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    if (event.request.method !== 'GET' || event.request.headers.has('range')) return;
+    const path = assetPath(new URL(event.request.url));
+    if (path) event.respondWith(cachedAsset(path));
+});
+
+self.addEventListener('message', event => {
+    if (!event.data || event.data.type !== 'prefetch') return;
+    const paths = event.data.paths.filter(path => Object.prototype.hasOwnProperty.call(ASSETS, path));
+    event.waitUntil(Promise.all(paths.map(path => cachedAsset(path).catch(() => null))));
+});
+"""
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def asset_manifest(output_dir):
+    """{portal-relative path: short content hash} for every portal file"""
+    assets = {}
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, output_dir).replace(os.sep, '/')
+            if rel in SKIP_FILES or name.endswith('.tmp'):
+                continue
+            if name.endswith(COMPRESSED_SUFFIXES) and name[:-3] in filenames:
+                continue  # precompressed sibling; the server picks it for the original's URL
+            assets[rel] = file_digest(path)[:16]
+    return assets
+
+
+def write_service_worker(output_dir):
+    """Write sw.js for the files now in output_dir. Returns a summary dict."""
+    assets = asset_manifest(output_dir)
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode()).hexdigest()[:16]
+    shell = [path for path in SHELL_FILES if path in assets]
+    script = (SW_TEMPLATE.replace('SW_VERSION', version)
+              .replace('SW_SHELL', json.dumps(shell))
+              .replace('SW_ASSETS', json.dumps(assets, ensure_ascii=False, separators=(',', ':'))))
+
+    path = os.path.join(output_dir, "sw.js")
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(script)
+    os.replace(tmp, path)
+    return {'version': version, 'files': len(assets)}
@@ -0,0 +1,91 @@
+"""
+Source registry for the website stage.
+
+A source is one agency or collection whose photos and documents appear
+in the portal under its own name. Sources come from a JSON file:
+
+    {
+      "sources": [
+        {
+          "name": "County Attorney",
+          "images": ["/mnt/evidence/ca/photos"],
+          "documents": ["/mnt/evidence/ca/pdfs"],
+          "exif_csv": "/mnt/evidence/ca/exif.csv"
+        },
+        {
+          "name": "El Paso PD",
+          "images": ["/mnt/evidence/eppd/images"],
+          "documents": ["/mnt/evidence/eppd/documents"]
+        }
+      ]
+    }
+
+Relative paths are resolved against the folder holding the JSON file.
+"exif_csv" is optional; without it exiftool is run over the source's
+images at build time. Its SourceFile column should hold absolute paths,
+or paths relative to the image folder (exiftool run inside it). With no
+registry, the evidence vault itself is the single source.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class EvidenceSource:
+    """One agency/collection feeding the portal"""
+
+    name: str
+    image_dirs: list = field(default_factory=list)
+    document_dirs: list = field(default_factory=list)
+    exif_csv: Path = None
+
+    @property
+    def slug(self):
+        """File-name-safe, unique key for per-source work files"""
+        readable = re.sub(r'[^A-Za-z0-9]+', '_', self.name).strip('_')[:40] or 'source'
+        return f"{readable}-{hashlib.sha1(self.name.encode()).hexdigest()[:8]}"
+
+
+def _resolve(base, value):
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else base / path
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def load_sources(path):
+    """Read a source registry JSON file into EvidenceSource objects"""
+    path = Path(path)
+    base = path.parent
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    sources = []
+    for entry in data.get('sources', []):
+        if not entry.get('name'):
+            raise ValueError(f"{path}: every source needs a 'name'")
+        sources.append(EvidenceSource(
+            name=entry['name'],
+            image_dirs=[_resolve(base, p) for p in _as_list(entry.get('images'))],
+            document_dirs=[_resolve(base, p) for p in _as_list(entry.get('documents'))],
+            exif_csv=_resolve(base, entry['exif_csv']) if entry.get('exif_csv') else None,
+        ))
+    return sources
+
+
+def default_sources(config):
+    """The evidence vault as a single source"""
+    return [EvidenceSource(
+        name=config.default_source_name,
+        image_dirs=[config.vault / "photos"],
+        document_dirs=[config.vault / "documents"],
+        exif_csv=config.metadata / "photos_exif.csv",
+    )]
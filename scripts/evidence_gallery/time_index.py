@@ -0,0 +1,82 @@
+"""
+Time-bucketed index behind the portal's timeline view.
+
+Every photo (EXIF capture time) and document (PDF creation date) with a
+parseable date is placed in a day/hour bucket. Stage 3 writes:
+
+  timeline/index.json      manifest: item counts per day and hour, and the
+                           bucket file of every month
+  timeline/<YYYY-MM>.json  that month's items as [time, kind, index]
+
+The manifest alone lays out the whole timeline (each month's size is
+known from its counts), so jumping to a date range is a binary search
+over the sorted days; the viewer fetches a month's items only when it
+scrolls into view. kind is "i" (image) or "d" (document) and index points
+into the thumbnail arrays embedded in the portal.
+"""
+
+import json
+import os
+
+from .metadata_index import parse_timestamp
+
+TIMELINE_VERSION = 1
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def timeline_items(images, documents):
+    """Sorted [time, kind, index] for every dated item, and the undated counts"""
+    items = []
+    undated = {'images': 0, 'documents': 0}
+    for kind, label, records, field in (('i', 'images', images, 'DateTimeOriginal'),
+                                        ('d', 'documents', documents, 'createdAt')):
+        for index, record in enumerate(records):
+            taken = parse_timestamp(record.get(field))
+            if taken:
+                items.append([taken, kind, index])
+            else:
+                undated[label] += 1
+    items.sort()
+    return items, undated
+
+
+def write_time_index(images, documents, out_dir):
+    """Write the manifest and month buckets for the portal's thumbnail
+    arrays (in portal order). Returns a summary dict."""
+    items, undated = timeline_items(images, documents)
+
+    days = []  # [day, [[hour, count], ...]]
+    months = {}
+    for item in items:
+        day, hour = item[0][:10], int(item[0][11:13])
+        if not days or days[-1][0] != day:
+            days.append([day, []])
+        hours = days[-1][1]
+        if hours and hours[-1][0] == hour:
+            hours[-1][1] += 1
+        else:
+            hours.append([hour, 1])
+        months.setdefault(day[:7], []).append(item)
+
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    for month, month_items in months.items():
+        files[month] = f"{month}.json"
+        _write_json(os.path.join(out_dir, files[month]), {'month': month, 'items': month_items})
+
+    _write_json(os.path.join(out_dir, "index.json"),
+                {'version': TIMELINE_VERSION, 'days': days, 'months': files, 'undated': undated})
+
+    # Months from earlier runs that no longer have items
+    live = set(files.values()) | {"index.json"}
+    for name in os.listdir(out_dir):
+        if name not in live:
+            os.remove(os.path.join(out_dir, name))
+
+    return {'dated': len(items), 'undated': sum(undated.values()), 'days': len(days), 'months': len(files)}
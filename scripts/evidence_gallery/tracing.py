@@ -0,0 +1,142 @@
+"""
+Timing spans for the pipeline stages.
+
+Spans are off by default; span() then returns a shared no-op context and
+costs one global lookup. With --trace DIR the stages record one span per
+significant step (per file, per page, per rendition), and at the end of
+the run the spans are written as:
+
+  DIR/trace.json          Chrome trace-event format (chrome://tracing,
+                          https://ui.perfetto.dev)
+  DIR/trace-summary.txt   per-step totals and the slowest items
+
+Worker processes record into their own tracer and flush to
+DIR/spans-<pid>.jsonl; finish() merges those files.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+_NULL_SPAN = contextlib.nullcontext()
+_tracer = None
+
+
+class Tracer:
+    """Collects completed spans for one process"""
+
+    def __init__(self, trace_dir):
+        self.trace_dir = Path(trace_dir)
+        self.events = []
+        self.pid = os.getpid()
+
+    @contextlib.contextmanager
+    def span(self, name, category, args):
+        start_us = time.time_ns() // 1000
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start_us,
+                'dur': (time.perf_counter_ns() - start) / 1000,
+                'pid': self.pid,
+                'tid': threading.get_ident(),
+                'args': args,
+            })
+
+    def flush(self):
+        """Append recorded spans to this process's spill file"""
+        events, self.events = self.events, []
+        if not events:
+            return
+        with open(self.trace_dir / f"spans-{self.pid}.jsonl", 'a') as f:
+            for event in events:
+                f.write(json.dumps(event, default=str) + '\n')
+
+
+def span(name, category='pipeline', **args):
+    """Time a block: `with span("pdf.render", item=name, page=3): ...`"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, category, args)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def start(trace_dir):
+    """Enable tracing for this run, discarding spans of earlier runs"""
+    global _tracer
+    trace_dir = Path(trace_dir)
+    trace_dir.mkdir(parents=True, exist_ok=True)
+    for old in trace_dir.glob("spans-*.jsonl"):
+        old.unlink()
+    _tracer = Tracer(trace_dir)
+
+
+def ensure(trace_dir):
+    """Enable tracing in a worker process (no-op if already enabled)"""
+    global _tracer
+    if trace_dir is not None and (_tracer is None or _tracer.pid != os.getpid()):
+        _tracer = Tracer(trace_dir)
+
+
+def flush():
+    if _tracer is not None:
+        _tracer.flush()
+
+
+def finish(top=15):
+    """Merge all spans, write trace.json and the summary. Returns the summary text."""
+    global _tracer
+    if _tracer is None:
+        return None
+    tracer, _tracer = _tracer, None
+    tracer.flush()
+
+    events = []
+    for spill in sorted(tracer.trace_dir.glob("spans-*.jsonl")):
+        with open(spill) as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+        spill.unlink()
+    events.sort(key=lambda e: e['ts'])
+
+    with open(tracer.trace_dir / "trace.json", 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    summary = summarize(events, top)
+    with open(tracer.trace_dir / "trace-summary.txt", 'w') as f:
+        f.write(summary)
+    return summary
+
+
+def summarize(events, top=15):
+    """Per-step totals table plus the slowest individual items"""
+    totals = {}
+    for event in events:
+        entry = totals.setdefault(event['name'], [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += event['dur']
+        entry[2] = max(entry[2], event['dur'])
+
+    lines = [f"{'step':32} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+    for name, (count, total, longest) in sorted(totals.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{name:32} {count:>8} {total / 1e6:>10.2f} {total / count / 1e3:>10.1f} {longest / 1e3:>10.1f}")
+
+    items = [e for e in events if 'item' in e['args']]
+    items.sort(key=lambda e: -e['dur'])
+    lines.append("")
+    lines.append(f"Slowest {min(top, len(items))} items:")
+    for event in items[:top]:
+        extra = ", ".join(f"{k}={v}" for k, v in event['args'].items() if k != 'item')
+        lines.append(f"  {event['dur'] / 1e3:>10.1f} ms  {event['name']:24} {event['args']['item']}"
+                     + (f" ({extra})" if extra else ""))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,348 @@
+"""
+Stage 1: Build Evidence Vault
+
+Purpose:
+  - Discover evidence anywhere under 00-SOURCE-EVIDENCE/ (any folder
+    layout) and sort it into photos/documents/videos/other by content
+  - Copy it into 01-EVIDENCE-VAULT/, keeping each file's folder path,
+    and generate its checksum in the same read
+  - Extract metadata from all evidence files
+  - Generate vault manifest
+
+Input:  00-SOURCE-EVIDENCE/
+Output: 01-EVIDENCE-VAULT/
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+from datetime import datetime
+
+from . import progress
+from .chunked import (CHUNK_SIZE, CHUNKED_MIN_SIZE, READ_SIZE, StreamHasher, chunk_record_path,
+                      write_chunk_record)
+from .errors import StageError
+from .merkle import update_tree
+from .metadata_index import MetadataIndex
+from .parallel_io import map_ahead
+from .pdf_metadata import CSV_NAME, extract_documents
+from .scanner import CATEGORIES, HEAD_BYTES, classify, walk_evidence
+from .tracing import span
+
+INDEX_KINDS = {"photos": "image", "documents": "document", "videos": "video", "other": "other"}
+
+
+def generate_checksum(filepath, read_size=READ_SIZE):
+    """Generate SHA-256 checksum for file"""
+    sha256 = hashlib.sha256()
+    buffer = bytearray(read_size)
+    view = memoryview(buffer)
+    with open(filepath, 'rb', buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while n := f.readinto(buffer):
+            sha256.update(view[:n])
+    return sha256.hexdigest()
+
+
+def create_vault_structure(config):
+    """Create the vault category and metadata folders"""
+    config.vault.mkdir(exist_ok=True)
+    for category in CATEGORIES:
+        (config.vault / category).mkdir(exist_ok=True)
+    config.metadata.mkdir(exist_ok=True)
+
+
+def extract_exif(photo_dir, names, csv_path):
+    """Run exiftool over the photos (paths relative to photo_dir) and write
+    one CSV; run inside photo_dir, so each row's SourceFile is that path"""
+    with open(csv_path, 'w') as out:
+        subprocess.run(
+            ['exiftool', '-csv'] + names,
+            stdout=out,
+            cwd=photo_dir,
+            check=True
+        )
+
+
+def copy_and_hash(source, head, destination, metadata, name, read_size=READ_SIZE):
+    """Copy an open source file (head: its bytes already read) to
+    destination, hashing it on the way: one read of the evidence for both.
+    Files of CHUNKED_MIN_SIZE and more also get their per-chunk hashes
+    recorded under name (category/path). Returns (size, sha256)."""
+    size = os.fstat(source.fileno()).st_size
+    hasher = StreamHasher(CHUNK_SIZE if size >= CHUNKED_MIN_SIZE else None)
+    hasher.update(head)
+    buffer = bytearray(read_size)
+    view = memoryview(buffer)
+    tmp = destination.with_name(destination.name + ".tmp")
+    with open(tmp, 'wb') as out:
+        out.write(head)
+        while n := source.readinto(buffer):
+            hasher.update(view[:n])
+            out.write(view[:n])
+    shutil.copystat(source.name, tmp)
+    os.replace(tmp, destination)
+
+    checksum, chunks = hasher.result()
+    if chunks:
+        write_chunk_record(metadata, name, size, checksum, chunks)
+    elif os.path.exists(chunk_record_path(metadata, name)):
+        os.remove(chunk_record_path(metadata, name))
+    return size, checksum
+
+
+def ingest_file(source_path, rel, config, claimed):
+    """Classify one source file by its content and copy it to the same
+    relative path in its vault category folder (preserving timestamps)
+    while hashing it.
+
+    Returns a record dict; record['collision'] names an earlier file whose
+    path differs only in letter case (it would be overwritten on a
+    case-insensitive disk), and nothing is copied."""
+    with open(source_path, 'rb', buffering=0) as source:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(source.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        head = source.read(HEAD_BYTES)
+        category = classify(head)
+        first = claimed.setdefault((category, rel.casefold()), rel)
+        if first != rel:
+            return {'rel': rel, 'category': category, 'name': rel, 'collision': first}
+
+        destination = config.vault / category / rel
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with span("copy+sha256", item=rel):
+            size, checksum = copy_and_hash(source, head, destination, config.metadata, f"{category}/{rel}")
+    st = os.stat(destination)
+    return {'rel': rel, 'category': category, 'name': rel, 'size': size, 'sha256': checksum,
+            'stamp': (st.st_size, st.st_mtime_ns)}
+
+
+def write_file_stamps(config, records):
+    """Write metadata/file_stamps.txt: size and mtime of every vault copy,
+    for the fast mode of scripts/verify.py"""
+    with open(config.metadata / "file_stamps.txt", 'w') as f:
+        for r in records:
+            f.write(f"{r['stamp'][0]} {r['stamp'][1]}  {r['category']}/{r['name']}\n")
+
+
+def write_manifest(config, records, merkle):
+    """Write VAULT_MANIFEST.txt"""
+    by_category = {category: [r for r in records if r['category'] == category] for category in CATEGORIES}
+    photos, docs = by_category['photos'], by_category['documents']
+
+    manifest_content = f"""EVIDENCE VAULT MANIFEST
+========================
+Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Total Files: {len(records)}
+Total Size: {sum(r['size'] for r in records) / (1024*1024):.1f} MB
+"""
+
+    for category, label in (("photos", "PHOTOS"), ("documents", "DOCUMENTS"), ("other", "OTHER FILES")):
+        files = by_category[category]
+        if category == "other" and not files:
+            continue
+        manifest_content += f"\n{label}: {len(files)} files\n"
+        for r in files[:5]:  # First 5 as examples
+            manifest_content += f"  - {r['name']} ({r['size'] / (1024*1024):.1f} MB) [SHA-256: {r['sha256'][:16]}...]\n"
+        if len(files) > 5:
+            manifest_content += f"  ... and {len(files) - 5} more {category}\n"
+
+    manifest_content += f"""
+VIDEOS: {len(by_category['videos'])} files
+(Video processing support coming in future version)
+
+Metadata Files:
+  - metadata/photos_exif.csv ({len(photos)} records)
+  - metadata/documents_metadata.csv ({len(docs)} records)
+  - metadata/checksums.txt ({len(records)} checksums)
+  - metadata/file_stamps.txt (sizes and timestamps, for fast verification)
+  - metadata/merkle_leaves.txt, merkle_frontier.json (Merkle tree of the checksums)
+  - metadata/chunk_hashes/ (per-chunk SHA-256 of files over {CHUNKED_MIN_SIZE // (1024*1024)} MB)
+  - metadata/evidence_index.sqlite (queryable metadata index)
+
+INTEGRITY VERIFICATION:
+  All files preserved with SHA-256 checksums
+  Re-verify at any time: python3 scripts/verify.py
+  Merkle root: {merkle['root']} ({merkle['size']} files)
+  Prove one file: python3 scripts/verify.py --proof <category>/<file path>
+  Original timestamps and folder paths maintained
+  No modifications made to evidence
+
+CHAIN OF CUSTODY:
+  Evidence copied from: 00-SOURCE-EVIDENCE/
+  Vault location: 01-EVIDENCE-VAULT/
+  Processing date: {datetime.now().strftime('%Y-%m-%d')}
+  Next stage: Web optimization (scripts/2_optimize_for_web.py)
+"""
+
+    with open(config.vault / "VAULT_MANIFEST.txt", 'w') as f:
+        f.write(manifest_content)
+
+
+def build_vault(config):
+    """Run Stage 1 and return a summary of what was preserved"""
+    with span("stage1"):
+        return _build_vault(config)
+
+
+def _build_vault(config):
+    vault = config.vault
+    metadata = config.metadata
+
+    print("=" * 80)
+    print("STAGE 1: BUILDING EVIDENCE VAULT")
+    print("=" * 80)
+    print()
+
+    # Create vault structure
+    print("Creating vault structure...")
+    create_vault_structure(config)
+    print("✅ Vault directories created")
+    print()
+
+    # Discover, classify, copy and hash in one stream: files are copied
+    # while the rest of the tree is still being listed, up to --io-depth at once
+    print("Scanning source evidence and copying to vault (preserving timestamps)...")
+    records = []
+    collisions = []
+    failed = 0
+    claimed = {}
+
+    def ingest(item):
+        try:
+            return ingest_file(item[0], item[1], config, claimed)
+        except OSError as e:
+            return {'rel': item[1], 'error': e}
+
+    found = walk_evidence(config.source, config.io_depth)
+    with progress.phase("stage1", "ingest") as p, span("ingest"):
+        for _, record in map_ahead(ingest, found, config.io_depth):
+            if 'error' in record:
+                failed += 1
+                print(f"  ❌ Could not copy {record['rel']}: {record['error']}")
+                p.error(record['rel'], record['error'])
+            elif 'collision' in record:
+                collisions.append(record)
+            else:
+                records.append(record)
+                p.advance(record['size'])
+                if len(records) % 100 == 0:
+                    print(f"  ✅ Processed {len(records)} files...")
+
+    records.sort(key=lambda r: (CATEGORIES.index(r['category']), r['name']))
+    counts = {category: sum(r['category'] == category for r in records) for category in CATEGORIES}
+    for category in CATEGORIES:
+        print(f"  ✅ Copied {counts[category]} {category}")
+    print()
+
+    if collisions:
+        print(f"❌ {len(collisions)} file(s) differ from another only in letter case:")
+        for record in collisions[:10]:
+            print(f"   - {record['rel']} and {record['collision']}")
+        print("   Rename one of each pair in 00-SOURCE-EVIDENCE/ so both are preserved")
+        raise StageError(f"{len(collisions)} evidence file path(s) differ only in letter case")
+
+    if not records:
+        print("⚠️  No evidence files found in 00-SOURCE-EVIDENCE/")
+        print("   Please copy your evidence files (any folder layout) to 00-SOURCE-EVIDENCE/")
+        raise StageError("No evidence files found in 00-SOURCE-EVIDENCE/")
+
+    with open(metadata / "checksums.txt", 'w') as f:
+        f.writelines(f"{r['sha256']}  {r['category']}/{r['name']}\n" for r in records)
+    write_file_stamps(config, records)
+    checksums = [(r['sha256'], f"{r['category']}/{r['name']}") for r in records]
+
+    print(f"  ✅ Generated {len(checksums)} checksums")
+    print(f"  ✅ Saved to: {metadata / 'checksums.txt'}")
+    print()
+
+    # Merkle tree of exactly these checksums: new files are appended, so its root changes only with the vault
+    with span("merkle"):
+        merkle = update_tree(metadata, checksums)
+    if merkle['changed']:
+        print(f"  ⚠️  Content changed for {len(merkle['changed'])} file(s) already in the vault; tree rebuilt:")
+        for name in merkle['changed'][:10]:
+            print(f"       - {name}")
+    if merkle['removed']:
+        print(f"  ⚠️  {len(merkle['removed'])} file(s) no longer in the source evidence left the tree:")
+        for name in merkle['removed'][:10]:
+            print(f"       - {name}")
+    print(f"  ✅ Merkle root: {merkle['root'][:16]}... ({merkle['size']} files, {merkle['added']} new)")
+    print()
+
+    # Extract EXIF metadata from the vault copies of the photos
+    photos = [r['name'] for r in records if r['category'] == "photos"]
+    if photos:
+        print("Extracting EXIF metadata from photos...")
+        try:
+            with span("exiftool", files=len(photos)):
+                extract_exif(vault / "photos", photos, metadata / "photos_exif.csv")
+            print(f"  ✅ Extracted EXIF from {len(photos)} photos")
+            print(f"  ✅ Saved to: {metadata / 'photos_exif.csv'}")
+        except Exception as e:
+            print(f"  ⚠️  Warning: EXIF extraction failed: {e}")
+            print(f"     Continuing without EXIF data...")
+        print()
+
+    # PDF metadata table, read by the later stages instead of reopening every PDF
+    documents = [(r['name'], vault / "documents" / r['name'], r['sha256'])
+                 for r in records if r['category'] == "documents"]
+    if documents:
+        print("Extracting PDF metadata from documents...")
+        try:
+            rows, read, reused = extract_documents(metadata, documents, config.workers or os.cpu_count() or 1)
+            unreadable = sum(1 for row in rows if row.get('Error'))
+            print(f"  ✅ Extracted metadata from {read} documents" + (f" ({reused} unchanged, kept)" if reused else ""))
+            if unreadable:
+                print(f"  ⚠️  {unreadable} document(s) could not be read (see the Error column)")
+            print(f"  ✅ Saved to: {metadata / CSV_NAME}")
+        except ImportError:
+            print("  ⚠️  PyMuPDF not installed - skipping PDF metadata")
+            print("     Install with: pip3 install PyMuPDF")
+        print()
+
+    # Create vault manifest
+    print("Creating vault manifest...")
+    with span("manifest"):
+        write_manifest(config, records, merkle)
+    print("  ✅ Vault manifest created")
+    print()
+
+    # Index checksums and EXIF for fast sorted/filtered queries
+    print("Updating metadata index...")
+    with span("index"), MetadataIndex(config.metadata_index) as index:
+        for category, kind in INDEX_KINDS.items():
+            index.record_checksums(config.default_source_name, kind,
+                                   [(r['name'], r['size'], r['sha256']) for r in records
+                                    if r['category'] == category])
+        if (metadata / "photos_exif.csv").exists():
+            try:
+                index.import_exif_csv(metadata / "photos_exif.csv", config.default_source_name, [vault / "photos"])
+            except Exception as e:
+                print(f"  ⚠️  Warning: could not index EXIF: {e}")
+    print(f"  ✅ Saved to: {config.metadata_index}")
+    print()
+
+    print("=" * 80)
+    print("✅ STAGE 1 COMPLETE: Evidence Vault Created")
+    print("=" * 80)
+    print()
+    print(f"Vault Location: {vault}/")
+    print(f"Files Preserved: {len(records)}")
+    print(f"Metadata Extracted: {len(photos)} photos")
+    print(f"Checksums Generated: {len(checksums)}")
+    print()
+    print("Next stage: python3 scripts/2_optimize_for_web.py")
+    print("=" * 80)
+
+    return {
+        'photos': counts['photos'],
+        'documents': counts['documents'],
+        'videos': counts['videos'],
+        'other': counts['other'],
+        'failed': failed,
+        'checksums': len(checksums),
+        'merkle_root': merkle['root'],
+    }
@@ -0,0 +1,334 @@
+"""
+Vault integrity verification (scripts/verify.py).
+
+Re-hashes the evidence vault against 01-EVIDENCE-VAULT/metadata/checksums.txt
+and reports files whose content changed (mismatched), files that are
+gone (missing) and files in the vault that were never checksummed (extra).
+
+checksums.txt is streamed line by line and only a bounded window of
+files is in flight, so memory stays flat however large the vault is.
+Files are hashed by a thread pool with large sequential reads (hashlib
+releases the GIL while hashing them).
+
+Modes:
+  full     hash every file (default)
+  fast     skip hashing a file whose size and mtime still match
+           metadata/file_stamps.txt (written by Stage 1); a size change is
+           a mismatch without reading the file
+  sample   hash a random share of the files (spot check); the seed is
+           printed so an audit can repeat the same sample. Every file is
+           still checked for existence.
+
+Files with per-chunk hashes (see chunked.py) are checked chunk by chunk,
+in parallel. Verified chunks are journaled in
+.pipeline-state/verify-chunks.jsonl, so an interrupted run picks up
+where it stopped (--fresh starts over). --whole-file re-checks the
+whole-file SHA-256 instead.
+
+Merkle tree (see merkle.py):
+  --proof NAME          write an inclusion proof for one file
+  --check-proof FILE    re-hash the file a proof names and check the proof
+  --compare OTHER_ROOT  list files that differ from another vault copy
+"""
+
+import json
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import merkle, progress
+from .checkpoint import Journal, file_stamp
+from .chunked import chunk_ranges, chunked_files, hash_chunk, read_chunk_record
+from .scanner import CATEGORIES, walk_files
+from .tracing import span
+from .vault import generate_checksum
+
+IN_FLIGHT_PER_WORKER = 4  # files or chunks queued per hashing thread
+SHOW_NAMES = 20  # per problem list on the console; --report has them all
+
+
+def read_checksums(path):
+    """Yield (sha256, category/file path) from a checksums.txt, one line at a time"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line:
+                checksum, _, name = line.partition('  ')
+                yield checksum.lower(), name
+
+
+def read_file_stamps(path):
+    """{category/file path: (size, mtime_ns)} from file_stamps.txt ({} if absent)"""
+    stamps = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                numbers, _, rel = line.rstrip('\n').partition('  ')
+                size, mtime_ns = numbers.split()
+                stamps[rel] = (int(size), int(mtime_ns))
+    except FileNotFoundError:
+        pass
+    return stamps
+
+
+def vault_files(config):
+    """{category/file path: path} of every file in the vault's category
+    folders (the names checksums.txt uses)"""
+    files = {}
+    for category in CATEGORIES:
+        for path, name in walk_files(config.vault / category, config.io_depth):
+            if not name.endswith('.tmp'):
+                files[f"{category}/{name}"] = path
+    return files
+
+
+def precheck(path, stamp, fast, hash_it):
+    """(status, stat) decided without reading the file; status is None
+    if the file has to be hashed"""
+    if path is None:
+        return 'missing', None
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return 'missing', None
+    if not hash_it:
+        return 'skipped', st
+    if stamp and st.st_size != stamp[0]:
+        return 'mismatched', st
+    if fast and stamp and st.st_mtime_ns == stamp[1]:
+        return 'unchanged', st
+    return None, st
+
+
+def check_file(path, expected, stamp, fast, hash_it):
+    """(status, bytes hashed) for one file. Status is one of ok,
+    unchanged (fast mode, stamp matches), skipped (not sampled),
+    mismatched or missing."""
+    status, st = precheck(path, stamp, fast, hash_it)
+    if status:
+        return status, 0
+    with span("sha256", item=os.path.basename(path)):
+        digest = generate_checksum(path)
+    return ('ok' if digest == expected else 'mismatched'), st.st_size
+
+
+def _resolved(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def verify_vault(config, fast=False, sample=None, seed=None, report=None, whole_file=False):
+    """Verify the vault against checksums.txt. Returns a summary dict;
+    summary['problems'] is the number of mismatched, missing and extra files."""
+    checksums_path = config.metadata / "checksums.txt"
+    if not checksums_path.exists():
+        print(f"❌ No checksums found at {checksums_path}")
+        print("   Run Stage 1 first: python3 scripts/1_build_vault.py")
+        return {'problems': 1, 'error': 'no checksums'}
+
+    mode = 'fast' if fast else 'full'
+    if sample is not None:
+        seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        mode += f", sample {sample:.0%} (seed {seed})"
+    sampler = random.Random(seed)
+
+    print("=" * 80)
+    print(f"VERIFYING EVIDENCE VAULT ({mode})")
+    print("=" * 80)
+    print()
+
+    files = vault_files(config)
+    stamps = read_file_stamps(config.metadata / "file_stamps.txt")
+    if fast and not stamps:
+        print("⚠️  No metadata/file_stamps.txt (vault built before it existed): hashing every file")
+    workers = config.workers or min(8, os.cpu_count() or 1)
+
+    chunked = set() if whole_file else chunked_files(config.metadata)
+    journal_path = config.state_dir / "verify-chunks.jsonl"
+    journal = Journal(journal_path, "verify-chunks", resume=config.resume)
+    if journal.entries:
+        print(f"Resuming: {len(journal.entries)} chunk(s) verified by an interrupted run")
+
+    counts = {'ok': 0, 'unchanged': 0, 'skipped': 0}
+    problems = {'mismatched': [], 'missing': [], 'extra': []}
+    corrupt = {}  # file name -> [[first byte, last byte]] of chunks that do not match
+    listed = set()
+    hashed_bytes = 0
+    started = time.monotonic()
+
+    def submit_chunks(name, path, checksum, stamp):
+        """Futures for a chunked file's chunks (skipping journaled ones)"""
+        status, st = precheck(path, stamp, fast, True)
+        if status:
+            return [(None, _resolved((status, 0)))], None
+        record = read_chunk_record(config.metadata, name)
+        if record['sha256'] != checksum or record['size'] != st.st_size:
+            return [(None, _resolved(('mismatched', 0)))], None  # chunk record out of step with the file
+        current = file_stamp(path)
+        futures = []
+        for index, (offset, length) in enumerate(chunk_ranges(record)):
+            done = journal.lookup(f"{name}#{index}", current)
+            if not (done and done['sha256'] == record['chunks'][index]):
+                futures.append((index, pool.submit(hash_chunk, path, offset, length)))
+        return futures, (record, current)
+
+    def collect(name, futures, chunk_state):
+        nonlocal hashed_bytes
+        if chunk_state is None:
+            status, nbytes = futures[0][1].result()
+        else:
+            record, current = chunk_state
+            ranges = chunk_ranges(record)
+            bad, nbytes = [], 0
+            for index, future in futures:
+                digest = future.result()
+                nbytes += ranges[index][1]
+                if digest == record['chunks'][index]:
+                    journal.record(f"{name}#{index}", current, sha256=digest)
+                else:
+                    bad.append(index)
+            status = 'mismatched' if bad else 'ok'
+            if bad:
+                corrupt[name] = [[ranges[i][0], ranges[i][0] + ranges[i][1] - 1] for i in bad]
+        hashed_bytes += nbytes
+        if status in counts:
+            counts[status] += 1
+        else:
+            problems[status].append(name)
+            detail = f" ({len(corrupt[name])} of {len(record['chunks'])} chunks corrupt)" if name in corrupt else ""
+            print(f"  ❌ {status.upper()}: {name}{detail}")
+        p.advance(nbytes)
+
+    with span("verify", mode=mode), progress.phase("verify", "files") as p, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        queued = 0
+        for checksum, name in read_checksums(checksums_path):
+            listed.add(name)
+            hash_it = sample is None or sampler.random() < sample
+            if name in chunked and hash_it:
+                futures, chunk_state = submit_chunks(name, files.get(name), checksum, stamps.get(name))
+            else:
+                futures, chunk_state = [(None, pool.submit(check_file, files.get(name), checksum,
+                                                           stamps.get(name), fast, hash_it))], None
+            in_flight.append((name, futures, chunk_state))
+            queued += len(futures)
+            while in_flight and queued >= workers * IN_FLIGHT_PER_WORKER:
+                done = in_flight.popleft()
+                queued -= len(done[1])
+                collect(*done)
+            total = len(listed)
+            if total % 1000 == 0:
+                print(f"  ✅ Checked {total - len(in_flight)} files...")
+        while in_flight:
+            collect(*in_flight.popleft())
+
+    # A finished run starts the next one from scratch
+    journal.close()
+    journal_path.unlink(missing_ok=True)
+
+    problems['extra'] = sorted(set(files) - listed)
+    elapsed = time.monotonic() - started
+    summary = {
+        'mode': mode,
+        'files': len(listed),
+        **counts,
+        'hashed_bytes': hashed_bytes,
+        'seconds': round(elapsed, 2),
+        **{kind: names for kind, names in problems.items()},
+        'corrupt_ranges': corrupt,
+        'problems': sum(len(names) for names in problems.values()),
+    }
+
+    print()
+    print(f"  Files listed:  {len(listed)}")
+    print(f"  Hashed OK:     {counts['ok']}")
+    print(f"  Read:          {hashed_bytes / (1024 * 1024):.1f} MB "
+          f"({hashed_bytes / (1024 * 1024) / max(elapsed, 1e-9):.0f} MB/s)")
+    if fast:
+        print(f"  Unchanged:     {counts['unchanged']}  (size/mtime match, not hashed)")
+    if sample is not None:
+        print(f"  Not sampled:   {counts['skipped']}  (present, not hashed)")
+    for kind, names in problems.items():
+        print(f"  {kind.capitalize() + ':':<14} {len(names)}")
+        for name in names[:SHOW_NAMES]:
+            ranges = corrupt.get(name)
+            print(f"      - {name}" + (f"  corrupt bytes: {', '.join(f'{a}-{b}' for a, b in ranges[:5])}"
+                                      + (" ..." if len(ranges) > 5 else "") if ranges else ""))
+        if len(names) > SHOW_NAMES:
+            print(f"      ... and {len(names) - SHOW_NAMES} more")
+
+    if report:
+        with open(report, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"  Report: {report}")
+
+    print()
+    print("=" * 80)
+    if summary['problems']:
+        print(f"❌ VERIFICATION FAILED: {summary['problems']} problem(s)")
+    else:
+        print("✅ VAULT VERIFIED: no mismatched, missing or extra files")
+    print("=" * 80)
+    return summary
+
+
+def write_proof(config, name, output=None):
+    """Write (or print) the inclusion proof for one vault file. Returns True if found."""
+    proof = merkle.inclusion_proof(config.metadata, name)
+    if proof is None:
+        print(f"❌ {name} is not in the vault's Merkle tree ({config.metadata / merkle.LEAVES_FILE})")
+        return False
+    text = json.dumps(proof, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+        print(f"✅ Proof for {name} ({len(proof['path'])} hashes, tree of {proof['size']}): {output}")
+    else:
+        print(text)
+    return True
+
+
+def check_proof_file(config, proof_path):
+    """Re-hash the vault file a proof names and check the proof. Returns True if it holds."""
+    with open(proof_path, 'r') as f:
+        proof = json.load(f)
+    path = vault_files(config).get(proof['file'])
+    if path is None:
+        print(f"❌ {proof['file']} is not in {config.vault}")
+        return False
+    checksum = generate_checksum(path)
+    if not merkle.check_proof(proof, checksum=checksum):
+        print(f"❌ Proof does NOT hold for {proof['file']} as it is now (SHA-256 {checksum})")
+        return False
+    print(f"✅ {proof['file']} (SHA-256 {checksum[:16]}...) is leaf {proof['index']} "
+          f"of the tree with root {proof['root']}")
+    current = merkle.read_root(config.metadata)
+    if current and current[0] == proof['root']:
+        print("   This is the vault's current root (VAULT_MANIFEST.txt)")
+    elif current:
+        print(f"   The vault has changed since: current root {current[0]} ({current[1]} files)")
+    return True
+
+
+def compare_vaults(config, other_metadata):
+    """Files whose recorded hash differs between this vault's tree and
+    another copy's, found by walking only differing subtrees. Returns
+    the list of file names."""
+    mine, my_entries = merkle.load_tree(config.metadata)
+    theirs, their_entries = merkle.load_tree(other_metadata)
+    print(f"This vault:  {mine.root().hex()} ({mine.size} files)")
+    print(f"Other vault: {theirs.root().hex()} ({theirs.size} files)")
+    names = []
+    for index in merkle.differing_leaves(mine, theirs):
+        name = (my_entries if index < mine.size else their_entries)[index][1]
+        where = "differs" if index < min(mine.size, theirs.size) else \
+            ("only here" if index < mine.size else "only in other")
+        print(f"  ❌ {name} ({where})")
+        names.append(name)
+    if not names:
+        print("✅ Identical trees")
+    return names
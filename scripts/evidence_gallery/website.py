@@ -0,0 +1,711 @@
+"""
+Stage 3: Generate Website
+
+Builds the unified lazy-loading evidence portal: thumbnails are embedded
+in the HTML, full images are written to a separate JSON file and each
+document to documents/<id>.json (page list, low-resolution previews and
+search words) with its full-size pages as image files in documents/<id>/,
+all fetched by the viewer on demand.
+"""
+
+import hashlib
+import html
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from PIL import Image
+
+from .imaging import (SUPPORTED_FORMATS, encode_jpeg, fit_size, image_data_uri, image_extension,
+                      image_from_data_uri, jpeg_data_uri, load_scaled, save_bytes, scaled_size, to_rgb)
+from .page_render import page_size, render_page, render_tiers
+from .pdf_metadata import LazyPDF, load_table, lookup, pdf_metadata
+from .portal_template import HTML_TEMPLATE
+from . import memory, progress, tracing
+from .checkpoint import Journal, file_stamp, item_key, outputs_intact
+from .compact import COMPRESSED_SUFFIXES, precompress_outputs, write_item_index
+from .metadata_index import MetadataIndex, parse_timestamp
+from .ocr import load_ocr, ocr_output_path
+from .scanner import list_documents, list_files
+from .search_index import document_terms, document_words, words_digest, write_search_index
+from .service_worker import write_service_worker
+from .sources import default_sources
+from .time_index import write_time_index
+from .tracing import span
+
+HASH_BATCH = 4096  # thumbnails per vectorized perceptual-hash batch
+
+
+def web_image_jpeg(image_path, quality=75, resize_percent=0.5):
+    """Web-size JPEG bytes of an image and its size ((None, None) if unreadable)"""
+    try:
+        img = Image.open(image_path)
+        if img.format not in SUPPORTED_FORMATS:
+            return None, None
+
+        img = to_rgb(load_scaled(img, scaled_size(img.size, resize_percent)))
+        return encode_jpeg(img, quality), img.size
+    except Exception as e:
+        print(f"  Error processing {os.path.basename(image_path)}: {e}")
+        return None, None
+
+
+def image_to_base64(image_path, quality=75, resize_percent=0.5):
+    """Convert image to base64 JPEG"""
+    jpeg, size = web_image_jpeg(image_path, quality, resize_percent)
+    return (jpeg_data_uri(jpeg), size) if jpeg else (None, None)
+
+
+def thumbnail_jpeg(image_path, quality=40, size=(150, 150)):
+    """Gallery thumbnail JPEG bytes (None if unreadable)"""
+    try:
+        img = Image.open(image_path)
+        if img.format not in SUPPORTED_FORMATS:
+            return None
+
+        # Create small thumbnail
+        img = load_scaled(img, fit_size(img.size, size), thumbnail=True)
+        return encode_jpeg(to_rgb(img), quality)
+    except Exception as e:
+        return None
+
+
+def create_thumbnail(image_path, quality=40, size=(150, 150)):
+    """Create small thumbnail for gallery display"""
+    jpeg = thumbnail_jpeg(image_path, quality, size)
+    return jpeg_data_uri(jpeg) if jpeg else None
+
+
+def parse_pdf_date(date_str):
+    if not date_str:
+        return "Unknown"
+    try:
+        if isinstance(date_str, str) and date_str.startswith('D:'):
+            date_str = date_str[2:10]
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}" if len(date_str) >= 8 else "Unknown"
+    except:
+        return "Unknown"
+
+
+def pdf_page_jpeg(pdf_document, page_num, quality=60, dpi=150, adaptive=False):
+    """Image bytes of a page of an open PDF and its size ((None, None) on
+    failure). Adaptive rendering (see page_render.py) may return PNG."""
+    try:
+        if page_num >= pdf_document.page_count:
+            return None, None
+
+        data, size, _ = render_page(pdf_document[page_num], dpi, quality, adaptive)
+        return data, size
+    except Exception as e:
+        return None, None
+
+
+def pdf_page_to_base64_optimized(pdf_document, page_num, quality=60, dpi=150, adaptive=False):
+    """Convert page of an open PDF to a base64 data URI"""
+    data, size = pdf_page_jpeg(pdf_document, page_num, quality, dpi, adaptive)
+    return (image_data_uri(data), size) if data else (None, None)
+
+
+def create_pdf_thumbnail(pdf_document, quality=50, dpi=100):
+    """Create thumbnail from first page of an open PDF"""
+    jpeg, _ = pdf_page_jpeg(pdf_document, 0, quality, dpi)
+    return jpeg_data_uri(jpeg) if jpeg else None
+
+
+def document_id(agency_name, filename):
+    """Name of a document's page list and page folder in the portal"""
+    return hashlib.sha256(f"{agency_name}/{filename}".encode('utf-8')).hexdigest()[:16]
+
+
+def render_document_page(pdf_document, page_num, config, folder):
+    """Write a page's full rendition to folder (relative to the portal)
+    and make its preview tier. Returns the page's journal fields, or None
+    if it cannot be rendered."""
+    try:
+        page = pdf_document[page_num]
+        data, _, _, preview = render_tiers(page, config.document_dpi, config.document_jpeg_quality,
+                                           config.page_preview_dpi, config.page_preview_quality,
+                                           config.adaptive_pages)
+    except Exception:
+        return None
+    src = f"{folder}/{page_num + 1}{image_extension(data)}"
+    os.makedirs(config.website_output / folder, exist_ok=True)
+    width, height = page_size(page, config.document_dpi)
+    return {'src': src, 'width': width, 'height': height, 'preview': image_data_uri(preview),
+            'outputs': {src: save_bytes(data, config.website_output / src)}}
+
+
+def image_record(filename, agency_name, meta, data_uri):
+    """images-data.json entry: EXIF fields for the viewer plus the image"""
+    return {
+        'FileName': filename,
+        'Agency': agency_name,
+        'DateTimeOriginal': meta.get('DateTimeOriginal', 'Unknown'),
+        'Make': meta.get('Make', 'Unknown'),
+        'Model': meta.get('Model', 'Unknown'),
+        'ISO': meta.get('ISO', 'Unknown'),
+        'FNumber': meta.get('FNumber', 'Unknown'),
+        'FocalLength': meta.get('FocalLength', 'Unknown'),
+        'ShutterSpeed': meta.get('ShutterSpeed', 'Unknown'),
+        'ImageWidth': meta.get('ImageWidth', 'Unknown'),
+        'ImageHeight': meta.get('ImageHeight', 'Unknown'),
+        'dataUri': data_uri
+    }
+
+
+def document_records(filename, agency_name, page_count, max_pages, metadata, file_size, preview, pages_url):
+    """Gallery thumbnail and page-list metadata for one PDF"""
+    thumbnail = {
+        'FileName': filename,
+        'Agency': agency_name,
+        'pageCount': page_count,
+        'maxPages': max_pages,
+        'CreationDateEmbedded': parse_pdf_date(metadata.get('creationDate') if metadata else None) if metadata else "Unknown",
+        'createdAt': parse_timestamp((metadata or {}).get('creationDate')),
+        'preview': preview,
+        'pagesUrl': pages_url
+    }
+    document = {
+        'FileName': filename,
+        'Agency': agency_name,
+        'pageCount': page_count,
+        'embeddedPages': max_pages,
+        'CreationDateEmbedded': parse_pdf_date(metadata.get('creationDate') if metadata else None) if metadata else "Unknown",
+        'ModificationDate': parse_pdf_date(metadata.get('modDate') if metadata else None) if metadata else "Unknown",
+        'DocumentAuthor': (metadata.get('author') if metadata else None) or "Unknown",
+        'DocumentCreator': (metadata.get('creator') if metadata else None) or "Unknown",
+        'DocumentProducer': (metadata.get('producer') if metadata else None) or "Unknown",
+        'fileSize': file_size
+    }
+    return thumbnail, document
+
+
+def stored_words(path, max_pages):
+    """document_words() of a document as an earlier run wrote them into
+    its page list (pages that failed to render have none), or None if
+    there is no readable page list"""
+    try:
+        with open(path, 'r') as f:
+            pages = json.load(f)['pages']
+    except (OSError, ValueError, KeyError):
+        return None
+    words = [[] for _ in range(max_pages + 1)]
+    for page in pages:
+        if 0 < page['pageNumber'] <= max_pages:
+            words[page['pageNumber']] = page['words']
+    return words
+
+
+def rendition_dir(journal):
+    """Folder of the full-size image renditions a Stage 3 journal refers to"""
+    return journal.path.with_name(journal.path.stem + "-images")
+
+
+def prune_renditions(journal):
+    """Delete rendition files no journal entry refers to any more"""
+    folder = rendition_dir(journal)
+    if not folder.is_dir():
+        return
+    keep = {entry['rendition'] for entry in journal.entries.values() if 'rendition' in entry}
+    for path in folder.iterdir():
+        if path.name not in keep:
+            path.unlink()
+
+
+def process_images_lazy(image_dir, metadata_map, agency_name, config, journal=None):
+    """Process images - create thumbnails for gallery, full data separate"""
+    # File names are paths relative to image_dir (sub-folders included)
+    image_files = [rel for _, rel in list_files(image_dir, config.io_depth, ('.jpg', '.jpeg', '.png'))]
+
+    thumbnails = []
+    full_images = []
+    unhashed = []
+    renditions = rendition_dir(journal) if journal else None
+    if renditions:
+        os.makedirs(renditions, exist_ok=True)
+
+    with progress.phase("stage3", f"{agency_name}/images", len(image_files)) as p:
+        for filename in image_files:
+            image_path = os.path.join(image_dir, filename)
+            meta = metadata_map.get(filename, {})
+
+            # Renditions from an earlier (interrupted) run of this source
+            key = f"images/{item_key(image_path, config.root)}"
+            stamp = file_stamp(image_path)
+            entry = journal.lookup(key, stamp) if journal else None
+            if entry and not ('rendition' in entry and outputs_intact(renditions, {entry['rendition']: entry['size']})):
+                entry = None
+
+            # Create thumbnail for gallery
+            if entry:
+                thumb = entry['thumbnail']
+            else:
+                with span("thumbnail", item=filename):
+                    thumb = create_thumbnail(image_path, quality=config.thumbnail_quality, size=config.thumbnail_size)
+            if thumb:
+                record = {
+                    'FileName': filename,
+                    'Agency': agency_name,
+                    'DateTimeOriginal': meta.get('DateTimeOriginal', 'Unknown'),
+                    'thumbnail': thumb
+                }
+                hashes = journal.lookup(f"{key}#phash", stamp) if journal else None
+                if hashes:
+                    record.update(pHash=hashes['pHash'], dHash=hashes['dHash'])
+                else:
+                    unhashed.append((record, f"{key}#phash", stamp))
+                thumbnails.append(record)
+
+            # Full resolution image (stored separately)
+            if entry:
+                with open(os.path.join(renditions, entry['rendition']), 'rb') as f:
+                    data_uri = jpeg_data_uri(f.read())
+            else:
+                with span("full_image", item=filename):
+                    jpeg, _ = web_image_jpeg(image_path, quality=config.image_jpeg_quality,
+                                             resize_percent=config.image_resize_percent)
+                data_uri = jpeg_data_uri(jpeg) if jpeg else None
+                if journal and thumb and jpeg:
+                    # The journal keeps the thumbnail and a reference to the rendition file
+                    name = f"{hashlib.sha256(jpeg).hexdigest()}.jpg"
+                    size = save_bytes(jpeg, os.path.join(renditions, name))
+                    journal.record(key, stamp, thumbnail=thumb, rendition=name, size=size)
+            if data_uri:
+                full_images.append(image_record(filename, agency_name, meta, data_uri))
+                p.advance(stamp[0], cached=entry is not None)
+            else:
+                p.error(filename, "could not decode image")
+
+    hash_thumbnails(unhashed, journal)
+    return thumbnails, full_images
+
+
+def hash_thumbnails(pending, journal=None):
+    """Attach pHash/dHash to thumbnail records, given as (record, journal
+    key, stamp) tuples; skipped when NumPy is not installed"""
+    try:
+        from .dedupe import hash_inputs, perceptual_hashes
+    except ImportError:
+        return
+
+    for start in range(0, len(pending), HASH_BATCH):
+        batch = pending[start:start + HASH_BATCH]
+        with span("phash", items=len(batch)):
+            phash, dhash = perceptual_hashes(
+                [hash_inputs(image_from_data_uri(record['thumbnail'])) for record, _, _ in batch])
+        for (record, key, stamp), ph, dh in zip(batch, phash, dhash):
+            hashes = {'pHash': f"{int(ph):016x}", 'dHash': f"{int(dh):016x}"}
+            record.update(hashes)
+            if journal:
+                journal.record(key, stamp, **hashes)
+
+
+def process_documents_lazy(doc_dir, agency_name, config, journal=None, index=None, source=None):
+    """Process documents - create thumbnails for gallery, pages loaded on demand.
+
+    Returns (thumbnails, metadata, page lists by path, search terms by
+    (agency, file name)); full-size pages are written straight into the
+    portal's documents/<id>/ folder. Page counts and metadata come from
+    Stage 1's documents_metadata.csv where it is current, so a PDF is only
+    opened when something has to be rendered or extracted.
+    """
+    import fitz  # noqa: F401
+
+    doc_files = [rel for _, rel in list_documents(doc_dir, config.io_depth)]
+    table = load_table(config)
+    thumbnails = []
+    document_metadata = []
+    all_pages = {}
+    all_text = {}
+
+    with progress.phase("stage3", f"{agency_name}/documents", len(doc_files)) as p:
+        for filename in doc_files:
+            doc_path = os.path.join(doc_dir, filename)
+            pdf = LazyPDF(doc_path)
+            try:
+                stamp = file_stamp(doc_path)
+                doc_key = f"documents/{item_key(doc_path, config.root)}"
+                file_size = stamp[0]
+                info = lookup(table, doc_path, stamp)
+                page_count = int(info['PageCount']) if info else pdf.doc.page_count
+                metadata = pdf_metadata(info) if info else pdf.doc.metadata
+                reused = 0
+                if index:
+                    index.add_document(agency_name, filename, file_size, page_count, metadata)
+
+                # Limit pages based on file size
+                max_pages = config.max_pages(file_size, page_count)
+                doc_id = document_id(agency_name, filename)
+                pages_url = f"documents/{doc_id}.json"
+
+                # Text layer (or OCR output) of the rendered pages, for search and
+                # hit highlighting. The word boxes are kept in the page list; the
+                # journal only holds their digest.
+                ocr_path = ocr_output_path(config, source, filename) if source else None
+                text_stamp = stamp + (file_stamp(ocr_path) if ocr_path and ocr_path.exists() else [])
+                key = f"{doc_key}#text"
+                entry = journal.lookup(key, text_stamp) if journal else None
+                words = stored_words(config.website_output / pages_url, max_pages) if entry else None
+                if not (words and entry.get('words') == words_digest(words)):
+                    with span("pdf.text", item=filename):
+                        words = document_words(pdf.doc, max_pages, load_ocr(ocr_path) if ocr_path else None)
+                    if journal:
+                        journal.record(key, text_stamp, words=words_digest(words))
+                all_text[(agency_name, filename)] = document_terms([filename, agency_name] + [
+                    (metadata or {}).get(k) for k in ('title', 'author', 'subject', 'keywords')], words)
+
+                # Create thumbnail from first page
+                key = f"{doc_key}#preview"
+                entry = journal.lookup(key, stamp) if journal else None
+                if entry:
+                    preview_uri = entry['preview']
+                    reused += 1
+                else:
+                    with span("pdf.thumbnail", item=filename):
+                        preview_uri = create_pdf_thumbnail(pdf.doc, quality=config.pdf_thumbnail_quality,
+                                                           dpi=config.pdf_thumbnail_dpi)
+                    if journal and preview_uri:
+                        journal.record(key, stamp, preview=preview_uri)
+
+                # Store thumbnail for gallery and document metadata
+                thumbnail, document = document_records(filename, agency_name, page_count, max_pages,
+                                                       metadata, file_size, preview_uri, pages_url)
+                thumbnails.append(thumbnail)
+                document_metadata.append(document)
+
+                # Store pages (will be loaded on demand)
+                pages = []
+                for page_num in range(max_pages):
+                    key = f"{doc_key}#{page_num + 1}"
+                    entry = journal.lookup(key, stamp) if journal else None
+                    if entry and 'src' in entry and outputs_intact(config.website_output, entry['outputs']):
+                        reused += 1
+                    else:
+                        with span("pdf.page", item=filename, page=page_num + 1):
+                            entry = render_document_page(pdf.doc, page_num, config, f"documents/{doc_id}")
+                        if journal and entry:
+                            journal.record(key, stamp, **entry)
+                    if entry:
+                        pages.append({'pageNumber': page_num + 1, 'width': entry['width'],
+                                      'height': entry['height'], 'preview': entry['preview'],
+                                      'src': entry['src'], 'words': words[page_num + 1]})
+
+                all_pages[pages_url] = {'metadata': document, 'pages': pages}
+                p.advance(file_size, cached=reused == max_pages + 1)
+            except Exception as e:
+                print(f"  Error processing {filename}: {str(e)[:80]}")
+                p.error(filename, e)
+            finally:
+                pdf.close()
+
+    return thumbnails, document_metadata, all_pages, all_text
+
+
+def sort_thumbs(item):
+    """By agency, then capture time (unknown dates last)"""
+    taken = parse_timestamp(item.get('DateTimeOriginal'))
+    return (item['Agency'], taken is None, taken or '', item['FileName'])
+
+
+def sort_doc_thumbs(item):
+    created = parse_timestamp(item.get('CreationDateEmbedded'))
+    return (item['Agency'], created is None, created or '', item['FileName'])
+
+
+def extract_source_exif(source, work_dir):
+    """Run exiftool over a source's images. Returns the CSV path or None."""
+    # Absolute paths: read_exif_csv() keys rows by their path inside each image folder
+    image_files = [os.path.abspath(path) for d in source.image_dirs
+                   for path, _ in list_files(d, suffixes=('.jpg', '.jpeg'))]
+    if not image_files:
+        return None
+
+    csv_path = os.path.join(work_dir, f"{source.slug}_exif.csv")
+    try:
+        with open(csv_path, 'w') as out, span("exiftool", files=len(image_files)):
+            subprocess.run(['exiftool', '-csv'] + image_files, stdout=out, check=True)
+        print(f"  ✅ {source.name}: metadata extracted")
+    except Exception as e:
+        print(f"  ⚠️ {source.name}: {e}")
+    return csv_path
+
+
+def process_source(source, config, work_dir):
+    """Build gallery data for one source (runs in a worker process)"""
+    tracing.ensure(config.trace_dir)
+    progress.ensure(config.progress)
+    try:
+        with span("source", item=source.name):
+            return _process_source(source, config, work_dir)
+    finally:
+        tracing.flush()
+
+
+def _process_source(source, config, work_dir):
+    exif_csv = source.exif_csv or extract_source_exif(source, work_dir)
+    result = {'images': [], 'full_images': [], 'documents': [], 'document_meta': [], 'pages': {}, 'text': {}}
+
+    # One journal per source: each source is processed by a single worker
+    journal_path = config.state_dir / f"stage3-{source.slug}.jsonl"
+    with MetadataIndex(config.metadata_index) as index, \
+            Journal(journal_path, config.render_fingerprint(), resume=config.resume) as journal:
+        try:
+            if exif_csv and os.path.exists(exif_csv):
+                index.import_exif_csv(exif_csv, source.name, source.image_dirs)
+        except Exception as e:
+            print(f"Warning: Could not read metadata file {exif_csv}: {e}")
+        metadata_map = index.image_metadata(source.name)
+
+        if journal.entries:
+            print(f"  {source.name}: resuming with {len(journal.entries)} renditions from an earlier run")
+
+        for image_dir in source.image_dirs:
+            if not os.path.isdir(image_dir):
+                print(f"  ⚠️ {source.name}: image folder not found: {image_dir}")
+                continue
+            thumbs, full = process_images_lazy(image_dir, metadata_map, source.name, config, journal)
+            result['images'] += thumbs
+            result['full_images'] += full
+
+        for doc_dir in source.document_dirs:
+            if not os.path.isdir(doc_dir):
+                print(f"  ⚠️ {source.name}: document folder not found: {doc_dir}")
+                continue
+            doc_thumbs, doc_meta, doc_pages, doc_text = process_documents_lazy(doc_dir, source.name, config,
+                                                                               journal, index, source)
+            result['documents'] += doc_thumbs
+            result['document_meta'] += doc_meta
+            result['pages'].update(doc_pages)
+            result['text'].update(doc_text)
+
+        prune_renditions(journal)
+
+    return result
+
+
+def process_sources(sources, config, work_dir):
+    """Process every source, in parallel when there is more than one"""
+    workers = min(len(sources), config.workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [process_source(source, config, work_dir) for source in sources]
+
+    # Workers share one RAM budget for image decodes
+    with ProcessPoolExecutor(max_workers=workers, initializer=memory.install,
+                             initargs=(memory.current(),)) as pool:
+        return list(pool.map(process_source, sources, repeat(config), repeat(work_dir)))
+
+
+def agency_filter_buttons(kind, agencies):
+    """Filter button markup for each agency in the portal"""
+    buttons = []
+    for agency in agencies:
+        arg = html.escape(json.dumps(agency), quote=True)
+        buttons.append(f'                <button class="filter-btn" onclick="filterByAgency(\'{kind}\', {arg})">'
+                       f'{html.escape(agency)}</button>')
+    return '\n'.join(buttons)
+
+
+def write_text_atomic(path, text):
+    """Write via a temp file + rename so readers never see a partial file"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def write_document_pages(output_dir, documents):
+    """Write documents/<id>.json for each {path: page list} and delete page
+    lists and page images no document refers to any more (their .gz/.br
+    siblings stay for precompress_outputs to reuse). Returns the bytes
+    written."""
+    keep = set(documents)
+    for document in documents.values():
+        keep.update(page['src'] for page in document['pages'])
+    keep.update([path + suffix for path in keep for suffix in COMPRESSED_SUFFIXES])
+    folder = output_dir / "documents"
+    folder.mkdir(exist_ok=True)
+    for path, document in documents.items():
+        write_json_atomic(output_dir / path, document)
+
+    # Documents and pages from earlier runs that are gone
+    total = 0
+    for parent, _, names in os.walk(folder, topdown=False):
+        for name in names:
+            path = os.path.join(parent, name)
+            if os.path.relpath(path, output_dir).replace(os.sep, '/') in keep:
+                if not name.endswith(COMPRESSED_SUFFIXES):
+                    total += os.path.getsize(path)
+            else:
+                os.remove(path)
+        if parent != str(folder) and not os.listdir(parent):
+            os.rmdir(parent)
+    return total
+
+
+def render_portal_html(thumbnails_data, agencies, total_pages, prefetch_items=3, cached_pages=32):
+    """Fill the portal template with gallery data and header stats"""
+    html_content = HTML_TEMPLATE.replace('LAZY_PAGE_COUNT', str(total_pages))
+    html_content = html_content.replace('PREFETCH_COUNT', str(int(prefetch_items)))
+    html_content = html_content.replace('PAGE_CACHE_COUNT', str(int(cached_pages)))
+    html_content = html_content.replace('IMAGE_COUNT', str(len(thumbnails_data['images'])))
+    html_content = html_content.replace('DOCUMENT_COUNT', str(len(thumbnails_data['documents'])))
+    html_content = html_content.replace('AGENCY_COUNT', str(len(agencies)))
+    html_content = html_content.replace('IMAGE_AGENCY_FILTERS', agency_filter_buttons('images', agencies))
+    html_content = html_content.replace('DOCUMENT_AGENCY_FILTERS', agency_filter_buttons('documents', agencies))
+    # Data last, so placeholder names inside file names are never replaced
+    return html_content.replace('THUMBNAILS_DATA_PLACEHOLDER', json.dumps(thumbnails_data, ensure_ascii=False))
+
+
+def generate_website(config):
+    """Run Stage 3 and return a summary of the generated portal"""
+    with span("stage3"):
+        return _generate_website(config)
+
+
+def _generate_website(config):
+    sources = config.sources or default_sources(config)
+    memory.ensure(config.memory_budget_mb)
+    output_dir = config.website_output
+    output_file = output_dir / "index.html"
+    images_data_file = output_dir / "images-data.json"
+    thumbnails_data_file = output_dir / "thumbnails-data.json"
+
+    print("=" * 80)
+    print("UNIFIED FORENSIC EVIDENCE PORTAL - LAZY LOADING OPTIMIZED")
+    print("=" * 80)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Extract metadata and process every source
+    print(f"\nProcessing {len(sources)} source(s)...")
+    with tempfile.TemporaryDirectory(prefix="evidence-exif-") as work_dir:
+        results = process_sources(sources, config, work_dir)
+
+    for source, result in zip(sources, results):
+        print(f"  {source.name}: {len(result['images'])} images, {len(result['documents'])} documents")
+
+    # Combine
+    all_image_thumbs = [t for r in results for t in r['images']]
+    all_image_full = [i for r in results for i in r['full_images']]
+    all_doc_thumbs = [t for r in results for t in r['documents']]
+    all_doc_meta = [m for r in results for m in r['document_meta']]
+    all_doc_pages = {}
+    all_doc_text = {}
+    for r in results:
+        all_doc_pages.update(r['pages'])
+        all_doc_text.update(r['text'])
+
+    all_image_thumbs.sort(key=sort_thumbs)
+    all_image_full.sort(key=sort_thumbs)
+    all_doc_thumbs.sort(key=sort_doc_thumbs)
+    all_doc_meta.sort(key=sort_doc_thumbs)
+
+    # Near-duplicate photo groups (perceptual hashes need NumPy)
+    try:
+        from .dedupe import assign_duplicate_groups
+    except ImportError:
+        print("\n⚠️  NumPy not installed: near-duplicate grouping skipped (pip3 install numpy)")
+    else:
+        with span("near_duplicates", items=len(all_image_thumbs)):
+            duplicate_groups = assign_duplicate_groups(all_image_thumbs)
+        print(f"\nNear-duplicate photos: {duplicate_groups} group(s)")
+
+    # Save separate data files
+    print("\nSaving data files...")
+
+    # Thumbnails (embedded in HTML for fast loading)
+    thumbnails_data = {
+        'images': all_image_thumbs,
+        'documents': all_doc_thumbs
+    }
+
+    # Full image data (loaded on demand)
+    with span("json.dump", item=images_data_file.name):
+        write_json_atomic(images_data_file, all_image_full)
+    print(f"  ✅ Images data: {os.path.getsize(images_data_file) / (1024*1024):.1f} MB")
+
+    # Document page lists (metadata, previews, words) and full-size pages, one document at a time
+    with span("json.dump", item="documents"):
+        documents_size = write_document_pages(output_dir, all_doc_pages)
+    for name in ("documents-data.json", "documents-data.json.gz", "documents-data.json.br"):
+        (output_dir / name).unlink(missing_ok=True)  # all pages in one file, from earlier versions
+    print(f"  ✅ Documents data: {documents_size / (1024*1024):.1f} MB "
+          f"({len(all_doc_pages)} page lists, pages as image files)")
+
+    # Thumbnails data
+    with span("json.dump", item=thumbnails_data_file.name):
+        write_json_atomic(thumbnails_data_file, thumbnails_data)
+    print(f"  ✅ Thumbnails: {os.path.getsize(thumbnails_data_file) / (1024*1024):.1f} MB")
+
+    # Full-text search index (loaded by the viewer on first search)
+    with span("search.index"):
+        search = write_search_index(all_doc_thumbs, all_doc_text, output_dir / "search")
+    print(f"  ✅ Search index: {search['terms']} terms in {search['shards']} shards, "
+          f"{search['bytes'] / (1024*1024):.1f} MB")
+
+    # Columnar, dictionary-encoded metadata of every item (for tooling and servers)
+    with span("item.index"):
+        item_index_size = write_item_index(all_image_full, all_doc_meta, output_dir / "items-index.json")
+    print(f"  ✅ Item index: {item_index_size / 1024:.0f} KB (columnar)")
+
+    # Timeline buckets (loaded by the viewer month by month)
+    with span("timeline.index"):
+        timeline = write_time_index(all_image_thumbs, all_doc_thumbs, output_dir / "timeline")
+    print(f"  ✅ Timeline: {timeline['dated']} dated items over {timeline['days']} days "
+          f"({timeline['undated']} undated)")
+
+    print("\nGenerating HTML portal with lazy loading...")
+
+    agencies = [source.name for source in sources]
+    total_pages = sum(len(document['pages']) for document in all_doc_pages.values())
+    with span("html.write", item=output_file.name):
+        html_content = render_portal_html(thumbnails_data, agencies, total_pages, config.prefetch_items,
+                                          config.cached_pages)
+        write_text_atomic(output_file, html_content)
+
+    # Service Worker with the content-hashed manifest of everything written above
+    with span("service_worker"):
+        worker = write_service_worker(output_dir)
+    print(f"  ✅ Offline cache: sw.js (version {worker['version']}, {worker['files']} files)")
+
+    # .gz/.br siblings for servers that send precompressed files
+    with span("precompress"):
+        packed = precompress_outputs(output_dir)
+    ratio = f"gzip {packed['gzip_bytes'] / max(packed['bytes'], 1):.0%}"
+    if packed['brotli']:
+        ratio += f", brotli {packed['brotli_bytes'] / max(packed['bytes'], 1):.0%}"
+    print(f"  ✅ Precompressed {packed['files']} text files ({ratio} of original size"
+          + (f"; {packed['reused']} unchanged, kept)" if packed['reused'] else ")"))
+
+    main_file_size = os.path.getsize(output_file) / (1024*1024)
+    total_size = main_file_size + (os.path.getsize(images_data_file) + documents_size + os.path.getsize(thumbnails_data_file)) / (1024*1024)
+
+    print(f"\n✅ Lazy-loading portal created!")
+    print(f"\nFile Breakdown:")
+    print(f"  Main HTML: {main_file_size:.1f} MB (with embedded thumbnails)")
+    print(f"  Images Data: {os.path.getsize(images_data_file) / (1024*1024):.1f} MB (loaded on demand)")
+    print(f"  Documents Data: {documents_size / (1024*1024):.1f} MB (loaded on demand, page by page)")
+    print(f"  Thumbnails Index: {os.path.getsize(thumbnails_data_file) / (1024*1024):.1f} MB")
+    print(f"\nTotal with all data: {total_size:.1f} MB")
+    print(f"Initial load: {main_file_size:.1f} MB (fast - only thumbnails!)")
+    if total_size > 0:
+        print(f"Optimization: ~{((1-main_file_size/total_size)*100):.0f}% of data loaded on-demand")
+    print(f"\n🎯 Access: {output_file}")
+    print("=" * 80)
+
+    return {
+        'images': len(all_image_thumbs),
+        'documents': len(all_doc_thumbs),
+        'document_pages': total_pages,
+        'output_file': str(output_file),
+    }
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Serve the Generated Portal
+
+Purpose:
+  - Serve 03-WEBSITE-OUTPUT/ to one or many reviewers (threaded, keep-alive)
+  - Range requests, content-hash ETags and caching headers
+  - Precompressed .br/.gz files when the browser accepts them
+
+Usage: python3 scripts/serve.py [--host 0.0.0.0] [--port 8000]
+"""
+
+import sys
+
+from evidence_gallery.cli import serve_main
+
+if __name__ == "__main__":
+    sys.exit(serve_main())
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Verify the Evidence Vault
+
+Purpose:
+  - Re-hash 01-EVIDENCE-VAULT/ against metadata/checksums.txt (parallel, streaming)
+  - Report mismatched, missing and extra files
+  - --fast: trust files whose size/mtime match the Stage 1 record
+  - --sample 0.05: spot-check a random 5% of the files
+
+Usage: python3 scripts/verify.py [--fast] [--sample FRACTION [--seed N]] [--report FILE]
+"""
+
+import sys
+
+from evidence_gallery.cli import verify_main
+
+if __name__ == "__main__":
+    sys.exit(verify_main())
@@ -0,0 +1,18 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+from evidence_gallery import PipelineConfig  # noqa: E402
+
+
+@pytest.fixture
+def case(tmp_path):
+    """A fresh copy of the template folder layout, as a PipelineConfig"""
+    (tmp_path / "00-SOURCE-EVIDENCE").mkdir()
+    shutil.copy(REPO / "00-SOURCE-EVIDENCE" / "START_HERE.md", tmp_path / "00-SOURCE-EVIDENCE")
+    return PipelineConfig(root=tmp_path)
@@ -0,0 +1,27 @@
+from evidence_gallery.benchmark import OUTPUT_FOLDERS, clear_outputs
+
+
+def test_clear_outputs_removes_checkpoints(case):
+    for folder in OUTPUT_FOLDERS:
+        (case.root / folder).mkdir()
+    case.state_dir.mkdir()
+    (case.state_dir / "stage3-vault.jsonl").write_text("{}\n")
+
+    clear_outputs(case.root)
+
+    assert not case.state_dir.exists()
+    assert not any((case.root / folder).exists() for folder in OUTPUT_FOLDERS)
+    assert case.source.exists()
+
+
+def test_synthetic_videos_are_filed_as_videos(tmp_path, monkeypatch):
+    import random
+
+    from evidence_gallery import benchmark
+    from evidence_gallery.scanner import sniff
+
+    monkeypatch.setattr(benchmark.shutil, "which", lambda name: None)  # no ffmpeg
+    path = tmp_path / "clip.mp4"
+    benchmark._write_video(path, 1, random.Random(1))
+    assert sniff(path) == "videos"
+    assert path.stat().st_size > 1024 * 1024
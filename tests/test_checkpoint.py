@@ -0,0 +1,62 @@
+import json
+import os
+
+from evidence_gallery.checkpoint import Journal, item_key
+
+
+def test_resume_returns_recorded_entries(tmp_path):
+    path = tmp_path / "stage.jsonl"
+    with Journal(path, "f1") as journal:
+        journal.record("a", [1, 2], outputs={"a.jpg": 10})
+    with Journal(path, "f1") as journal:
+        assert journal.lookup("a", [1, 2])['outputs'] == {"a.jpg": 10}
+        assert journal.lookup("a", [1, 3]) is None  # source changed
+
+
+def test_settings_change_or_no_resume_starts_over(tmp_path):
+    path = tmp_path / "stage.jsonl"
+    with Journal(path, "f1") as journal:
+        journal.record("a", [1, 2])
+    with Journal(path, "f2") as journal:
+        assert journal.entries == {}
+    with Journal(path, "f2") as journal:
+        journal.record("a", [1, 2])
+    with Journal(path, "f2", resume=False) as journal:
+        assert journal.entries == {}
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = tmp_path / "stage.jsonl"
+    with Journal(path, "f1") as journal:
+        journal.record("a", [1, 2])
+        journal.record("b", [1, 2])
+    with open(path, 'rb+') as f:
+        f.truncate(os.path.getsize(path) - 5)
+    with Journal(path, "f1") as journal:
+        assert set(journal.entries) == {"a"}
+        journal.record("c", [1, 2])
+    with Journal(path, "f1") as journal:
+        assert set(journal.entries) == {"a", "c"}
+
+
+def test_clean_journal_is_not_rewritten(tmp_path):
+    path = tmp_path / "stage.jsonl"
+    with Journal(path, "f1") as journal:
+        journal.record("a", [1, 2])
+    inode = os.stat(path).st_ino
+    with Journal(path, "f1"):
+        pass
+    assert os.stat(path).st_ino == inode
+
+    with Journal(path, "f1") as journal:
+        journal.record("a", [1, 3])
+    with Journal(path, "f1") as journal:
+        assert journal.lookup("a", [1, 3])
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2 and json.loads(lines[1])['stamp'] == [1, 3]
+
+
+def test_item_key_is_root_relative(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    photo = "01-EVIDENCE-VAULT/photos/a.jpg"
+    assert item_key(photo, ".") == item_key(tmp_path / photo, tmp_path) == photo
@@ -0,0 +1,40 @@
+import hashlib
+import os
+
+from evidence_gallery.chunked import (StreamHasher, chunk_ranges, chunked_files, hash_chunk, hash_with_chunks,
+                                      read_chunk_record, write_chunk_record)
+
+
+def test_stream_hasher_matches_plain_hashes():
+    data = os.urandom(10_000)
+    for chunk_size in (1, 1000, 4096, 10_000, 20_000):
+        hasher = StreamHasher(chunk_size)
+        for start in range(0, len(data), 777):  # feed sizes unrelated to the chunk size
+            hasher.update(data[start:start + 777])
+        whole, chunks = hasher.result()
+        assert whole == hashlib.sha256(data).hexdigest()
+        assert chunks == [hashlib.sha256(data[i:i + chunk_size]).hexdigest()
+                          for i in range(0, len(data), chunk_size)]
+
+
+def test_empty_file_has_one_chunk(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    whole, chunks = hash_with_chunks(path, chunk_size=64)
+    assert chunks == [hashlib.sha256(b"").hexdigest()] and whole == chunks[0]
+    assert chunk_ranges({'size': 0, 'chunk_size': 64}) == [(0, 0)]
+
+
+def test_chunks_hash_independently(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(1000))
+    _, chunks = hash_with_chunks(path, chunk_size=300, read_size=128)
+    record = {'size': 1000, 'chunk_size': 300}
+    assert chunk_ranges(record) == [(0, 300), (300, 300), (600, 300), (900, 100)]
+    assert [hash_chunk(path, offset, length, read_size=64) for offset, length in chunk_ranges(record)] == chunks
+
+
+def test_chunk_records_round_trip(tmp_path):
+    write_chunk_record(tmp_path, "scene1/video.mp4", 10, "ab" * 32, ["cd" * 32], chunk_size=8)
+    assert chunked_files(tmp_path) == {"scene1/video.mp4"}
+    assert read_chunk_record(tmp_path, "scene1/video.mp4")['chunks'] == ["cd" * 32]
@@ -0,0 +1,39 @@
+import gzip
+import os
+
+from evidence_gallery.compact import columnar, precompress_outputs, rows
+
+
+def test_columnar_round_trip():
+    records = [{'Agency': 'PD', 'ISO': '100', 'pageCount': 3},
+               {'Agency': 'PD', 'ISO': None, 'Make': 'Apple'},
+               {'Agency': 'PD', 'ISO': '100'}]
+    table = columnar(records)
+    assert table['dictionaries']['Agency'] == ['PD']
+    assert rows(table) == [{'Agency': 'PD', 'ISO': '100', 'pageCount': 3, 'Make': None},
+                           {'Agency': 'PD', 'ISO': None, 'pageCount': None, 'Make': 'Apple'},
+                           {'Agency': 'PD', 'ISO': '100', 'pageCount': None, 'Make': None}]
+
+
+def test_precompress_skips_unchanged_files(tmp_path):
+    data = tmp_path / "images-data.json"
+    data.write_text('{"a": 1}' * 1000)
+    (tmp_path / "page.jpg").write_bytes(b"\xff\xd8")
+
+    first = precompress_outputs(tmp_path)
+    assert (first['files'], first['reused']) == (1, 0)
+    assert gzip.decompress((tmp_path / "images-data.json.gz").read_bytes()) == data.read_bytes()
+    assert not (tmp_path / "page.jpg.gz").exists()
+
+    assert precompress_outputs(tmp_path)['reused'] == 1
+
+    # Rewritten with the same content (as Stage 3 does): compared, not recompressed
+    gz_mtime = os.stat(tmp_path / "images-data.json.gz").st_mtime_ns
+    data.write_text('{"a": 1}' * 1000)
+    os.utime(data, ns=(gz_mtime + 10**9, gz_mtime + 10**9))
+    assert precompress_outputs(tmp_path)['reused'] == 1
+
+    data.write_text('{"b": 2}')
+    os.utime(data, ns=(gz_mtime + 2 * 10**9, gz_mtime + 2 * 10**9))
+    assert precompress_outputs(tmp_path)['reused'] == 0
+    assert gzip.decompress((tmp_path / "images-data.json.gz").read_bytes()) == b'{"b": 2}'
@@ -0,0 +1,58 @@
+import pytest
+from PIL import Image, ImageDraw
+
+np = pytest.importorskip("numpy")  # optional dependency, like the grouping itself
+
+from evidence_gallery.dedupe import (assign_duplicate_groups, group_near_duplicates,  # noqa: E402
+                                     hash_inputs, near_duplicate_pairs, perceptual_hashes, popcount)
+
+
+def brute_force(phash, dhash, radius, dhash_radius):
+    return {(i, j) for i in range(len(phash)) for j in range(i + 1, len(phash))
+            if bin(int(phash[i]) ^ int(phash[j])).count('1') <= radius
+            and bin(int(dhash[i]) ^ int(dhash[j])).count('1') <= dhash_radius}
+
+
+def flip(values, rng, bits):
+    out = values.copy()
+    for i in range(len(out)):
+        for b in rng.choice(64, bits, replace=False):
+            out[i] ^= np.uint64(1) << np.uint64(b)
+    return out
+
+
+def test_popcount():
+    values = np.array([0, 1, 0xFF, 2 ** 64 - 1], dtype=np.uint64)
+    assert popcount(values).tolist() == [0, 1, 8, 64]
+
+
+def test_pairs_match_brute_force():
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 2 ** 63, 40, dtype=np.uint64)
+    dbase = rng.integers(0, 2 ** 63, 40, dtype=np.uint64)
+    # Every base hash plus copies 1..8 bits away, so some pairs sit right at the radius
+    phash = np.concatenate([base] + [flip(base, rng, bits) for bits in (1, 3, 6, 7)])
+    dhash = np.concatenate([dbase] + [flip(dbase, rng, bits) for bits in (2, 5, 9, 12)])
+    i, j = near_duplicate_pairs(phash, dhash, radius=6, dhash_radius=10)
+    found = set(zip(i.tolist(), j.tolist()))
+    assert found == brute_force(phash, dhash, 6, 10)
+    assert found  # the test would be empty otherwise
+
+
+def test_groups_are_transitive():
+    phash = np.array([0b0, 0b111, 0b111111, 2 ** 64 - 1], dtype=np.uint64)  # 0~1, 1~2, not 0~2
+    dhash = np.zeros(4, dtype=np.uint64)
+    assert group_near_duplicates(phash, dhash, radius=3) == [1, 1, 1, -1]
+
+
+def test_resaved_photo_is_grouped():
+    img = Image.new('RGB', (150, 150), 'white')
+    ImageDraw.Draw(img).ellipse((20, 30, 120, 110), fill=(200, 30, 30))
+    other = Image.new('RGB', (150, 150), 'black')
+    ImageDraw.Draw(other).rectangle((10, 10, 60, 140), fill=(30, 200, 30))
+    copy = img.resize((120, 120)).convert('L').convert('RGB')
+    phash, dhash = perceptual_hashes([hash_inputs(i) for i in (img, other, copy)])
+    records = [{'pHash': f"{int(p):016x}", 'dHash': f"{int(d):016x}"} for p, d in zip(phash, dhash)]
+    assert assign_duplicate_groups(records) == 1
+    assert [r.get('dupGroup') for r in records] == [1, None, 1]
+    assert not any('pHash' in r for r in records)
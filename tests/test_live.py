@@ -0,0 +1,45 @@
+import asyncio
+import json
+import threading
+
+from evidence_gallery.live import LivePortal
+from evidence_gallery.sources import EvidenceSource
+
+
+def test_portal_is_served_before_pdfs_are_counted(case, monkeypatch):
+    import fitz
+
+    from evidence_gallery import live
+
+    (case.vault / "documents").mkdir(parents=True)
+    for name in ("a.pdf", "b.pdf"):
+        pdf = fitz.open()
+        pdf.new_page().insert_text((72, 72), name)
+        pdf.save(case.vault / "documents" / name)
+    source = EvidenceSource(name="Vault", image_dirs=[], document_dirs=[case.vault / "documents"])
+
+    listed_on = []
+    real_list = LivePortal._list_sources
+
+    def listing(portal):
+        listed_on.append(threading.current_thread())
+        return real_list(portal)
+
+    monkeypatch.setattr(LivePortal, "_list_sources", listing)
+
+    async def run():
+        portal = LivePortal(case, [source])
+        try:
+            uncounted = await portal.build_catalog()
+            assert [doc[1] for doc in uncounted] == ["a.pdf", "b.pdf"]  # no documents_metadata.csv
+            assert "index.html" in portal.responses and portal.documents == []
+
+            await portal.count_pages(uncounted)
+            thumbs = json.loads(portal.responses["thumbnails-data.json"][1])['documents']
+            assert sorted((t['FileName'], t['pagesUrl']) for t in thumbs) == [
+                ("a.pdf", "documents/0.json"), ("b.pdf", "documents/1.json")]
+        finally:
+            portal.pool.shutdown()
+
+    asyncio.run(run())
+    assert listed_on and listed_on[0] is not threading.main_thread()
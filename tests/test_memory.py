@@ -0,0 +1,15 @@
+from evidence_gallery import memory
+
+
+def test_budget_follows_each_run():
+    memory.ensure(64)
+    budget = memory.current()
+    assert budget.limit == 64 * 1024 * 1024
+    memory.ensure(64)
+    assert memory.current() is budget
+
+    memory.ensure(64, set_aside=16 * 1024 * 1024)
+    assert memory.current().limit == 48 * 1024 * 1024
+
+    memory.ensure(None)  # a later run without --memory-budget
+    assert memory.current() is None
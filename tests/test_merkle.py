@@ -0,0 +1,67 @@
+import hashlib
+import random
+
+from evidence_gallery import merkle
+from evidence_gallery.merkle import (MerkleFrontier, MerkleTree, check_proof, differing_leaves, inclusion_proof,
+                                     leaf_hash, read_leaves, update_tree, verify_inclusion)
+
+
+def files(n, salt=""):
+    return [(hashlib.sha256(f"{salt}{i}".encode()).hexdigest(), f"scene/{i:04d}.jpg") for i in range(n)]
+
+
+def test_frontier_root_matches_full_tree():
+    for n in (1, 2, 3, 5, 8, 13, 100):
+        leaves = [leaf_hash(checksum, name) for checksum, name in files(n)]
+        frontier = MerkleFrontier()
+        for leaf in leaves:
+            frontier.append(leaf)
+        assert frontier.root() == MerkleTree(leaves).root()
+
+
+def test_every_inclusion_proof_verifies():
+    for n in (1, 2, 7, 16, 33):
+        leaves = [leaf_hash(checksum, name) for checksum, name in files(n)]
+        tree = MerkleTree(leaves)
+        for i, leaf in enumerate(leaves):
+            path = tree.inclusion_proof(i)
+            assert verify_inclusion(leaf, i, n, path, tree.root())
+            if n > 1:
+                assert not verify_inclusion(leaves[(i + 1) % n], i, n, path, tree.root())
+
+
+def test_differing_leaves():
+    a = files(21)
+    b = list(a)
+    b[5] = (hashlib.sha256(b"tampered").hexdigest(), b[5][1])
+    b.append(files(1, "new")[0])
+    tree = lambda entries: MerkleTree(leaf_hash(c, n) for c, n in entries)
+    assert differing_leaves(tree(a), tree(b)) == [5, 21]
+
+
+def test_appending_keeps_earlier_proofs(tmp_path):
+    first = files(10)
+    update_tree(tmp_path, first)
+    proof = inclusion_proof(tmp_path, "scene/0003.jpg")
+    summary = update_tree(tmp_path, first + [(files(1, "new")[0][0], "new.jpg")])
+    assert (summary['added'], summary['size']) == (1, 11)
+    assert check_proof(proof)
+    assert check_proof(inclusion_proof(tmp_path, "scene/0003.jpg"))
+
+
+def test_tree_follows_the_current_checksums(tmp_path):
+    entries = files(12)
+    update_tree(tmp_path, entries)
+
+    kept = [entry for entry in entries if entry[1] != "scene/0004.jpg"]
+    changed = (hashlib.sha256(b"edited").hexdigest(), "scene/0007.jpg")
+    kept = [changed if name == changed[1] else (checksum, name) for checksum, name in kept]
+    random.Random(1).shuffle(kept)
+    summary = update_tree(tmp_path, kept)
+
+    assert summary['removed'] == ["scene/0004.jpg"]
+    assert summary['changed'] == ["scene/0007.jpg"]
+    assert sorted(read_leaves(tmp_path), key=lambda e: e[1]) == sorted(kept, key=lambda e: e[1])
+    expected = MerkleTree(leaf_hash(c, n) for c, n in read_leaves(tmp_path)).root().hex()
+    assert summary['root'] == expected == merkle.read_root(tmp_path)[0]
+    assert inclusion_proof(tmp_path, "scene/0004.jpg") is None
@@ -0,0 +1,39 @@
+import csv
+
+from evidence_gallery.metadata_index import MetadataIndex, exif_key, read_exif_csv
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['SourceFile', 'FileName', 'Make', 'DateTimeOriginal'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_exif_key(tmp_path):
+    assert exif_key("./scene1/IMG_0001.JPG") == "scene1/IMG_0001.JPG"
+    assert exif_key(str(tmp_path / "photos" / "a" / "x.jpg"), [tmp_path / "photos"]) == "a/x.jpg"
+
+
+def test_same_file_name_in_two_folders(tmp_path):
+    csv_path = tmp_path / "exif.csv"
+    write_csv(csv_path, [
+        {'SourceFile': 'scene1/IMG_0001.JPG', 'FileName': 'IMG_0001.JPG', 'Make': 'Apple'},
+        {'SourceFile': 'scene2/IMG_0001.JPG', 'FileName': 'IMG_0001.JPG', 'Make': 'Canon'},
+    ])
+    rows = read_exif_csv(csv_path)
+    assert rows['scene1/IMG_0001.JPG']['Make'] == 'Apple'
+    assert rows['scene2/IMG_0001.JPG']['Make'] == 'Canon'
+    assert 'IMG_0001.JPG' not in rows
+
+
+def test_exif_joins_checksums(tmp_path):
+    csv_path = tmp_path / "exif.csv"
+    write_csv(csv_path, [{'SourceFile': str(tmp_path / "photos" / "sub" / "a.jpg"), 'FileName': 'a.jpg',
+                          'Make': 'Apple', 'DateTimeOriginal': '2023:05:01 14:03:22'}])
+    with MetadataIndex(tmp_path / "index.sqlite") as index:
+        index.record_checksums("Vault", "image", [("sub/a.jpg", 10, "ab" * 32)])
+        index.import_exif_csv(csv_path, "Vault", [tmp_path / "photos"])
+        [row] = index.query(agency="Vault")
+    assert (row['file_name'], row['sha256'], row['make']) == ("sub/a.jpg", "ab" * 32, "Apple")
+    assert row['taken_at'] == "2023-05-01T14:03:22"
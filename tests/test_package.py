@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from conftest import REPO
+
+NO_PILLOW = "import sys; sys.modules['PIL'] = None; sys.modules['fitz'] = None\n"
+
+
+def test_stage1_verify_and_serve_import_without_pillow():
+    code = NO_PILLOW + ("import evidence_gallery\n"
+                        "from evidence_gallery import build_vault, cli, server, verify\n")
+    subprocess.run([sys.executable, "-c", code], cwd=REPO / "scripts", check=True)
+
+
+def test_stage_functions_load_on_first_use():
+    import evidence_gallery
+    from evidence_gallery.website import generate_website
+
+    assert evidence_gallery.generate_website is generate_website
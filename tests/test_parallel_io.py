@@ -0,0 +1,48 @@
+import threading
+
+from evidence_gallery import parallel_io
+from evidence_gallery.parallel_io import read_ahead, read_ahead_limit
+
+
+def test_read_ahead_keeps_order_and_contents(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bytes([i]) * (i + 1))
+        paths.append(path)
+    sizes = {p: p.stat().st_size for p in paths}
+    got = list(read_ahead(paths, sizes, 4, want=lambda p: p.name != "3.bin"))
+    assert [p for p, _ in got] == paths
+    assert [data for _, data in got] == [None if p.name == "3.bin" else p.read_bytes() for p in paths]
+
+
+def test_read_ahead_bounds_buffered_bytes(tmp_path, monkeypatch):
+    paths = [tmp_path / f"{i}.bin" for i in range(30)]
+    for path in paths:
+        path.write_bytes(b"x" * 100)
+    paths.append(tmp_path / "huge.bin")
+    paths[-1].write_bytes(b"y" * 1000)
+    sizes = {p: p.stat().st_size for p in paths}
+
+    lock = threading.Lock()
+    live, peak = set(), [0]
+    real_read = parallel_io._read
+
+    def tracked_read(path):
+        with lock:
+            live.add(path)
+            peak[0] = max(peak[0], sum(sizes[p] for p in live))
+        return real_read(path)
+
+    monkeypatch.setattr(parallel_io, "_read", tracked_read)
+    for path, data in read_ahead(paths, sizes, 16, max_bytes=350):
+        if path.name == "huge.bin":
+            assert data is None  # over the limit on its own: opened by path
+        with lock:
+            live.discard(path)  # the caller is done with it
+    assert peak[0] <= 350
+
+
+def test_read_ahead_limit_follows_memory_budget():
+    assert read_ahead_limit(None) == parallel_io.READ_AHEAD_BYTES
+    assert read_ahead_limit(400) == 100 * 1024 * 1024
@@ -0,0 +1,30 @@
+import json
+import os
+
+from PIL import Image
+
+from evidence_gallery.cli import build_vault_main, run_all_main
+
+
+def test_stdout_is_only_events(case, capsys):
+    (case.source / "notes.txt").write_text("scene notes")
+    Image.new('RGB', (64, 48), (120, 90, 90)).save(case.source / "IMG_0001.JPG")
+    assert run_all_main(["--root", str(case.root), "--workers", "1", "--progress", "-"]) == 0
+
+    out, err = capsys.readouterr()
+    events = [json.loads(line) for line in out.splitlines()]
+    assert {e['stage'] for e in events if e['event'] == 'phase_start'} >= {"stage1", "stage2", "stage3"}
+    assert "STAGE 1: BUILDING EVIDENCE VAULT" in err and "COMPLETE!" in err
+
+    # Printing goes back to stdout once the run is over
+    print("done")
+    assert capsys.readouterr().out == "done\n"
+
+
+def test_progress_file_leaves_stdout_alone(case, capsys, tmp_path):
+    (case.source / "notes.txt").write_text("scene notes")
+    events = tmp_path / "events.jsonl"
+    assert build_vault_main(["--root", str(case.root), "--progress", str(events)]) == 0
+
+    assert "STAGE 1: BUILDING EVIDENCE VAULT" in capsys.readouterr().out
+    assert os.path.getsize(events) and all(json.loads(line) for line in events.read_text().splitlines())
@@ -0,0 +1,35 @@
+from evidence_gallery.scanner import classify, list_documents, list_files
+
+
+def test_classify_by_content():
+    assert classify(b'\xff\xd8\xff\xe0' + b'\0' * 20) == "photos"
+    assert classify(b'junk\r\n%PDF-1.7\n') == "documents"
+    assert classify(b'BM' + bytes(12) + (40).to_bytes(4, 'little')) == "photos"
+    assert classify(b'\0\0\0\x18ftypheic') == "photos"
+    assert classify(b'\0\0\0\x18ftypisom') == "videos"
+    assert classify(b'hello') == "other"
+
+
+def test_classify_needs_real_headers():
+    assert classify(b'BMW service notes, mileage 40213\n') == "other"
+    assert classify(b'See the %PDF-1.7 header described in ISO 32000') == "other"
+    assert classify(b'x' * 1020 + b'\n%PDF-1.4') == "other"  # header must end inside the first KB
+
+
+def test_listing_is_sorted_and_skips_clutter(tmp_path):
+    for rel in ("b/2.pdf", "a/1.PDF", "a/.hidden.pdf", "Thumbs.db", "c/scan.bin", "c/notes.txt"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_bytes(b"%PDF-1.4\n" if rel.endswith((".pdf", ".PDF", ".bin")) else b"text")
+    assert [rel for _, rel in list_files(tmp_path)] == ["a/1.PDF", "b/2.pdf", "c/notes.txt", "c/scan.bin"]
+    assert [rel for _, rel in list_documents(tmp_path)] == ["a/1.PDF", "b/2.pdf", "c/scan.bin"]
+
+
+def test_links_to_files_are_followed(tmp_path, capsys):
+    (tmp_path / "elsewhere").mkdir()
+    (tmp_path / "elsewhere" / "scan.pdf").write_bytes(b"%PDF-1.4\n")
+    (tmp_path / "case").mkdir()
+    (tmp_path / "case" / "scan.pdf").symlink_to(tmp_path / "elsewhere" / "scan.pdf")
+    (tmp_path / "case" / "more").symlink_to(tmp_path / "elsewhere", target_is_directory=True)
+
+    assert [rel for _, rel in list_files(tmp_path / "case")] == ["scan.pdf"]
+    assert "Skipped link to a folder: more" in capsys.readouterr().out
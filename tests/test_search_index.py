@@ -0,0 +1,63 @@
+import gzip
+import json
+from itertools import accumulate
+
+from evidence_gallery import search_index
+from evidence_gallery.search_index import tokenize, write_search_index
+
+
+def load(out_dir):
+    manifest = json.loads((out_dir / "index.json").read_text())
+    shards = {}
+    for key, name in manifest['shards'].items():
+        with gzip.open(out_dir / name) as f:
+            shards[key] = json.load(f)
+    return manifest, shards
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Déclaration of J. Müller, case #A-17_b") == ["declaration", "of", "muller", "case", "17"]
+    assert tokenize("Ünïcödé 2023") == ["unicode", "2023"]
+
+
+def test_postings_point_at_document_pages(tmp_path):
+    documents = [{'Agency': 'PD', 'FileName': 'a.pdf'}, {'Agency': 'PD', 'FileName': 'b.pdf'}]
+    text = {('PD', 'a.pdf'): [['a', 'pdf'], ['vehicle', 'witness'], ['vehicle']],
+            ('PD', 'b.pdf'): [['b', 'pdf'], ['witness']]}
+    write_search_index(documents, text, tmp_path)
+    manifest, shards = load(tmp_path)
+    assert manifest['offsets'] == [0, 3] and manifest['pageIds'] == 5
+
+    postings = {}
+    for shard in shards.values():
+        for term, deltas in zip(shard['terms'], shard['postings']):
+            postings[term] = list(accumulate(deltas))
+    assert postings['vehicle'] == [1, 2]
+    assert postings['witness'] == [1, 4]
+    assert postings['pdf'] == [0, 3]
+
+
+def test_heavy_prefixes_split_into_disjoint_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "SHARD_POSTINGS", 10)
+    terms = [f"st{suffix}" for suffix in ("a", "ate", "atement", "reet", "op", "ation")] + ["van", "ve"]
+    documents = [{'Agency': 'PD', 'FileName': f"{i}.pdf"} for i in range(5)]
+    text = {('PD', d['FileName']): [[], sorted(terms)] for d in documents}
+    write_search_index(documents, text, tmp_path)
+    _, shards = load(tmp_path)
+
+    assert max(map(len, shards)) > search_index.MIN_PREFIX  # "st" was split
+    seen = []
+    for key, shard in shards.items():
+        assert shard['terms'] == sorted(shard['terms'])
+        assert all(term.startswith(key) for term in shard['terms'])  # where the viewer looks
+        seen += shard['terms']
+    assert sorted(seen) == sorted(terms)
+
+
+def test_stale_shards_are_removed(tmp_path):
+    documents = [{'Agency': 'PD', 'FileName': 'a.pdf'}]
+    write_search_index(documents, {('PD', 'a.pdf'): [['zebra']]}, tmp_path)
+    write_search_index(documents, {('PD', 'a.pdf'): [['apple']]}, tmp_path)
+    _, shards = load(tmp_path)
+    assert list(shards) == ["ap"]
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,95 @@
+import gzip
+import http.client
+import threading
+
+import pytest
+
+from evidence_gallery.server import PortalServer, parse_range
+
+BODY = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def portal(tmp_path):
+    (tmp_path / "images-data.json").write_bytes(BODY)
+    (tmp_path / "images-data.json.gz").write_bytes(gzip.compress(BODY))
+    (tmp_path / "page.jpg").write_bytes(BODY)
+    server = PortalServer(("127.0.0.1", 0), tmp_path, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **headers):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 100)
+    assert parse_range("bytes=900-", 1000) == (900, 100)
+    assert parse_range("bytes=-100", 1000) == (900, 100)
+    assert parse_range("bytes=990-2000", 1000) == (990, 10)
+    assert parse_range("bytes=0-1,5-9", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+
+
+def test_range_request_gets_206(portal):
+    response, body = get(portal, "/page.jpg", Range="bytes=100-199")
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 100-199/{len(BODY)}"
+    assert body == BODY[100:200]
+
+
+def test_unsatisfiable_range_gets_416(portal):
+    response, body = get(portal, "/page.jpg", Range=f"bytes={len(BODY)}-")
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(BODY)}"
+    assert body == b""
+
+
+def test_stale_if_range_gets_whole_file(portal):
+    response, body = get(portal, "/page.jpg", Range="bytes=0-9", **{"If-Range": '"old"'})
+    assert response.status == 200 and body == BODY
+
+
+def test_matching_etag_gets_304(portal):
+    response, _ = get(portal, "/page.jpg")
+    etag = response.getheader("ETag")
+    assert response.getheader("Cache-Control") == "no-cache"
+
+    response, body = get(portal, "/page.jpg", **{"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+    response, _ = get(portal, "/page.jpg", **{"If-None-Match": '"something-else"'})
+    assert response.status == 200
+
+
+def test_versioned_url_is_immutable(portal):
+    etag = get(portal, "/page.jpg")[0].getheader("ETag").strip('"')
+    response, _ = get(portal, f"/page.jpg?v={etag}")
+    assert "immutable" in response.getheader("Cache-Control")
+
+
+def test_precompressed_sibling(portal):
+    response, body = get(portal, "/images-data.json", **{"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body) == BODY
+
+    plain_etag = get(portal, "/images-data.json")[0].getheader("ETag")
+    assert plain_etag != response.getheader("ETag")  # the encodings are cached separately
+
+
+def test_no_listing_and_no_temp_files(portal, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "half.json.tmp").write_text("{")
+    assert get(portal, "/sub/")[0].status == 404
+    assert get(portal, "/half.json.tmp")[0].status == 404
@@ -0,0 +1,21 @@
+import json
+
+from evidence_gallery.time_index import write_time_index
+
+
+def test_buckets_by_day_hour_and_month(tmp_path):
+    images = [{'DateTimeOriginal': '2023:05:01 14:03:22'}, {'DateTimeOriginal': 'Unknown'},
+              {'DateTimeOriginal': '2023:05:01 14:59:00'}, {'DateTimeOriginal': '2023:06:02 09:00:00'}]
+    documents = [{'createdAt': '2023-05-01T08:00:00'}, {'createdAt': None}]
+    summary = write_time_index(images, documents, tmp_path)
+    assert summary == {'dated': 4, 'undated': 2, 'days': 2, 'months': 2}
+
+    manifest = json.loads((tmp_path / "index.json").read_text())
+    assert manifest['days'] == [["2023-05-01", [[8, 1], [14, 2]]], ["2023-06-02", [[9, 1]]]]
+    assert manifest['undated'] == {'images': 1, 'documents': 1}
+    may = json.loads((tmp_path / manifest['months']['2023-05']).read_text())
+    assert may['items'] == [["2023-05-01T08:00:00", "d", 0], ["2023-05-01T14:03:22", "i", 0],
+                            ["2023-05-01T14:59:00", "i", 2]]
+
+    write_time_index(images[3:], [], tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2023-06.json", "index.json"]
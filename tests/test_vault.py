@@ -0,0 +1,39 @@
+import pytest
+
+from evidence_gallery import StageError, build_vault
+
+PDF = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+
+
+def test_empty_template_raises(case):
+    with pytest.raises(StageError):
+        build_vault(case)
+
+
+def test_guide_files_are_not_evidence(case):
+    (case.source / "notes").mkdir()
+    (case.source / "notes" / "scene.txt").write_text("scene notes")
+    build_vault(case)
+
+    checksums = (case.metadata / "checksums.txt").read_text()
+    assert "notes/scene.txt" in checksums
+    assert "START_HERE.md" not in checksums
+    assert not (case.vault / "other" / "START_HERE.md").exists()
+
+
+def test_files_with_the_same_name_are_all_preserved(case):
+    (case.source / "documents").mkdir()
+    (case.source / "report.pdf").write_bytes(PDF + b"top level")
+    (case.source / "documents" / "report.pdf").write_bytes(PDF + b"in documents/")
+    summary = build_vault(case)
+
+    assert summary['documents'] == 2
+    assert (case.vault / "documents" / "report.pdf").read_bytes().endswith(b"top level")
+    assert (case.vault / "documents" / "documents" / "report.pdf").read_bytes().endswith(b"in documents/")
+
+
+def test_paths_differing_only_in_case_fail_the_stage(case):
+    (case.source / "Report.pdf").write_bytes(PDF + b"one")
+    (case.source / "report.pdf").write_bytes(PDF + b"two")
+    with pytest.raises(StageError, match="letter case"):
+        build_vault(case)
@@ -0,0 +1,82 @@
+import os
+
+from evidence_gallery import build_vault
+from evidence_gallery.checkpoint import Journal, file_stamp
+from evidence_gallery.chunked import hash_with_chunks, write_chunk_record
+from evidence_gallery.verify import verify_vault
+
+
+def make_vault(case):
+    (case.source / "notes").mkdir()
+    for i in range(5):
+        (case.source / "notes" / f"{i}.txt").write_bytes(os.urandom(1000))
+    build_vault(case)
+    return case.vault / "other" / "notes"
+
+
+def test_clean_vault_verifies(case):
+    make_vault(case)
+    summary = verify_vault(case)
+    assert (summary['ok'], summary['problems']) == (5, 0)
+    assert verify_vault(case, fast=True)['unchanged'] == 5
+
+
+def test_mismatched_missing_and_extra(case):
+    folder = make_vault(case)
+    with open(folder / "1.txt", 'r+b') as f:
+        f.write(b"tampered")
+    (folder / "2.txt").unlink()
+    (folder / "planted.txt").write_text("not evidence")
+
+    summary = verify_vault(case)
+    assert summary['mismatched'] == ["other/notes/1.txt"]
+    assert summary['missing'] == ["other/notes/2.txt"]
+    assert summary['extra'] == ["other/notes/planted.txt"]
+    assert summary['problems'] == 3
+
+
+def test_sample_still_checks_existence(case):
+    folder = make_vault(case)
+    (folder / "3.txt").unlink()
+    summary = verify_vault(case, sample=0.0, seed=1)
+    assert (summary['ok'], summary['skipped'], summary['missing']) == (0, 4, ["other/notes/3.txt"])
+
+
+def test_chunked_file_reports_corrupt_range(case):
+    folder = make_vault(case)
+    checksum, chunks = hash_with_chunks(folder / "4.txt", chunk_size=300)
+    write_chunk_record(case.metadata, "other/notes/4.txt", 1000, checksum, chunks, chunk_size=300)
+    assert verify_vault(case)['problems'] == 0
+
+    with open(folder / "4.txt", 'r+b') as f:
+        f.seek(650)
+        f.write(bytes([f.read(1)[0] ^ 0xff]))
+    summary = verify_vault(case)
+    assert summary['mismatched'] == ["other/notes/4.txt"]
+    assert summary['corrupt_ranges'] == {"other/notes/4.txt": [[600, 899]]}
+    assert verify_vault(case, whole_file=True)['mismatched'] == ["other/notes/4.txt"]
+
+
+def test_interrupted_chunk_check_resumes(case):
+    folder = make_vault(case)
+    checksum, chunks = hash_with_chunks(folder / "4.txt", chunk_size=300)
+    write_chunk_record(case.metadata, "other/notes/4.txt", 1000, checksum, chunks, chunk_size=300)
+    # An earlier run got through the first three chunks
+    with Journal(case.state_dir / "verify-chunks.jsonl", "verify-chunks") as journal:
+        for index in range(3):
+            journal.record(f"other/notes/4.txt#{index}", file_stamp(folder / "4.txt"), sha256=chunks[index])
+
+    summary = verify_vault(case)
+    assert summary['problems'] == 0
+    assert summary['hashed_bytes'] == 4 * 1000 + 100
+    assert not (case.state_dir / "verify-chunks.jsonl").exists()  # finished: the next run starts over
+
+
+def test_same_name_in_two_categories(case):
+    (case.source / "x.jpg").write_bytes(b'\xff\xd8\xff\xe0' + os.urandom(1000))
+    build_vault(case)
+    assert (case.metadata / "checksums.txt").read_text().endswith("  photos/x.jpg\n")
+    (case.vault / "other" / "x.jpg").write_text("planted")
+
+    summary = verify_vault(case)
+    assert (summary['ok'], summary['extra']) == (1, ["other/x.jpg"])
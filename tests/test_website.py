@@ -0,0 +1,126 @@
+import json
+import os
+
+from PIL import Image
+
+from evidence_gallery import PipelineConfig, build_vault, generate_website, optimize_for_web
+
+
+def test_resume_with_root_given_another_way(case, monkeypatch):
+    for folder, shade in (("a", 40), ("b", 200)):
+        (case.source / folder).mkdir()
+        Image.new('RGB', (320, 240), (shade, 90, 90)).save(case.source / folder / "IMG_0001.JPG")
+    build_vault(case)
+    generate_website(case)
+
+    [journal] = case.state_dir.glob("stage3-*.jsonl")
+    entries = [json.loads(line) for line in journal.read_text().splitlines()[1:]]
+    images = [e for e in entries if 'rendition' in e]
+    assert {e['key'] for e in images} == {"images/01-EVIDENCE-VAULT/photos/a/IMG_0001.JPG",
+                                          "images/01-EVIDENCE-VAULT/photos/b/IMG_0001.JPG"}
+    assert not any('dataUri' in e for e in entries)
+
+    # Same case as a relative root: every image is taken from the journal
+    monkeypatch.chdir(case.root)
+    before = journal.read_text()
+    generate_website(PipelineConfig(root="."))
+    assert journal.read_text() == before
+
+    full = json.loads((case.website_output / "images-data.json").read_text())
+    assert sorted(i['FileName'] for i in full) == ["a/IMG_0001.JPG", "b/IMG_0001.JPG"]
+    assert all(i['dataUri'].startswith("data:image/jpeg;base64,") for i in full)
+
+
+def test_misnamed_pdf_reaches_the_portal(case):
+    import fitz
+
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), "Statement of witness")
+    (case.source / "scans").mkdir()
+    pdf.save(case.source / "scans" / "statement.dat")
+    pdf.save(case.source / "scans" / "report")
+    build_vault(case)
+    assert (case.vault / "documents" / "scans" / "statement.dat").exists()
+
+    optimize_for_web(case)
+    assert sorted(p.name for p in (case.web_opt / "documents" / "scans").iterdir()) == [
+        "report_page_001.png", "statement_page_001.png"]
+
+    summary = generate_website(case)
+    assert summary['documents'] == 2
+    thumbnails = json.loads((case.website_output / "thumbnails-data.json").read_text())
+    assert sorted(d['FileName'] for d in thumbnails['documents']) == ["scans/report", "scans/statement.dat"]
+
+
+def test_document_closed_when_processing_fails(case, monkeypatch):
+    import fitz
+
+    from evidence_gallery import website
+
+    pdf = fitz.open()
+    pdf.new_page()
+    (case.vault / "documents").mkdir(parents=True)
+    pdf.save(case.vault / "documents" / "a.pdf")
+
+    opened = []
+    real_doc = website.LazyPDF.doc
+
+    def tracking_doc(self):
+        doc = real_doc.fget(self)
+        opened.append(doc)
+        return doc
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("cannot render")
+
+    monkeypatch.setattr(website.LazyPDF, "doc", property(tracking_doc))
+    monkeypatch.setattr(website, "create_pdf_thumbnail", broken)
+    thumbs, _, _, _ = website.process_documents_lazy(case.vault / "documents", "Vault", case)
+    assert thumbs == []
+    assert opened and all(doc.is_closed for doc in opened)
+
+
+def test_rerun_keeps_compressed_page_lists(case):
+    import fitz
+
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), "Incident report")
+    (case.vault / "documents").mkdir(parents=True)
+    pdf.save(case.vault / "documents" / "a.pdf")
+    generate_website(case)
+
+    [compressed] = (case.website_output / "documents").glob("*.json.gz")
+    inode = os.stat(compressed).st_ino
+    generate_website(case)
+    assert os.stat(compressed).st_ino == inode  # kept, not deleted and compressed again
+
+
+def test_text_is_taken_from_rendered_pages_only(case, monkeypatch):
+    import dataclasses
+
+    import fitz
+
+    from evidence_gallery import search_index
+
+    pdf = fitz.open()
+    for word in ("alpha", "bravo", "charlie"):
+        pdf.new_page().insert_text((72, 72), word)
+    (case.vault / "documents").mkdir(parents=True)
+    pdf.save(case.vault / "documents" / "a.pdf")
+    config = dataclasses.replace(case, max_pages_small=2)
+    generate_website(config)
+
+    [journal] = config.state_dir.glob("stage3-*.jsonl")
+    [text] = [json.loads(line) for line in journal.read_text().splitlines()[1:] if '#text' in line]
+    assert isinstance(text['words'], str)  # a digest; the boxes are in the page list
+    [pages] = (config.website_output / "documents").glob("*.json")
+    assert [p['words'][0][0] for p in json.loads(pages.read_text())['pages']] == ["alpha", "bravo"]
+
+    # A rerun takes the words from the page list without reading the PDF's text
+    def unexpected(page):
+        raise AssertionError("text extracted again")
+
+    monkeypatch.setattr(search_index, "page_words", unexpected)
+    generate_website(config)
+    manifest = json.loads((config.website_output / "search" / "index.json").read_text())
+    assert manifest['pageIds'] == 3  # metadata + two rendered pages